@@ -1,90 +1,126 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
-from scipy.stats import linregress
+from typing import Dict, Iterable, List, Any, Optional, Sequence, Tuple
+from functools import cached_property
+from feature_engine import compute_district_features, penetration_rates, FEATURE_COLUMNS
+from instrumentation import stage
+from lookup_index import KeyIndex
+from rollup_cube import RollupCube
+from time_series import TimeSeriesIndex
+from schema import KEY_COLUMNS, compact_master_data, compact_district_features
+from serialization import round_column, int_column, str_column, date_column, to_rows
+
+# District analytics fields read from district_features: (column, decimals, or None for counts)
+DISTRICT_FEATURE_FIELDS = [
+    ('total_enrollments', None),
+    ('total_population', None),
+    ('avg_penetration_rate', 4),
+    ('latest_penetration_rate', 4),
+    ('youth_inclusion_rate', 4),
+    ('adult_inclusion_rate', 4),
+    ('youth_adult_gap', 4),
+    ('growth_slope', 2),
+    ('growth_volatility', 4),
+    ('stagnation_periods', None),
+]
 
 class AnalyticsEngine:
-    def __init__(self, master_data: pd.DataFrame):
-        self.master_data = master_data
-        self.district_features = self._compute_district_features()
+    def __init__(self, master_data: pd.DataFrame, district_features: Optional[pd.DataFrame] = None,
+                 compact: bool = True):
+        # Compact layout (see schema.py); a no-op for data that already uses it
+        self.compact = compact
+        self.master_data = compact_master_data(master_data) if compact else master_data
+        # Features are computed on first access unless supplied up front
+        self._district_features = district_features
+        self._features_complete = False
+        self._feature_index = None
+    
+    @classmethod
+    def from_precomputed(cls, master_data: pd.DataFrame, district_features: pd.DataFrame,
+                         compact: bool = True) -> 'AnalyticsEngine':
+        """Build the engine around district features computed ahead of time (see preprocess.py)"""
+        return cls(master_data, district_features=district_features, compact=compact)
+    
+    @property
+    def district_features(self) -> pd.DataFrame:
+        if not self._features_complete:
+            features = self._complete_district_features(self._district_features)
+            if self.compact:
+                # Same state/district dictionaries as master_data
+                features = compact_district_features(features, self._key_dtypes())
+            self._district_features = features
+            self._features_complete = True
+        return self._district_features
+    
+    @district_features.setter
+    def district_features(self, features: pd.DataFrame):
+        self._district_features = features
+        self._features_complete = False
+        self._feature_index = None
+    
+    @cached_property
+    def district_index(self) -> KeyIndex:
+        """(state, district) -> master_data rows, sorted by date"""
+        return KeyIndex(self.master_data, ['state', 'district'], order_by=['date'])
+    
+    @cached_property
+    def districts_by_state(self) -> Dict[str, List[str]]:
+        districts: Dict[str, List[str]] = {}
+        for state, district in self.district_index.labels():
+            districts.setdefault(state, []).append(district)
+        return {state: sorted(names) for state, names in districts.items()}
+    
+    @cached_property
+    def district_series(self) -> TimeSeriesIndex:
+        """Dates of every district_index row, one date-sorted segment per district"""
+        index = self.district_index
+        return TimeSeriesIndex(self.master_data['date'].to_numpy()[index.positions], index.group_ends)
+    
+    @cached_property
+    def cube(self) -> RollupCube:
+        """National, state and district-date sums of master_data"""
+        return RollupCube(self.master_data)
+    
+    @property
+    def feature_index(self) -> KeyIndex:
+        """(state, district) -> district_features row"""
+        if self._feature_index is None:
+            self._feature_index = KeyIndex(self.district_features, ['state', 'district'])
+        return self._feature_index
+    
+    def build_indexes(self):
+        """Build every lookup index now instead of on the first request"""
+        _ = self.districts_by_state  # Builds district_index as well
+        _ = self.district_series
+        _ = self.feature_index
+        _ = self.cube
+    
+    def _key_dtypes(self) -> Dict[str, Any]:
+        return {column: self.master_data[column].dtype for column in KEY_COLUMNS}
+    
+    def _complete_district_features(self, features: Optional[pd.DataFrame]) -> pd.DataFrame:
+        """Compute the features that were not supplied, keeping precomputed ones as-is"""
+        if features is None:
+            return self._compute_district_features()
+        
+        missing_columns = [c for c in FEATURE_COLUMNS if c not in features.columns]
+        if not missing_columns:
+            return features
+        
+        print(f"Precomputed features missing {missing_columns}, computing them...")
+        computed = self._compute_district_features()
+        return features.merge(
+            computed[['state', 'district'] + missing_columns],
+            on=['state', 'district'],
+            how='left'
+        )[FEATURE_COLUMNS]
         
     def _compute_district_features(self) -> pd.DataFrame:
         print("Computing district-level intelligence features...")
         
-        features_list = []
-        
-        grouped = self.master_data.groupby(['state', 'district'])
-        
-        for (state, district), group in grouped:
-            group_sorted = group.sort_values('date')
-            
-            # FIXED: Use the latest date's values instead of sum/max across dates
-            latest_record = group_sorted.iloc[-1]
-            
-            total_enrollments = latest_record['total_enrollments']
-            total_population = latest_record['total_population']
-            
-            # Use latest penetration rate
-            latest_penetration = latest_record['penetration_rate']
-            avg_penetration = group['penetration_rate'].mean()
-            
-            # Youth metrics from latest record
-            youth_enrollment = latest_record['age_5_17']
-            youth_population = latest_record['demo_age_5_17']
-            youth_inclusion_rate = youth_enrollment / youth_population if youth_population > 0 else 0
-            youth_inclusion_rate = min(youth_inclusion_rate, 1.0)  # Cap at 100%
-            
-            # Adult metrics from latest record
-            adult_enrollment = latest_record['age_18_greater']
-            adult_population = latest_record['demo_age_17_']
-            adult_inclusion_rate = adult_enrollment / adult_population if adult_population > 0 else 0
-            adult_inclusion_rate = min(adult_inclusion_rate, 1.0)  # Cap at 100%
-            
-            # Time series for growth analysis
-            enrollment_series = group_sorted[['date', 'total_enrollments']].copy()
-            
-            growth_slope = 0
-            growth_volatility = 0
-            
-            if len(enrollment_series) >= 2:
-                x = np.arange(len(enrollment_series))
-                y = enrollment_series['total_enrollments'].values
-                
-                if np.std(y) > 0:
-                    slope, intercept, r_value, p_value, std_err = linregress(x, y)
-                    growth_slope = slope
-                
-                if len(y) > 1:
-                    # Calculate growth rates avoiding division by zero
-                    growth_rates = []
-                    for i in range(1, len(y)):
-                        if y[i-1] > 0:
-                            growth_rates.append((y[i] - y[i-1]) / y[i-1])
-                    
-                    if growth_rates:
-                        growth_volatility = np.std(growth_rates)
-            
-            time_span_days = (group_sorted['date'].max() - group_sorted['date'].min()).days
-            stagnation_periods = self._detect_stagnation(group_sorted)
-            
-            features_list.append({
-                'state': state,
-                'district': district,
-                'total_enrollments': int(total_enrollments),
-                'total_population': int(total_population),
-                'avg_penetration_rate': avg_penetration,
-                'latest_penetration_rate': latest_penetration,
-                'youth_inclusion_rate': youth_inclusion_rate,
-                'adult_inclusion_rate': adult_inclusion_rate,
-                'youth_adult_gap': abs(youth_inclusion_rate - adult_inclusion_rate),
-                'growth_slope': growth_slope,
-                'growth_volatility': growth_volatility,
-                'stagnation_periods': stagnation_periods,
-                'time_span_days': time_span_days,
-                'data_points': len(group)
-            })
-        
-        features_df = pd.DataFrame(features_list)
+        with stage('_compute_district_features', input_rows=len(self.master_data)) as record:
+            features_df = compute_district_features(self.master_data)
+            record['rows'] = len(features_df)
         print(f"  District features computed for {len(features_df)} districts")
         
         # Data quality checks
@@ -96,178 +132,201 @@ class AnalyticsEngine:
         
         return features_df
     
-    def _detect_stagnation(self, group_sorted: pd.DataFrame) -> int:
-        """Detect periods where enrollment growth has stagnated"""
-        
-        if len(group_sorted) < 3:
-            return 0
-        
-        enrollment_series = group_sorted['total_enrollments'].values
-        
-        stagnation_count = 0
-        threshold_pct = 0.01  # Less than 1% growth is considered stagnation
-        
-        for i in range(1, len(enrollment_series)):
-            if enrollment_series[i-1] > 0:
-                growth_rate = (enrollment_series[i] - enrollment_series[i-1]) / enrollment_series[i-1]
-                if abs(growth_rate) < threshold_pct:
-                    stagnation_count += 1
+    def update_districts(self, districts: Iterable[Tuple[str, str]]):
+        """
+        Recompute features for the given (state, district) pairs only.
         
-        return stagnation_count
+        master_data must already contain their new rows; every other district
+        keeps its current features.
+        """
+        districts = sorted(set(districts))
+        if not districts:
+            return
+        
+        targets = pd.MultiIndex.from_tuples(districts, names=['state', 'district'])
+        master_keys = pd.MultiIndex.from_frame(self.master_data[['state', 'district']])
+        updated = compute_district_features(self.master_data[master_keys.isin(targets)])
+        if self.compact:
+            updated = compact_district_features(updated, self._key_dtypes())
+        
+        features = self.district_features
+        feature_keys = pd.MultiIndex.from_frame(features[['state', 'district']])
+        self.district_features = pd.concat(
+            [features[~feature_keys.isin(targets)], updated[features.columns]],
+            ignore_index=True
+        ).sort_values(['state', 'district'], ignore_index=True)
+        print(f"  District features recomputed for {len(updated)} districts")
     
     def get_national_overview(self) -> Dict[str, Any]:
         """
         FIXED: Use latest snapshot instead of summing across all dates
         """
+        cube = self.cube
         
-        # Get the latest date in the dataset
-        latest_date = self.master_data['date'].max()
-        latest_data = self.master_data[self.master_data['date'] == latest_date]
-        
-        # Sum across all districts for the latest date
-        total_enrollments = int(latest_data['total_enrollments'].sum())
-        total_population = int(latest_data['total_population'].sum())
+        # Sums across all districts for the latest date in the dataset
+        latest = cube.national_values[-1]
+        total_enrollments = int(latest[cube.measure('total_enrollments')])
+        total_population = int(latest[cube.measure('total_population')])
         
         overall_penetration = total_enrollments / total_population if total_population > 0 else 0
         overall_penetration = min(overall_penetration, 1.0)  # Cap at 100%
         
         # Youth metrics
-        total_youth_enrolled = int(latest_data['age_5_17'].sum())
-        total_youth_population = int(latest_data['demo_age_5_17'].sum())
+        total_youth_enrolled = int(latest[cube.measure('age_5_17')])
+        total_youth_population = int(latest[cube.measure('demo_age_5_17')])
         youth_penetration = total_youth_enrolled / total_youth_population if total_youth_population > 0 else 0
         youth_penetration = min(youth_penetration, 1.0)
         
         # Adult metrics
-        total_adult_enrolled = int(latest_data['age_18_greater'].sum())
-        total_adult_population = int(latest_data['demo_age_17_'].sum())
+        total_adult_enrolled = int(latest[cube.measure('age_18_greater')])
+        total_adult_population = int(latest[cube.measure('demo_age_17_')])
         adult_penetration = total_adult_enrolled / total_adult_population if total_adult_population > 0 else 0
         adult_penetration = min(adult_penetration, 1.0)
         
-        num_states = self.master_data['state'].nunique()
-        num_districts = self.master_data[['state', 'district']].drop_duplicates().shape[0]
-        
         return {
             'total_enrollments': total_enrollments,
             'total_population': total_population,
             'overall_penetration_rate': round(overall_penetration, 4),
             'youth_penetration_rate': round(youth_penetration, 4),
             'adult_penetration_rate': round(adult_penetration, 4),
-            'num_states': num_states,
-            'num_districts': num_districts,
+            'num_states': cube.num_states,
+            'num_districts': cube.num_districts,
             'coverage_gap': round(1 - overall_penetration, 4),
-            'latest_date': latest_date.strftime('%Y-%m-%d')
+            'latest_date': pd.Timestamp(cube.dates[-1]).strftime('%Y-%m-%d')
         }
     
    
-    def get_national_trends(self) -> Dict[str, Any]:
-        time_series = self.master_data.groupby('date').agg({
-            'total_enrollments': 'sum',
-            'total_population': 'sum'
-        }).reset_index()
-        
-        time_series = time_series.sort_values('date')
-        
-        # Calculate penetration rate from aggregated data (not mean of district rates)
-        time_series['penetration_rate'] = np.where(
-            time_series['total_population'] > 0,
-            time_series['total_enrollments'] / time_series['total_population'],
-            0
-        )
-        
-        # Cap penetration rate at 100%
-        time_series['penetration_rate'] = time_series['penetration_rate'].clip(upper=1.0)
-        
-        trends = []
-        for _, row in time_series.iterrows():
-            trends.append({
-                'date': row['date'].strftime('%Y-%m-%d'),
-                'enrollments': int(row['total_enrollments']),
-                'population': int(row['total_population']),
-                'penetration_rate': round(row['penetration_rate'], 4)
-            })
+    def get_national_trends(self, columnar: bool = False, start: Optional[pd.Timestamp] = None,
+                            end: Optional[pd.Timestamp] = None, bucket: str = 'day') -> Dict[str, Any]:
+        cube = self.cube
+        positions, labels = cube.national_series.select(start, end, bucket)
+        enrollments = cube.national_values[positions, cube.measure('total_enrollments')]
+        population = cube.national_values[positions, cube.measure('total_population')]
+        
+        # Penetration rate from aggregated data (not mean of district rates), capped at 100%
+        columns = {'date': date_column(labels)}
+        if bucket != 'day':
+            columns['as_of'] = date_column(cube.dates[positions])
+        columns['enrollments'] = int_column(enrollments)
+        columns['population'] = int_column(population)
+        columns['penetration_rate'] = round_column(penetration_rates(enrollments, population), 4)
+        
+        return {'trends': to_rows(columns, columnar)}
+    
+    def get_rollup(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                   states: Optional[List[str]] = None, group_by: str = 'date',
+                   columnar: bool = False) -> Dict[str, Any]:
+        """Sums over a date range and a subset of states, grouped by date, state, district or in total"""
+        unknown = sorted(set(states or []) - set(self.cube.states))
+        if unknown:
+            return {'error': 'State not found', 'states': unknown}
+        
+        rollup = self.cube.aggregate(start, end, states or None, group_by)
+        
+        columns = {}
+        for key in ('date', 'state', 'district'):
+            if key in rollup.columns:
+                columns[key] = date_column(rollup[key]) if key == 'date' else str_column(rollup[key])
+        for name in ('districts_reporting', 'states_reporting', 'data_points'):
+            if name in rollup.columns:
+                columns[name] = int_column(rollup[name])
+        columns['enrollments'] = int_column(rollup['total_enrollments'])
+        columns['population'] = int_column(rollup['total_population'])
+        columns['youth_enrollments'] = int_column(rollup['age_5_17'])
+        columns['youth_population'] = int_column(rollup['demo_age_5_17'])
+        columns['adult_enrollments'] = int_column(rollup['age_18_greater'])
+        columns['adult_population'] = int_column(rollup['demo_age_17_'])
+        columns['penetration_rate'] = round_column(rollup['penetration_rate'], 4)
         
-        return {'trends': trends}
+        return {
+            'start': start.strftime('%Y-%m-%d') if start is not None else None,
+            'end': end.strftime('%Y-%m-%d') if end is not None else None,
+            'states': sorted(states) if states else None,
+            'group_by': group_by,
+            'rows': to_rows(columns, columnar)
+        }
 
     def get_states_list(self) -> Dict[str, List[str]]:
-        states = sorted(self.master_data['state'].unique().tolist())
-        return {'states': states}
+        return {'states': list(self.cube.states)}
     
     def get_districts_by_state(self, state_name: str) -> Dict[str, List[str]]:
-        districts = self.master_data[self.master_data['state'] == state_name]['district'].unique().tolist()
-        districts = sorted(districts)
+        districts = list(self.districts_by_state.get(state_name, []))
         return {'state': state_name, 'districts': districts}
     
     def get_state_overview(self, state_name: str) -> Dict[str, Any]:
-        state_data = self.master_data[self.master_data['state'] == state_name]
+        cube = self.cube
         
-        if state_data.empty:
+        if not cube.has_state(state_name):
             return {'error': 'State not found'}
         
-        # Use latest date
-        latest_date = state_data['date'].max()
-        latest_data = state_data[state_data['date'] == latest_date]
-        
-        total_enrollments = int(latest_data['total_enrollments'].sum())
-        total_population = int(latest_data['total_population'].sum())
+        # Use the latest date the state reports on
+        latest = cube.state_totals(state_name, cube.latest_state_date(state_name))
+        total_enrollments = int(latest[cube.measure('total_enrollments')])
+        total_population = int(latest[cube.measure('total_population')])
         
         avg_penetration = total_enrollments / total_population if total_population > 0 else 0
         avg_penetration = min(avg_penetration, 1.0)
         
-        num_districts = state_data['district'].nunique()
-        
         return {
             'state': state_name,
             'total_enrollments': total_enrollments,
             'total_population': total_population,
             'avg_penetration_rate': round(avg_penetration, 4),
-            'num_districts': num_districts
+            'num_districts': cube.state_district_count(state_name)
         }
     
-    def get_district_analytics(self, state_name: str, district_name: str) -> Dict[str, Any]:
-        district_data = self.master_data[
-            (self.master_data['state'] == state_name) & 
-            (self.master_data['district'] == district_name)
-        ]
-        
-        if district_data.empty:
-            return {'error': 'District not found'}
-        
-        features = self.district_features[
-            (self.district_features['state'] == state_name) & 
-            (self.district_features['district'] == district_name)
-        ]
-        
-        if features.empty:
-            return {'error': 'District features not found'}
-        
-        feature_row = features.iloc[0]
-        
-        time_series = district_data.sort_values('date')[['date', 'total_enrollments', 'penetration_rate']].copy()
-        time_series['penetration_rate'] = time_series['penetration_rate'].clip(upper=1.0)
-        
-        trends = []
-        for _, row in time_series.iterrows():
-            trends.append({
-                'date': row['date'].strftime('%Y-%m-%d'),
-                'enrollments': int(row['total_enrollments']),
-                'penetration_rate': round(row['penetration_rate'], 4)
-            })
-        
-        return {
-            'state': state_name,
-            'district': district_name,
-            'total_enrollments': int(feature_row['total_enrollments']),
-            'total_population': int(feature_row['total_population']),
-            'avg_penetration_rate': round(feature_row['avg_penetration_rate'], 4),
-            'latest_penetration_rate': round(feature_row['latest_penetration_rate'], 4),
-            'youth_inclusion_rate': round(feature_row['youth_inclusion_rate'], 4),
-            'adult_inclusion_rate': round(feature_row['adult_inclusion_rate'], 4),
-            'youth_adult_gap': round(feature_row['youth_adult_gap'], 4),
-            'growth_slope': round(feature_row['growth_slope'], 2),
-            'growth_volatility': round(feature_row['growth_volatility'], 4),
-            'stagnation_periods': int(feature_row['stagnation_periods']),
-            'trends': trends
-        }
+    def get_district_analytics(self, state_name: str, district_name: str, columnar: bool = False,
+                               start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                               bucket: str = 'day') -> Dict[str, Any]:
+        return self.get_districts_analytics([(state_name, district_name)], columnar, start, end, bucket)[0]
+    
+    def get_districts_analytics(self, keys: Sequence[Tuple[str, str]], columnar: bool = False,
+                                start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                                bucket: str = 'day', trends: bool = True) -> List[Dict[str, Any]]:
+        """District analytics for many (state, district) pairs, reading each feature column once"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        found, feature_rows = [], []
+        for i, key in enumerate(keys):
+            if key not in self.district_index:
+                results[i] = {'error': 'District not found'}
+                continue
+            bounds = self.feature_index.get_bounds(key)
+            if bounds is None:
+                results[i] = {'error': 'District features not found'}
+                continue
+            found.append(i)
+            feature_rows.append(self.feature_index.positions[bounds[0]])
+        
+        # round() on NumPy scalars is np.round, so whole columns round the same way
+        columns = {}
+        for name, decimals in DISTRICT_FEATURE_FIELDS:
+            values = self.district_features[name].to_numpy()[feature_rows]
+            columns[name] = int_column(values) if decimals is None else np.round(values, decimals).tolist()
+        
+        for j, i in enumerate(found):
+            state_name, district_name = keys[i]
+            result = {'state': state_name, 'district': district_name}
+            for name in columns:
+                result[name] = columns[name][j]
+            if trends:
+                result['trends'] = self._district_trends(keys[i], columnar, start, end, bucket)
+            results[i] = result
+        return results
+    
+    def _district_trends(self, key: Tuple[str, str], columnar: bool, start: Optional[pd.Timestamp],
+                         end: Optional[pd.Timestamp], bucket: str) -> Any:
+        # Index rows are already sorted by date
+        positions, labels = self.district_series.select(start, end, bucket, self.district_index.get_bounds(key))
+        rows = self.district_index.positions[positions]
+        enrollments = self.master_data['total_enrollments'].to_numpy()[rows]
+        population = self.master_data['total_population'].to_numpy()[rows]
+        
+        columns = {'date': date_column(labels)}
+        if bucket != 'day':
+            columns['as_of'] = date_column(self.master_data['date'].to_numpy()[rows])
+        columns['enrollments'] = int_column(enrollments)
+        columns['penetration_rate'] = round_column(penetration_rates(enrollments, population), 4)
+        return to_rows(columns, columnar)
     
     def get_district_features_df(self) -> pd.DataFrame:
         return self.district_features
@@ -1,14 +1,24 @@
-import pickle
-from fastapi import FastAPI, HTTPException
+import asyncio
+import math
+import secrets
+import signal
+import threading
+import time
+from datetime import date
+from fastapi import FastAPI, Header, HTTPException, Request, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from typing import Optional
+from pydantic import BaseModel, Field, field_validator, model_validator
+from typing import Any, Dict, List, Literal, Optional
+import pandas as pd
 import uvicorn
 import os
-from pathlib import Path
 
-from analytics_engine import AnalyticsEngine
-from risk_engine import RiskEngine
-from recommendation_engine import RecommendationEngine
+from dataset_snapshot import DatasetSnapshot, LoadProgress, build_snapshot, dataset_source
+from metrics import CONTENT_TYPE, HttpMetrics, MetricsMiddleware, ServerTiming, current_timing, phase
+from response_cache import ResponseCache
+from risk_engine import RISK_COMPONENTS, RISK_THRESHOLDS, RISK_WEIGHTS
+from serialization import render_json
+from single_flight import SingleFlight
 
 app = FastAPI(title="NI³S - National Identity Inclusion Intelligence System")
 
@@ -18,190 +28,480 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["Server-Timing"],
 )
 
+# Per-route latency, size and status counts for /metrics; Server-Timing on every response
+http_metrics = HttpMetrics()
+app.add_middleware(MetricsMiddleware, metrics=http_metrics)
+
 # Global variables
-analytics = None
-risk_engine = None
-recommendation_engine = None
+# The engines for the current dataset; replaced as a whole on reload (see dataset_snapshot.py)
+snapshot: Optional[DatasetSnapshot] = None
 initialization_error = None
+reload_error = None
+reload_lock = threading.Lock()
+# Stage and timings of the latest (or running) snapshot build, reported by /health and /ready
+load_progress: Optional[LoadProgress] = None
 
-@app.on_event("startup")
-async def startup_event():
-    """Load pre-processed data on startup - FAST!"""
-    global analytics, risk_engine, recommendation_engine, initialization_error
+# Load the data in a background thread so the server answers /health while it loads (0 loads before serving)
+BACKGROUND_LOAD = os.getenv('BACKGROUND_LOAD', '1') != '0'
+
+# Poll the processed data for a new version every RELOAD_POLL_SECONDS (0 disables)
+RELOAD_POLL_SECONDS = float(os.getenv('RELOAD_POLL_SECONDS', '0'))
+# Required in X-Admin-Token by POST /api/admin/reload, which is disabled when unset
+ADMIN_TOKEN = os.getenv('ADMIN_TOKEN')
+# Set by gunicorn.conf.py before forking: reloads then happen in the master, which replaces every worker
+gunicorn_master_pid: Optional[int] = None
+
+# Responses that only change when the dataset does
+response_cache = ResponseCache()
+
+# Bounded pool for CPU-heavy handlers; identical concurrent requests share one computation
+compute = SingleFlight(int(os.getenv('COMPUTE_THREADS', '4')))
+
+MAX_BATCH_DISTRICTS = 1000
+# Largest what-if weight, so the weights always have a finite sum
+MAX_RISK_WEIGHT = 1e6
+
+class DistrictKey(BaseModel):
+    state: str
+    district: str
+
+class DistrictBatchRequest(BaseModel):
+    districts: List[DistrictKey] = Field(..., max_length=MAX_BATCH_DISTRICTS)
+    include_trends: bool = True
+    start: Optional[date] = None
+    end: Optional[date] = None
+    bucket: str = Field('day', pattern='^(day|week|month)$')
+    columnar: bool = False
+
+class RiskWeights(BaseModel):
+    penetration_risk: float = Field(RISK_WEIGHTS['penetration_risk'], ge=0, le=MAX_RISK_WEIGHT, allow_inf_nan=False)
+    growth_risk: float = Field(RISK_WEIGHTS['growth_risk'], ge=0, le=MAX_RISK_WEIGHT, allow_inf_nan=False)
+    youth_risk: float = Field(RISK_WEIGHTS['youth_risk'], ge=0, le=MAX_RISK_WEIGHT, allow_inf_nan=False)
+    volatility_risk: float = Field(RISK_WEIGHTS['volatility_risk'], ge=0, le=MAX_RISK_WEIGHT, allow_inf_nan=False)
+    stagnation_risk: float = Field(RISK_WEIGHTS['stagnation_risk'], ge=0, le=MAX_RISK_WEIGHT, allow_inf_nan=False)
     
-    try:
-        print("=== Loading NI³S Pre-processed Data ===")
-        
-        pickle_file = Path("data/processed_data.pkl")
-        
-        if not pickle_file.exists():
-            raise FileNotFoundError(
-                "Processed data file not found. "
-                "Please run preprocess_data.py locally and upload processed_data.pkl"
-            )
-        
-        # Load pre-processed data (should be very fast - seconds instead of minutes)
-        with open(pickle_file, 'rb') as f:
-            data = pickle.load(f)
-        
-        print("  ✓ Loaded processed data")
-        
-        # Initialize analytics with pre-loaded data
-        analytics = AnalyticsEngine(data['master_data'])
-        analytics.district_features = data['district_features']
-        
-        print("  ✓ Analytics engine initialized")
+    @model_validator(mode='after')
+    def positive_sum(self) -> 'RiskWeights':
+        # Weights are divided by their sum, so only their proportions matter
+        total = sum(getattr(self, name) for name in RISK_COMPONENTS)
+        if not 0 < total < math.inf:
+            raise ValueError('weights must have a positive, finite sum')
+        return self
+
+class WhatIfRequest(BaseModel):
+    weights: RiskWeights = RiskWeights()
+    # Upper bounds of Low Risk and Medium Risk
+    thresholds: List[float] = Field(RISK_THRESHOLDS, min_length=2, max_length=2)
+    limit: Optional[int] = Field(50, ge=0)
+    offset: int = Field(0, ge=0)
+    states: Optional[List[str]] = None
+    columnar: bool = False
+    
+    @field_validator('thresholds')
+    @classmethod
+    def ascending_scores(cls, thresholds: List[float]) -> List[float]:
+        if not 0 <= thresholds[0] <= thresholds[1] <= 1:
+            raise ValueError('thresholds must be ascending scores between 0 and 1')
+        return thresholds
+
+def current_snapshot() -> DatasetSnapshot:
+    """The snapshot a request should use throughout, or a 503 while there is none"""
+    snap = snapshot
+    if snap is None:
+        if initialization_error:
+            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
+        progress = load_progress
+        stage = f" ({progress.stage})" if progress is not None else ""
+        raise HTTPException(status_code=503, detail=f"System is still initializing{stage}")
+    return snap
+
+def request_key(request: Request, snap: DatasetSnapshot):
+    return (request.url.path, tuple(sorted(request.query_params.multi_items())), snap.dataset_version, snap.generation)
+
+async def on_pool(key, fn):
+    """fn() on the compute pool (shared by concurrent calls of the same key), timing its phases for this request"""
+    submitted = time.perf_counter()
+    
+    def run():
+        timing = ServerTiming()
+        timing.add('queue', time.perf_counter() - submitted)
+        with timing.activate():
+            return fn(), timing
+    
+    result, timing = await compute.run(key, run)
+    request_timing = current_timing()
+    if request_timing is not None:
+        request_timing.extend(timing)
+    return result
+
+async def cached(request: Request, snap: DatasetSnapshot, build):
+    key = request_key(request, snap)
+    with phase('lookup'):
+        entry = response_cache.lookup(key)
+    request_timing = current_timing()
+    if request_timing is not None:
+        request_timing.cache = 'hit' if entry is not None else 'miss'
+    if entry is None:
+        entry = await on_pool(key, lambda: response_cache.get_or_build(key, build))
+    return response_cache.render(request, entry)
+
+def _render(build):
+    with phase('compute'):
+        data = build()
+    with phase('serialize'):
+        return render_json(data)
+
+async def computed(key, build):
+    """JSON response of build() run on the compute pool, shared by concurrent calls of the same key"""
+    body = await on_pool(key, lambda: _render(build))
+    return Response(content=body, media_type="application/json")
+
+def _timestamp(day: Optional[date]) -> Optional[pd.Timestamp]:
+    return pd.Timestamp(day) if day is not None else None
+
+def reload_data(force: bool = False) -> Dict[str, Any]:
+    """
+    Build a snapshot of the processed data on disk and swap it in.
+    
+    Skipped when the data on disk is what the current snapshot was built from,
+    unless force is set. On failure the current snapshot keeps serving.
+    """
+    global snapshot, initialization_error, reload_error, load_progress
+    
+    with reload_lock:
+        current = snapshot
+        if not force and current is not None and dataset_source() == current.source:
+            return {"status": "unchanged", "dataset_version": current.dataset_version}
         
-        # Initialize other engines
-        risk_engine = RiskEngine(analytics)
-        print("  ✓ Risk engine initialized")
+        try:
+            start = time.perf_counter()
+            load_progress = LoadProgress()
+            new_snapshot = build_snapshot(current.generation + 1 if current is not None else 1, progress=load_progress)
+        except Exception as e:
+            reload_error = f"{'Reload' if current is not None else 'Initialization'} error: {str(e)}"
+            print(f"=== ERROR: {reload_error} ===")
+            return {
+                "status": "failed",
+                "error": reload_error,
+                "dataset_version": current.dataset_version if current is not None else None
+            }
         
-        recommendation_engine = RecommendationEngine()
-        print("  ✓ Recommendation engine initialized")
+        # One reference assignment: requests already running keep the snapshot they took
+        snapshot = new_snapshot
+        initialization_error = None
+        reload_error = None
+        response_cache.clear()
         
         print("=== NI³S System Ready! ===")
-        
-    except Exception as e:
-        error_msg = f"Initialization error: {str(e)}"
-        print(f"=== ERROR: {error_msg} ===")
-        initialization_error = error_msg
+        return {
+            "status": "reloaded",
+            "dataset_version": new_snapshot.dataset_version,
+            "previous_version": current.dataset_version if current is not None else None,
+            "seconds": round(time.perf_counter() - start, 3)
+        }
+
+def load_data():
+    """Load pre-processed data on startup - FAST!"""
+    global initialization_error
+    
+    result = reload_data(force=True)
+    if result["status"] == "failed" and snapshot is None:
         # Don't raise - let the server start but endpoints will return 503
+        initialization_error = result["error"]
+
+def signal_master_reload():
+    """Have the gunicorn master load the data on disk and fork new workers from it (see gunicorn.conf.py)"""
+    os.kill(gunicorn_master_pid, signal.SIGHUP)
+
+def watch_for_new_data():
+    """Poll for a new dataset version: swap it in here, or under gunicorn have the master reload once per version"""
+    signalled = None
+    while True:
+        time.sleep(RELOAD_POLL_SECONDS)
+        try:
+            if gunicorn_master_pid is None:
+                reload_data()
+                continue
+            source = dataset_source()
+            current = snapshot
+            if source != signalled and (current is None or source != current.source):
+                signalled = source
+                signal_master_reload()
+        except Exception as e:
+            print(f"=== ERROR: reload check failed: {e} ===")
+
+@app.on_event("startup")
+async def startup_event():
+    # Under gunicorn (gunicorn.conf.py) the master has already loaded the data before forking
+    if snapshot is None and initialization_error is None:
+        if BACKGROUND_LOAD:
+            # Serve /health right away; data endpoints return 503 and /ready reports progress until loaded
+            threading.Thread(target=load_data, name='dataset-loader', daemon=True).start()
+        else:
+            load_data()
+    # Under gunicorn the master polls instead, so that every worker moves to a new version together
+    if RELOAD_POLL_SECONDS > 0 and gunicorn_master_pid is None:
+        threading.Thread(target=watch_for_new_data, name='dataset-watcher', daemon=True).start()
 
 @app.get("/")
 def root():
     """Root endpoint"""
     return {
         "system": "NI³S - National Identity Inclusion Intelligence System",
-        "status": "operational" if analytics is not None else "initializing" if initialization_error is None else "error",
+        "status": "operational" if snapshot is not None else "initializing" if initialization_error is None else "error",
         "version": "1.0.0",
-        "data_loaded": analytics is not None,
+        "data_loaded": snapshot is not None,
         "error": initialization_error if initialization_error else None
     }
 
-@app.get("/health")
-def health_check():
-    """Health check endpoint"""
+def server_status() -> Dict[str, Any]:
+    """What /health and /ready report (also the gunicorn master's while it preloads)"""
+    snap = snapshot
+    progress = load_progress
     return {
-        "status": "healthy" if analytics is not None else "unhealthy",
+        "status": "healthy" if snap is not None else "loading" if initialization_error is None else "unhealthy",
         "server": "running",
-        "data_loaded": analytics is not None,
-        "error": initialization_error if initialization_error else None
+        "data_loaded": snap is not None,
+        "dataset_version": snap.dataset_version if snap is not None else None,
+        "loaded_at": snap.loaded_at if snap is not None else None,
+        "load_progress": progress.report() if progress is not None else None,
+        "error": initialization_error if initialization_error else None,
+        "reload_error": reload_error
     }
 
+@app.get("/health")
+def health_check():
+    """Liveness: the server is up, whether or not the data has finished loading"""
+    return server_status()
+
+@app.get("/ready")
+def readiness_check(response: Response):
+    """Readiness: 200 once a dataset is being served, 503 (with load progress) until then"""
+    status = server_status()
+    if not status["data_loaded"]:
+        response.status_code = 503
+    return status
+
+@app.post("/api/admin/reload")
+async def reload_dataset(force: bool = False, x_admin_token: Optional[str] = Header(None)):
+    """Load a new dataset version in the background and swap it in without dropping requests"""
+    if not ADMIN_TOKEN:
+        raise HTTPException(status_code=403, detail="Reload endpoint is disabled; set ADMIN_TOKEN to enable it")
+    if x_admin_token is None or not secrets.compare_digest(x_admin_token, ADMIN_TOKEN):
+        raise HTTPException(status_code=401, detail="Invalid admin token")
+    
+    if gunicorn_master_pid is not None:
+        # A snapshot built in one worker would serve only that worker, unshared: the master reloads instead
+        current = snapshot
+        if not force and current is not None and await asyncio.to_thread(dataset_source) == current.source:
+            return {"status": "unchanged", "dataset_version": current.dataset_version}
+        signal_master_reload()
+        return {"status": "reloading", "dataset_version": current.dataset_version if current is not None else None}
+    
+    # Built off the event loop, so requests keep being served from the current snapshot meanwhile
+    result = await asyncio.to_thread(reload_data, force)
+    if result["status"] == "failed":
+        raise HTTPException(status_code=500, detail=result["error"])
+    return result
+
 @app.get("/api/national/overview")
-def get_national_overview():
-    if analytics is None:
-        if initialization_error:
-            raise HTTPException(
-                status_code=503, 
-                detail=f"System initialization failed: {initialization_error}"
-            )
-        raise HTTPException(
-            status_code=503, 
-            detail="System is still initializing"
-        )
+async def get_national_overview(request: Request):
+    snap = current_snapshot()
     
-    return analytics.get_national_overview()
+    return await cached(request, snap, snap.analytics.get_national_overview)
 
 @app.get("/api/national/trends")
-def get_national_trends():
-    if analytics is None:
-        if initialization_error:
-            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
-        raise HTTPException(status_code=503, detail="System is still initializing")
+async def get_national_trends(request: Request, columnar: bool = False, start: Optional[date] = None,
+                        end: Optional[date] = None, bucket: str = Query('day', pattern='^(day|week|month)$')):
+    snap = current_snapshot()
+    
+    return await cached(request, snap, lambda: snap.analytics.get_national_trends(columnar, _timestamp(start), _timestamp(end), bucket))
+
+@app.get("/api/rollup")
+async def get_rollup(request: Request, start: Optional[date] = None, end: Optional[date] = None,
+               states: Optional[List[str]] = Query(None),
+               group_by: str = Query('date', pattern='^(date|state|district|total)$'),
+               columnar: bool = False):
+    """Date-range / state-subset aggregates from the rollup cube (repeat states= for several)"""
+    snap = current_snapshot()
     
-    return analytics.get_national_trends()
+    return await cached(request, snap, lambda: snap.analytics.get_rollup(_timestamp(start), _timestamp(end), states, group_by, columnar))
 
 @app.get("/api/states")
 def get_states():
-    if analytics is None:
-        if initialization_error:
-            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
-        raise HTTPException(status_code=503, detail="System is still initializing")
+    snap = current_snapshot()
     
-    return analytics.get_states_list()
+    return snap.analytics.get_states_list()
 
 @app.get("/api/states/{state_name}/districts")
 def get_districts(state_name: str):
-    if analytics is None:
-        if initialization_error:
-            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
-        raise HTTPException(status_code=503, detail="System is still initializing")
+    snap = current_snapshot()
     
-    return analytics.get_districts_by_state(state_name)
+    return snap.analytics.get_districts_by_state(state_name)
 
 @app.get("/api/states/{state_name}/overview")
 def get_state_overview(state_name: str):
-    if analytics is None:
-        if initialization_error:
-            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
-        raise HTTPException(status_code=503, detail="System is still initializing")
+    snap = current_snapshot()
     
-    return analytics.get_state_overview(state_name)
+    return snap.analytics.get_state_overview(state_name)
 
 @app.get("/api/districts/{state_name}/{district_name}")
-def get_district_analytics(state_name: str, district_name: str):
-    if analytics is None or risk_engine is None or recommendation_engine is None:
-        if initialization_error:
-            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
-        raise HTTPException(status_code=503, detail="System is still initializing")
+async def get_district_analytics(request: Request, state_name: str, district_name: str, columnar: bool = False,
+                           start: Optional[date] = None, end: Optional[date] = None,
+                           bucket: str = Query('day', pattern='^(day|week|month)$')):
+    snap = current_snapshot()
     
-    district_data = analytics.get_district_analytics(state_name, district_name)
-    risk_score = risk_engine.get_district_risk_score(state_name, district_name)
-    recommendations = recommendation_engine.generate_recommendations(district_data, risk_score)
+    def build():
+        with phase('analytics'):
+            district_data = snap.analytics.get_district_analytics(
+                state_name, district_name, columnar, _timestamp(start), _timestamp(end), bucket
+            )
+        with phase('risk'):
+            risk_score = snap.risk_engine.get_district_risk_score(state_name, district_name)
+        with phase('recommendations'):
+            recommendations = snap.recommendation_engine.get_district_recommendations(
+                snap.risk_engine, [(state_name, district_name)]
+            )[0]
+        return {
+            "analytics": district_data,
+            "risk": risk_score,
+            "recommendations": recommendations
+        }
     
-    return {
-        "analytics": district_data,
-        "risk": risk_score,
-        "recommendations": recommendations
-    }
+    return await computed(request_key(request, snap), build)
+
+SORT_PATTERN = '^(risk_score|penetration_rate|youth_inclusion_rate|total_population|state|district)$'
+RiskCategory = Literal['Low Risk', 'Medium Risk', 'High Risk']
+
+@app.post("/api/districts/batch")
+async def get_districts_batch(batch: DistrictBatchRequest):
+    """Analytics, risk and recommendations for many districts in one round-trip"""
+    snap = current_snapshot()
+    
+    def build():
+        keys = [(item.state, item.district) for item in batch.districts]
+        with phase('analytics'):
+            district_data = snap.analytics.get_districts_analytics(
+                keys, batch.columnar, _timestamp(batch.start), _timestamp(batch.end), batch.bucket, batch.include_trends
+            )
+        with phase('risk'):
+            risk_scores = snap.risk_engine.get_district_risk_scores(keys)
+        with phase('recommendations'):
+            recommendations = snap.recommendation_engine.get_district_recommendations(snap.risk_engine, keys)
+        
+        districts = [
+            {
+                "analytics": data,
+                "risk": risk,
+                "recommendations": recommendation
+            }
+            for data, risk, recommendation in zip(district_data, risk_scores, recommendations)
+        ]
+        return {
+            "districts": districts,
+            "count": len(districts),
+            "not_found": sum('error' in data for data in district_data)
+        }
+    
+    # Bodies differ from call to call, so batches share the pool but are never coalesced
+    return await computed(None, build)
 
 @app.get("/api/risk/rankings")
-def get_risk_rankings(limit: Optional[int] = 50):
-    if risk_engine is None:
-        if initialization_error:
-            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
-        raise HTTPException(status_code=503, detail="System is still initializing")
+async def get_risk_rankings(request: Request, limit: Optional[int] = Query(50, ge=1), columnar: bool = False,
+                      offset: int = Query(0, ge=0), cursor: Optional[int] = Query(None, ge=0),
+                      sort_by: str = Query('risk_score', pattern=SORT_PATTERN),
+                      order: str = Query('desc', pattern='^(asc|desc)$'),
+                      states: Optional[List[str]] = Query(None),
+                      risk_category: Optional[List[RiskCategory]] = Query(None),
+                      min_score: Optional[float] = None, max_score: Optional[float] = None):
+    """Risk-ranked districts, one page at a time (follow pagination.next_cursor for the next page)"""
+    snap = current_snapshot()
+    
+    return await computed(request_key(request, snap), lambda: snap.risk_engine.get_top_risk_districts(
+        limit, columnar, offset, cursor, sort_by, order, states, risk_category, min_score, max_score
+    ))
+
+@app.post("/api/risk/what-if")
+async def get_risk_what_if(request: Request, scenario: WhatIfRequest):
+    """Re-score, re-categorize and re-rank every district under other weights and thresholds"""
+    snap = current_snapshot()
+    weights = [getattr(scenario.weights, name) for name in RISK_COMPONENTS]
+    key = (request.url.path, scenario.model_dump_json(), snap.dataset_version, snap.generation)
     
-    return risk_engine.get_top_risk_districts(limit)
+    return await computed(key, lambda: snap.risk_engine.what_if(
+        weights, scenario.thresholds, scenario.limit, scenario.offset, scenario.states, scenario.columnar
+    ))
 
 @app.get("/api/risk/heatmap")
-def get_risk_heatmap():
-    if risk_engine is None:
-        if initialization_error:
-            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
-        raise HTTPException(status_code=503, detail="System is still initializing")
+async def get_risk_heatmap(request: Request, columnar: bool = False, limit: Optional[int] = Query(None, ge=1),
+                     offset: int = Query(0, ge=0), cursor: Optional[int] = Query(None, ge=0),
+                     sort_by: str = Query('state', pattern=SORT_PATTERN),
+                     order: str = Query('asc', pattern='^(asc|desc)$'),
+                     states: Optional[List[str]] = Query(None),
+                     risk_category: Optional[List[RiskCategory]] = Query(None),
+                     min_score: Optional[float] = None, max_score: Optional[float] = None):
+    snap = current_snapshot()
     
-    return risk_engine.get_heatmap_data()
+    return await cached(request, snap, lambda: snap.risk_engine.get_heatmap_data(
+        columnar, limit, offset, cursor, sort_by, order, states, risk_category, min_score, max_score
+    ))
 
 @app.get("/api/risk/distribution")
-def get_risk_distribution():
-    if risk_engine is None:
-        if initialization_error:
-            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
-        raise HTTPException(status_code=503, detail="System is still initializing")
+async def get_risk_distribution(request: Request):
+    snap = current_snapshot()
+    
+    return await cached(request, snap, snap.risk_engine.get_risk_distribution)
+
+@app.get("/api/recommendations/summary")
+async def get_recommendation_summary(request: Request):
+    snap = current_snapshot()
     
-    return risk_engine.get_risk_distribution()
+    return await cached(request, snap, lambda: snap.recommendation_engine.get_rule_summary(snap.risk_engine))
 
 @app.get("/api/insights/policy")
 def get_policy_insights():
-    if analytics is None or risk_engine is None or recommendation_engine is None:
-        if initialization_error:
-            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
-        raise HTTPException(status_code=503, detail="System is still initializing")
+    snap = current_snapshot()
     
-    return recommendation_engine.generate_policy_insights(analytics, risk_engine)
+    # Materialized at startup; only generated_at changes between calls
+    return snap.recommendation_engine.generate_policy_insights(snap.analytics, snap.risk_engine)
 
 @app.get("/api/insights/state/{state_name}")
 def get_state_insights(state_name: str):
-    if analytics is None or risk_engine is None or recommendation_engine is None:
-        if initialization_error:
-            raise HTTPException(status_code=503, detail=f"System initialization failed: {initialization_error}")
-        raise HTTPException(status_code=503, detail="System is still initializing")
+    snap = current_snapshot()
     
-    return recommendation_engine.generate_state_insights(state_name, analytics, risk_engine)
+    return snap.recommendation_engine.generate_state_insights(state_name, snap.analytics, snap.risk_engine)
+
+@app.get("/api/system/stats")
+def get_system_stats():
+    """Compute pool queue depth and coalescing counters, and response cache hit rates"""
+    return {
+        "compute": compute.stats(),
+        "response_cache": response_cache.stats()
+    }
+
+@app.get("/metrics")
+def get_metrics():
+    """Request, response cache and compute pool metrics in Prometheus text format (per worker process)"""
+    cache = response_cache.stats()
+    pool = compute.stats()
+    lookups = cache['hits'] + cache['misses']
+    snap = snapshot
+    return Response(content=http_metrics.render([
+        ('ni3s_response_cache_hits_total', 'counter', 'Response cache hits', cache['hits']),
+        ('ni3s_response_cache_misses_total', 'counter', 'Response cache misses', cache['misses']),
+        ('ni3s_response_cache_hit_ratio', 'gauge', 'Response cache hits per lookup', cache['hits'] / lookups if lookups else 0),
+        ('ni3s_response_cache_entries', 'gauge', 'Responses held in the response cache', cache['entries']),
+        ('ni3s_compute_queue_depth', 'gauge', 'Computations waiting for a compute thread', pool['queue_depth']),
+        ('ni3s_compute_running', 'gauge', 'Computations running on the compute pool', pool['running']),
+        ('ni3s_compute_calls_total', 'counter', 'Calls submitted to the compute pool', pool['calls']),
+        ('ni3s_compute_coalesced_total', 'counter', 'Calls that shared an identical in-flight computation', pool['coalesced']),
+        ('ni3s_compute_failures_total', 'counter', 'Computations that raised', pool['failures']),
+        ('ni3s_dataset_loaded', 'gauge', 'Whether a dataset is being served', int(snap is not None)),
+        ('ni3s_dataset_generation', 'gauge', 'Dataset loads since startup', snap.generation if snap is not None else 0),
+    ]), media_type=CONTENT_TYPE)
 
 if __name__ == "__main__":
     port = int(os.getenv("PORT", 8000))
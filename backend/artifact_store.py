@@ -0,0 +1,223 @@
+"""
+Columnar artifact store for pre-processed NI³S data.
+
+Each table is saved as one NumPy .npy file per column inside a versioned
+directory, described by a JSON manifest:
+
+    data/processed/
+        CURRENT                      <- name of the active version directory
+        <dataset_version>/
+            manifest.json
+            master_data/<column>.npy
+            district_features/<column>.npy
+
+String columns are dictionary-encoded (int32 codes + a fixed-width unicode
+categories file) so every file can be memory-mapped; categorical columns keep
+their own codes and load back as categoricals. Loading maps the files
+read-only instead of reading them into process memory, so several server
+workers share the same page cache.
+"""
+
+import hashlib
+import json
+import os
+import shutil
+import tempfile
+import pandas as pd
+import numpy as np
+from pathlib import Path
+from typing import Dict, Any, List, Optional
+
+FORMAT_VERSION = 1
+MANIFEST_FILE = "manifest.json"
+CURRENT_FILE = "CURRENT"
+DEFAULT_ARTIFACT_DIR = Path("data/processed")
+
+
+class ArtifactError(Exception):
+    pass
+
+
+def _encode_column(series: pd.Series) -> Dict[str, Any]:
+    """Split a column into memory-mappable arrays plus its manifest entry"""
+    if isinstance(series.dtype, pd.CategoricalDtype):
+        return {
+            'kind': 'category',
+            'dtype': 'category',
+            'values': series.cat.codes.to_numpy(),
+            'categories': series.cat.categories.to_numpy().astype(str)
+        }
+
+    if series.dtype == object:
+        codes, categories = pd.factorize(series, sort=True)
+        return {
+            'kind': 'category',
+            'dtype': 'object',
+            'values': codes.astype(np.int32),
+            'categories': np.asarray(categories, dtype=str)
+        }
+
+    return {
+        'kind': 'array',
+        'dtype': str(series.dtype),
+        'values': series.to_numpy()
+    }
+
+
+def _decode_column(values: np.ndarray, entry: Dict[str, Any], categories: Optional[np.ndarray],
+                   dictionaries: Dict[bytes, pd.CategoricalDtype]) -> Any:
+    if entry['kind'] == 'array':
+        return values
+
+    # Columns with identical categories (e.g. state in every table) share one dictionary
+    key = categories.dtype.str.encode() + categories.tobytes()
+    if key not in dictionaries:
+        dictionaries[key] = pd.CategoricalDtype(pd.Index(categories.astype(object)))
+    column = pd.Categorical.from_codes(values, dtype=dictionaries[key], validate=False)
+    if entry['dtype'] == 'object':
+        return np.asarray(column.astype(object))
+    return column
+
+
+def save_artifact(tables: Dict[str, pd.DataFrame], artifact_dir: Path = DEFAULT_ARTIFACT_DIR,
+                  keep_versions: int = 2, metadata: Optional[Dict[str, Any]] = None) -> str:
+    """
+    Write tables as a new artifact version and make it current.
+
+    metadata (JSON-serializable) is stored in the manifest as-is.
+    Returns the dataset version, a content hash of every column written.
+    """
+    artifact_dir = Path(artifact_dir)
+    artifact_dir.mkdir(parents=True, exist_ok=True)
+
+    staging = Path(tempfile.mkdtemp(prefix=".staging-", dir=artifact_dir))
+    digest = hashlib.sha256()
+    manifest = {'format_version': FORMAT_VERSION, 'tables': {}, 'metadata': metadata or {}}
+
+    try:
+        for table_name, df in tables.items():
+            table_dir = staging / table_name
+            table_dir.mkdir()
+            columns = []
+
+            for column_name in df.columns:
+                encoded = _encode_column(df[column_name])
+                entry = {'name': column_name, 'kind': encoded['kind'], 'dtype': encoded['dtype']}
+
+                # Column names are used as file names, index keeps them unique and safe
+                entry['file'] = f"{len(columns):03d}.npy"
+                values = np.ascontiguousarray(encoded['values'])
+                # pandas attaches (empty) dtype metadata to datetimes, which .npy cannot store
+                values = values.view(np.dtype(values.dtype.str))
+                np.save(table_dir / entry['file'], values, allow_pickle=False)
+                digest.update(f"{table_name}/{column_name}/{values.dtype.str}".encode())
+                digest.update(values.tobytes())
+
+                if 'categories' in encoded:
+                    entry['categories_file'] = f"{len(columns):03d}.categories.npy"
+                    np.save(table_dir / entry['categories_file'], encoded['categories'], allow_pickle=False)
+                    digest.update(encoded['categories'].tobytes())
+
+                columns.append(entry)
+
+            manifest['tables'][table_name] = {'rows': len(df), 'columns': columns}
+
+        dataset_version = digest.hexdigest()[:16]
+        manifest['dataset_version'] = dataset_version
+        manifest['created_at'] = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+
+        with open(staging / MANIFEST_FILE, 'w') as f:
+            json.dump(manifest, f, indent=2)
+
+        version_dir = artifact_dir / dataset_version
+        if version_dir.exists():
+            # Same data: keep the existing files but take the new manifest and its metadata
+            os.replace(staging / MANIFEST_FILE, version_dir / MANIFEST_FILE)
+            shutil.rmtree(staging)
+        else:
+            os.rename(staging, version_dir)
+    except Exception:
+        shutil.rmtree(staging, ignore_errors=True)
+        raise
+
+    # Switch the CURRENT pointer atomically so readers never see a partial artifact
+    pointer_tmp = artifact_dir / f".{CURRENT_FILE}.tmp"
+    pointer_tmp.write_text(dataset_version)
+    os.replace(pointer_tmp, artifact_dir / CURRENT_FILE)
+
+    _prune_versions(artifact_dir, dataset_version, keep_versions)
+    return dataset_version
+
+
+def _prune_versions(artifact_dir: Path, current: str, keep_versions: int):
+    versions = [
+        p for p in artifact_dir.iterdir()
+        if p.is_dir() and not p.name.startswith('.') and (p / MANIFEST_FILE).exists()
+    ]
+    versions.sort(key=lambda p: p.stat().st_mtime, reverse=True)
+
+    previous = [p for p in versions if p.name != current]
+    for version_dir in previous[max(keep_versions - 1, 0):]:
+        # Open memory maps in running workers stay valid after unlinking
+        shutil.rmtree(version_dir, ignore_errors=True)
+
+
+def current_version_dir(artifact_dir: Path = DEFAULT_ARTIFACT_DIR) -> Path:
+    artifact_dir = Path(artifact_dir)
+    pointer = artifact_dir / CURRENT_FILE
+    if not pointer.exists():
+        raise ArtifactError(f"No artifact found in {artifact_dir}")
+    return artifact_dir / pointer.read_text().strip()
+
+
+def read_manifest(version_dir: Path) -> Dict[str, Any]:
+    with open(Path(version_dir) / MANIFEST_FILE) as f:
+        manifest = json.load(f)
+
+    if manifest.get('format_version') != FORMAT_VERSION:
+        raise ArtifactError(
+            f"Unsupported artifact format {manifest.get('format_version')} "
+            f"(expected {FORMAT_VERSION}). Re-run preprocess.py."
+        )
+    return manifest
+
+
+def load_artifact(artifact_dir: Path = DEFAULT_ARTIFACT_DIR, mmap: bool = True,
+                  tables: Optional[List[str]] = None) -> Dict[str, Any]:
+    """
+    Load the current artifact version.
+
+    Returns a dict with one DataFrame per table (all tables, or only those
+    named in tables) plus 'dataset_version' and 'metadata'.
+    Numeric columns are read-only memory maps when mmap is True.
+    """
+    version_dir = current_version_dir(artifact_dir)
+    manifest = read_manifest(version_dir)
+    mmap_mode = 'r' if mmap else None
+
+    result: Dict[str, Any] = {
+        'dataset_version': manifest['dataset_version'],
+        'metadata': manifest.get('metadata', {})
+    }
+    dictionaries: Dict[bytes, pd.CategoricalDtype] = {}
+
+    for table_name, table in manifest['tables'].items():
+        if tables is not None and table_name not in tables:
+            continue
+        table_dir = version_dir / table_name
+        columns = {}
+
+        for entry in table['columns']:
+            values = np.load(table_dir / entry['file'], mmap_mode=mmap_mode, allow_pickle=False)
+            if isinstance(values, np.memmap):
+                # Plain ndarray view over the same mapping, so results are never memmap subclasses
+                values = values.view(np.ndarray)
+            categories = None
+            if 'categories_file' in entry:
+                categories = np.load(table_dir / entry['categories_file'], allow_pickle=False)
+            columns[entry['name']] = _decode_column(values, entry, categories, dictionaries)
+
+        # copy=False keeps the memory-mapped arrays as the frame's backing storage
+        result[table_name] = pd.DataFrame(columns, copy=False)
+
+    return result
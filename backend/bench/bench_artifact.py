@@ -0,0 +1,115 @@
+"""
+Benchmark processed-data loading: pickle vs memory-mapped columnar artifact.
+
+Each measurement runs in a fresh subprocess and reports load time, the time
+to build the engines on top, and resident memory split into private pages
+(per worker) and shared file-backed pages (page cache, shared across workers).
+
+Run from the backend directory:
+    python bench/bench_artifact.py --sizes 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import pickle
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from artifact_store import save_artifact, load_artifact
+from feature_engine import compute_district_features
+from synthetic import make_master_data
+
+
+def memory_kb() -> dict:
+    """Resident memory of this process from /proc (Linux only)"""
+    fields = {}
+    with open('/proc/self/smaps_rollup') as f:
+        for line in f:
+            parts = line.split()
+            if len(parts) >= 2 and parts[1].isdigit():
+                fields[parts[0].rstrip(':')] = int(parts[1])
+    return {
+        'rss': fields.get('Rss', 0),
+        'private': fields.get('Private_Clean', 0) + fields.get('Private_Dirty', 0),
+        'file_backed': fields.get('Rss', 0) - fields.get('Anonymous', 0)
+    }
+
+
+def child(fmt: str, path: str):
+    from analytics_engine import AnalyticsEngine
+    from risk_engine import RiskEngine
+
+    before = memory_kb()
+    start = time.perf_counter()
+    if fmt == 'pickle':
+        with open(path, 'rb') as f:
+            data = pickle.load(f)
+    else:
+        data = load_artifact(Path(path))
+    load_time = time.perf_counter() - start
+    loaded = memory_kb()
+
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        analytics = AnalyticsEngine.from_precomputed(data['master_data'], data['district_features'])
+        RiskEngine(analytics)
+        analytics.get_national_trends()
+    engines_time = time.perf_counter() - start
+    ready = memory_kb()
+
+    print(json.dumps({
+        'load_s': load_time,
+        'engines_s': engines_time,
+        'loaded_mb': {k: (loaded[k] - before[k]) / 1024 for k in loaded},
+        'ready_mb': {k: (ready[k] - before[k]) / 1024 for k in ready}
+    }))
+
+
+def run_child(fmt: str, path: Path) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, '--child', fmt, str(path)],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[10_000, 100_000])
+    parser.add_argument('--dates', type=int, default=30)
+    parser.add_argument('--child', nargs=2, metavar=('FORMAT', 'PATH'), help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'districts':>10} {'format':>8} {'load s':>8} {'engines s':>10} "
+          f"{'rss MB':>8} {'private MB':>11} {'shared file MB':>15}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            master_data = make_master_data(size, args.dates)
+            tables = {'master_data': master_data, 'district_features': compute_district_features(master_data)}
+
+            pickle_file = Path(tmp) / f"processed_data_{size}.pkl"
+            with open(pickle_file, 'wb') as f:
+                pickle.dump(tables, f, protocol=pickle.HIGHEST_PROTOCOL)
+            artifact_dir = Path(tmp) / f"processed_{size}"
+            save_artifact(tables, artifact_dir)
+
+            for fmt, path in (('pickle', pickle_file), ('artifact', artifact_dir)):
+                result = run_child(fmt, path)
+                ready = result['ready_mb']
+                print(f"{size:>10} {fmt:>8} {result['load_s']:>8.3f} {result['engines_s']:>10.3f} "
+                      f"{ready['rss']:>8.1f} {ready['private']:>11.1f} {ready['file_backed']:>15.1f}")
+
+
+if __name__ == '__main__':
+    main()
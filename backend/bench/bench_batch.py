@@ -0,0 +1,71 @@
+"""
+Benchmark POST /api/districts/batch against one GET per district.
+
+Writes a synthetic artifact, starts the app on it in-process (TestClient) and
+times fetching N districts both ways, with and without trends. The batch
+response must match the single-district responses item for item.
+Run from the backend directory:
+    python bench/bench_batch.py [--districts 5000] [--batch 100 1000]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from synthetic import write_processed_artifact
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--districts', type=int, default=5_000)
+    parser.add_argument('--batch', type=int, nargs='+', default=[100, 1_000])
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_processed_artifact(Path(tmp), args.districts)
+        os.chdir(tmp)
+
+        from fastapi.testclient import TestClient
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app as app_module
+            client = TestClient(app_module.app)
+            client.__enter__()
+            # The data loads in the background once the app starts
+            while client.get('/ready').status_code != 200:
+                time.sleep(0.1)
+
+        keys = [(s, d) for s, d in app_module.snapshot.analytics.district_index.labels()]
+        print(f"{'districts':>9} {'trends':<6} {'GET each s':>10} {'batch s':>8} {'speedup':>8} {'batch MB':>9}  identical")
+        for size in args.batch:
+            picked = keys[:size]
+            for trends in (True, False):
+                start = time.perf_counter()
+                singles = [client.get(f"/api/districts/{s}/{d}").json() for s, d in picked]
+                single_s = time.perf_counter() - start
+
+                start = time.perf_counter()
+                response = client.post('/api/districts/batch', json={
+                    'districts': [{'state': s, 'district': d} for s, d in picked],
+                    'include_trends': trends
+                })
+                batch_s = time.perf_counter() - start
+
+                items = response.json()['districts']
+                if not trends:
+                    for item in singles:
+                        item['analytics'].pop('trends', None)
+                identical = json.dumps(items) == json.dumps(singles)
+                print(f"{size:>9,} {str(trends):<6} {single_s:>10.2f} {batch_s:>8.3f} {single_s / batch_s:>7.0f}x "
+                      f"{len(response.content) / 2**20:>9.2f}  {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark bursts of identical requests with and without single-flight coalescing.
+
+Writes a synthetic artifact and loads the app on it, then for each endpoint
+fires a burst of identical concurrent requests at a cold response cache. The
+burst runs once on a 40-thread pool without coalescing (like Starlette's
+default threadpool) and once on the app's bounded, coalescing pool. Reports
+wall time, how many times the handler actually ran, the peak queue depth, and
+whether every response in the burst was identical.
+Run from the backend directory:
+    python bench/bench_coalescing.py [--districts 20000] [--burst 32]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from single_flight import SingleFlight
+from synthetic import write_processed_artifact
+
+PATHS = [
+    '/api/rollup?group_by=district',
+    '/api/risk/heatmap',
+    '/api/national/trends?bucket=week',
+    '/api/risk/rankings?states=State%200001&sort_by=district&limit=500',
+]
+
+
+async def burst(app, path: str, size: int) -> tuple:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench') as client:
+        start = time.perf_counter()
+        responses = await asyncio.gather(*(client.get(path) for _ in range(size)))
+        elapsed = time.perf_counter() - start
+    bodies = {response.content for response in responses}
+    return elapsed, all(response.status_code == 200 for response in responses) and len(bodies) == 1
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--districts', type=int, default=20_000)
+    parser.add_argument('--burst', type=int, default=32)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_processed_artifact(Path(tmp), args.districts)
+        os.chdir(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app as app_module
+            app_module.load_data()
+
+        pools = {
+            '40 threads': lambda: SingleFlight(40, coalesce=False),
+            'single-flight': lambda: SingleFlight(app_module.compute.max_workers),
+        }
+        print(f"{args.districts:,} districts, bursts of {args.burst} identical requests, cold cache")
+        print(f"  {'path':<58} {'pool':<14} {'ms':>7} {'runs':>5} {'max queue':>10}  identical")
+        for path in PATHS:
+            for name, pool in pools.items():
+                app_module.compute = pool()
+                app_module.response_cache.clear()
+                elapsed, identical = asyncio.run(burst(app_module.app, path, args.burst))
+                stats = app_module.compute.stats()
+                print(f"  {path:<58} {name:<14} {elapsed * 1000:>7.0f} {stats['executions']:>5} "
+                      f"{stats['max_queue_depth']:>10}  {identical}")
+
+
+if __name__ == '__main__':
+    main()
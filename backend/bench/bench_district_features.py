@@ -0,0 +1,104 @@
+"""
+Benchmark district feature computation: per-district loop vs columnar engine.
+
+Run from the backend directory:
+    python bench/bench_district_features.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+import pandas as pd
+import numpy as np
+from scipy.stats import linregress
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from feature_engine import compute_district_features
+from synthetic import make_master_data
+
+
+def legacy_district_features(master_data: pd.DataFrame) -> pd.DataFrame:
+    """The per-district groupby loop formerly in AnalyticsEngine, kept as the reference"""
+    features_list = []
+
+    for (state, district), group in master_data.groupby(['state', 'district']):
+        group_sorted = group.sort_values('date')
+        latest_record = group_sorted.iloc[-1]
+
+        youth_population = latest_record['demo_age_5_17']
+        youth_inclusion_rate = latest_record['age_5_17'] / youth_population if youth_population > 0 else 0
+        youth_inclusion_rate = min(youth_inclusion_rate, 1.0)
+
+        adult_population = latest_record['demo_age_17_']
+        adult_inclusion_rate = latest_record['age_18_greater'] / adult_population if adult_population > 0 else 0
+        adult_inclusion_rate = min(adult_inclusion_rate, 1.0)
+
+        y = group_sorted['total_enrollments'].values
+        growth_slope = 0
+        growth_volatility = 0
+        stagnation_periods = 0
+
+        if len(y) >= 2:
+            if np.std(y) > 0:
+                growth_slope = linregress(np.arange(len(y)), y).slope
+
+            growth_rates = [(y[i] - y[i-1]) / y[i-1] for i in range(1, len(y)) if y[i-1] > 0]
+            if growth_rates:
+                growth_volatility = np.std(growth_rates)
+            if len(y) >= 3:
+                stagnation_periods = sum(1 for rate in growth_rates if abs(rate) < 0.01)
+
+        features_list.append({
+            'state': state,
+            'district': district,
+            'total_enrollments': int(latest_record['total_enrollments']),
+            'total_population': int(latest_record['total_population']),
+            'avg_penetration_rate': group['penetration_rate'].mean(),
+            'latest_penetration_rate': latest_record['penetration_rate'],
+            'youth_inclusion_rate': youth_inclusion_rate,
+            'adult_inclusion_rate': adult_inclusion_rate,
+            'youth_adult_gap': abs(youth_inclusion_rate - adult_inclusion_rate),
+            'growth_slope': growth_slope,
+            'growth_volatility': growth_volatility,
+            'stagnation_periods': stagnation_periods,
+            'time_span_days': (group_sorted['date'].max() - group_sorted['date'].min()).days,
+            'data_points': len(group)
+        })
+
+    return pd.DataFrame(features_list)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--dates', type=int, default=30)
+    parser.add_argument('--skip-legacy-above', type=int, default=None,
+                        help='only time the columnar engine for larger sizes')
+    args = parser.parse_args()
+
+    print(f"{'districts':>10} {'rows':>10} {'legacy s':>10} {'columnar s':>11} {'speedup':>8}  identical")
+    for size in args.sizes:
+        master_data = make_master_data(size, args.dates)
+        columnar, columnar_time = timed(compute_district_features, master_data)
+
+        if args.skip_legacy_above is not None and size > args.skip_legacy_above:
+            print(f"{size:>10} {len(master_data):>10} {'-':>10} {columnar_time:>11.3f} {'-':>8}  -")
+            continue
+
+        legacy, legacy_time = timed(legacy_district_features, master_data)
+        identical = legacy.equals(columnar) and (legacy.dtypes == columnar.dtypes).all()
+        print(f"{size:>10} {len(master_data):>10} {legacy_time:>10.3f} {columnar_time:>11.3f} "
+              f"{legacy_time / columnar_time:>7.1f}x  {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,87 @@
+"""
+Benchmark incremental preprocessing: fold a daily CSV drop into an artifact vs a full rebuild.
+
+Builds an artifact from synthetic inputs the size of the real files, adds a
+daily DEMOGRAPHIC_*/ENROLLMENT_* drop (one date already present, one new) and
+times `preprocess.py --incremental` against a full rebuild. Both artifacts
+must have the same dataset version (a content hash of every table). Risk
+scores are not stored in the artifact: the server scores every district
+when it loads one.
+Run from the backend directory:
+    python bench/bench_incremental.py [--data-dir /tmp/ni3s-raw] [--drop-rows 30000]
+"""
+
+import argparse
+import contextlib
+import io
+import shutil
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from data_pipeline import DEMOGRAPHIC_PATTERN, ENROLLMENT_PATTERN, discover_input_files
+from preprocess import build_full, build_incremental
+from synthetic import write_raw_csvs
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def add_daily_drop(data_dir: Path, rows: int, drop: int):
+    """Write the next DEMOGRAPHIC_n/ENROLLMENT_n files, covering the last known date and the day after"""
+    # The base inputs end on 2025-05-29
+    start_date = pd.Timestamp('2025-05-29') + pd.Timedelta(days=drop - 1)
+    with tempfile.TemporaryDirectory() as tmp:
+        write_raw_csvs(tmp, demographic_rows=rows, enrollment_rows=rows // 2, num_dates=2,
+                       start_date=start_date, seed=drop, demographic_files=1, enrollment_files=1)
+        for prefix, pattern in (('DEMOGRAPHIC', DEMOGRAPHIC_PATTERN), ('ENROLLMENT', ENROLLMENT_PATTERN)):
+            number = len(discover_input_files(data_dir, pattern)) + 1
+            shutil.move(Path(tmp) / f"{prefix}_1.csv", data_dir / f"{prefix}_{number}.csv")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', type=Path, default=None, help='reuse (or create) base raw CSVs here')
+    parser.add_argument('--drop-rows', type=int, default=30_000, help='demographic rows per daily drop')
+    parser.add_argument('--drops', type=int, default=2)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        base_dir = args.data_dir or Path(tmp) / 'raw'
+        if not discover_input_files(base_dir, ENROLLMENT_PATTERN):
+            print(f"Writing synthetic CSVs to {base_dir}...")
+            write_raw_csvs(base_dir)
+
+        # Work on links to the base files so drops never land in a reused directory
+        data_dir = Path(tmp) / 'data'
+        data_dir.mkdir()
+        for path in sorted(base_dir.glob('*.csv')):
+            (data_dir / path.name).symlink_to(path.resolve())
+        incremental_dir = data_dir / 'processed'
+        full_dir = Path(tmp) / 'full'
+
+        _, initial_s = timed(build_full, data_dir, incremental_dir)
+        print(f"initial full build: {initial_s:.2f} s")
+        print(f"{'drop':>4} {'incremental s':>14} {'full rebuild s':>15} {'speedup':>8}  same dataset version")
+
+        for drop in range(1, args.drops + 1):
+            add_daily_drop(data_dir, args.drop_rows, drop)
+
+            incremental_version, incremental_s = timed(build_incremental, data_dir, incremental_dir)
+            full_version, full_s = timed(build_full, data_dir, full_dir)
+
+            print(f"{drop:>4} {incremental_s:>14.2f} {full_s:>15.2f} {full_s / incremental_s:>7.1f}x  "
+                  f"{incremental_version == full_version}")
+
+
+if __name__ == '__main__':
+    main()
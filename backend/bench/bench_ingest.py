@@ -0,0 +1,106 @@
+"""
+Benchmark CSV ingestion: sequential default read_csv vs parallel, chunked, typed loading.
+
+Writes synthetic DEMOGRAPHIC_*/ENROLLMENT_* files at the size of the real inputs
+(about 3M rows) and measures each loader in a fresh subprocess: wall time,
+peak RSS of the main process and of the largest worker, and whether the merged
+master_data matches the sequential loader exactly.
+Run from the backend directory:
+    python bench/bench_ingest.py [--data-dir /tmp/ni3s-raw] [--workers 8]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import os
+import pickle
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+
+from data_pipeline import DataPipeline, DEMOGRAPHIC_PATTERN, ENROLLMENT_PATTERN, discover_input_files
+from bench_names import legacy_clean_district, legacy_clean_state
+from synthetic import write_raw_csvs
+
+
+def legacy_load(pipeline: DataPipeline):
+    """Former load_all_datasets: one file after another, default dtypes, row-wise cleaning"""
+    for pattern, datasets in ((DEMOGRAPHIC_PATTERN, pipeline.demographic_datasets),
+                              (ENROLLMENT_PATTERN, pipeline.enrollment_datasets)):
+        for filename in discover_input_files(pipeline.data_dir, pattern):
+            df = pd.read_csv(pipeline.data_dir / filename)
+            df['date'] = pd.to_datetime(df['date'], dayfirst=True)
+            df['state'] = df['state'].apply(legacy_clean_state)
+            df['district'] = df['district'].apply(legacy_clean_district)
+            datasets.append(df)
+
+
+def child(mode: str, data_dir: str, workers: int, output: str):
+    pipeline = DataPipeline(data_dir)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'legacy':
+            legacy_load(pipeline)
+        else:
+            pipeline.load_all_datasets(workers=workers)
+    load_time = time.perf_counter() - start
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        pipeline.merge_datasets()
+    with open(output, 'wb') as f:
+        pickle.dump(pipeline.master_data, f)
+
+    print(json.dumps({
+        'load_s': load_time,
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'worker_peak_mb': resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss / 1024
+    }))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--data-dir', type=Path, default=None, help='reuse (or create) raw CSVs here')
+    parser.add_argument('--workers', type=int, default=os.cpu_count())
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, data_dir, workers, output = args.child
+        child(mode, data_dir, int(workers), output)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        data_dir = args.data_dir or Path(tmp) / 'data'
+        if not discover_input_files(data_dir, ENROLLMENT_PATTERN):
+            print(f"Writing synthetic CSVs to {data_dir}...")
+            write_raw_csvs(data_dir)
+
+        runs = [('legacy', 1), ('typed', 1), ('typed', args.workers)]
+        results = {}
+        print(f"{'loader':<22} {'load s':>8} {'peak MB':>9} {'worker peak MB':>15}  master_data identical")
+        for mode, workers in runs:
+            output = Path(tmp) / f"master_{mode}_{workers}.pkl"
+            out = subprocess.run(
+                [sys.executable, __file__, '--child', mode, str(data_dir), str(workers), str(output)],
+                check=True, capture_output=True, text=True
+            )
+            result = json.loads(out.stdout.strip().splitlines()[-1])
+            with open(output, 'rb') as f:
+                results[(mode, workers)] = pickle.load(f)
+
+            identical = results[(mode, workers)].equals(results[('legacy', 1)])
+            label = 'sequential (before)' if mode == 'legacy' else f"typed, {workers} worker(s)"
+            print(f"{label:<22} {result['load_s']:>8.2f} {result['peak_mb']:>9.0f} "
+                  f"{result['worker_peak_mb']:>15.0f}  {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,101 @@
+"""
+Benchmark materialized policy and state insights against computing them per request.
+
+For each size, times materializing every insight payload once, then serving
+the policy insights and each state's insights from it, next to computing them
+on every call. The served policy payload (less generated_at) must match the
+computed one, and each state's payload must report what a pandas filter +
+nlargest over its districts finds.
+Run from the backend directory:
+    python bench/bench_insights.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics_engine import AnalyticsEngine
+from feature_engine import compute_district_features
+from recommendation_engine import RecommendationEngine
+from risk_engine import RiskEngine
+from synthetic import make_master_data
+
+
+def per_call_us(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def computed_state_insights(state: str, analytics: AnalyticsEngine, risk_engine: RiskEngine) -> list:
+    """A state's insights the way a per-request pandas filter + nlargest would find them"""
+    overview = analytics.get_state_overview(state)
+    state_risk_data = risk_engine.risk_scores[risk_engine.risk_scores['state'] == state]
+    avg_penetration = overview['avg_penetration_rate']
+    high_risk = state_risk_data[state_risk_data['composite_risk_score'] > 0.6]
+    top = high_risk.nlargest(5, 'composite_risk_score')['district'].astype(str).tolist()[:3]
+    avg_risk = state_risk_data['composite_risk_score'].mean()
+    return [avg_penetration < 0.5, len(high_risk), top, f"{avg_risk:.2f}", avg_risk < 0.5]
+
+
+def served_state_facts(payload: dict) -> list:
+    """The same facts read back from a materialized payload"""
+    by_category = {insight['category']: insight for insight in payload['insights']}
+    high_risk = by_category.get('High-Risk Districts')
+    count, top = 0, []
+    if high_risk:
+        count = int(high_risk['insight'].split(' districts in ')[0])
+        top = high_risk['insight'].split('Priority districts: ')[1].rstrip('.').split(', ')
+    overall = by_category['Overall State Risk']
+    return ['State Penetration' in by_category, count, top,
+            overall['insight'].rsplit(' ', 1)[1].rstrip('.'), overall['severity'] == 'medium']
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=20)
+    args = parser.parse_args()
+
+    print(f"{'districts':>9} {'states':>6} {'build ms':>9}  {'policy us':>10} {'computed us':>12}  "
+          f"{'state us':>9} {'computed us':>12}  identical")
+    for size in args.sizes:
+        master_data = make_master_data(size, num_dates=10)
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytics = AnalyticsEngine.from_precomputed(master_data, compute_district_features(master_data))
+            risk_engine = RiskEngine(analytics)
+        analytics.build_indexes()
+        risk_engine.build_indexes()
+        states = analytics.cube.states
+        state = states[0]
+
+        engine = RecommendationEngine()
+        start = time.perf_counter()
+        engine.build_insights(analytics, risk_engine)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        policy_us = per_call_us(lambda: engine.generate_policy_insights(analytics, risk_engine), args.repeat)
+        computed_policy_us = per_call_us(lambda: engine._policy_insights(analytics, risk_engine), args.repeat)
+        state_us = per_call_us(lambda: engine.generate_state_insights(state, analytics, risk_engine), args.repeat)
+        computed_state_us = per_call_us(lambda: computed_state_insights(state, analytics, risk_engine), args.repeat)
+
+        def served(payload):
+            return {k: v for k, v in payload.items() if k != 'generated_at'}
+
+        identical = served(engine.generate_policy_insights(analytics, risk_engine)) == \
+            engine._policy_insights(analytics, risk_engine) and all(
+                served_state_facts(engine.generate_state_insights(s, analytics, risk_engine)) ==
+                computed_state_insights(s, analytics, risk_engine) for s in states
+            )
+        print(f"{size:>9,} {len(states):>6} {build_ms:>9.0f}  {policy_us:>10,.0f} {computed_policy_us:>12,.0f}  "
+              f"{state_us:>9,.0f} {computed_state_us:>12,.0f}  {identical}")
+
+
+if __name__ == '__main__':
+    main()
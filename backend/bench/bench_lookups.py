@@ -0,0 +1,88 @@
+"""
+Microbenchmark the per-district and per-state endpoints at growing dataset sizes.
+
+For each size, times every lookup method through the prebuilt indexes and, for
+reference, the boolean-mask filter the methods used before indexing.
+Run from the backend directory:
+    python bench/bench_lookups.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics_engine import AnalyticsEngine
+from feature_engine import compute_district_features
+from risk_engine import RiskEngine
+from recommendation_engine import RecommendationEngine
+from synthetic import make_master_data
+
+
+def per_call_us(fn, keys, repeat: int) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(*keys[i % len(keys)])
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--dates', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=200)
+    args = parser.parse_args()
+
+    rows = []
+    for size in args.sizes:
+        master_data = make_master_data(size, args.dates)
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytics = AnalyticsEngine.from_precomputed(master_data, compute_district_features(master_data))
+            risk_engine = RiskEngine(analytics)
+        recommendation_engine = RecommendationEngine()
+
+        start = time.perf_counter()
+        analytics.build_indexes()
+        risk_engine.build_indexes()
+        index_build = time.perf_counter() - start
+
+        rng = np.random.default_rng(1)
+        features = analytics.district_features
+        picks = rng.integers(0, len(features), 64)
+        district_keys = list(zip(features['state'].to_numpy()[picks], features['district'].to_numpy()[picks]))
+        state_keys = [(state,) for state, _ in district_keys]
+
+        def mask_district(state, district):
+            return master_data[(master_data['state'] == state) & (master_data['district'] == district)]
+
+        def mask_state(state):
+            return master_data[master_data['state'] == state]
+
+        timings = {
+            'get_district_analytics': per_call_us(analytics.get_district_analytics, district_keys, args.repeat),
+            'get_district_risk_score': per_call_us(risk_engine.get_district_risk_score, district_keys, args.repeat),
+            'get_districts_by_state': per_call_us(analytics.get_districts_by_state, state_keys, args.repeat),
+            'get_state_overview': per_call_us(analytics.get_state_overview, state_keys, args.repeat),
+            'generate_state_insights': per_call_us(
+                lambda s: recommendation_engine.generate_state_insights(s, analytics, risk_engine),
+                state_keys, args.repeat
+            ),
+            '(mask filter: district)': per_call_us(mask_district, district_keys, 20),
+            '(mask filter: state)': per_call_us(mask_state, state_keys, 20),
+        }
+        rows.append((size, len(master_data), index_build, timings))
+
+    print(f"{'endpoint method':<26}" + ''.join(f"{size:>12,}" for size, *_ in rows) + "   (us/call by districts)")
+    for name in rows[0][3]:
+        print(f"{name:<26}" + ''.join(f"{timings[name]:>12.1f}" for *_, timings in rows))
+    print(f"{'index build (s)':<26}" + ''.join(f"{build:>12.3f}" for _, _, build, _ in rows))
+
+
+if __name__ == '__main__':
+    main()
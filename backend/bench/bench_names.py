@@ -0,0 +1,108 @@
+"""
+Benchmark state/district name cleaning: per-row apply vs memoized, per-unique-value cleaning.
+
+Cleans name columns the size of the real inputs (about 3.08M rows across the
+demographic and enrollment files) and checks every method against the former
+row-by-row cleaners.
+Run from the backend directory:
+    python bench/bench_names.py [--rows 3077729]
+"""
+
+import argparse
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import pandas as pd
+import numpy as np
+
+from name_normalizer import NameNormalizer, load_name_mappings
+
+FULL_INPUT_ROWS = 2_071_700 + 1_006_029
+
+TABLES = load_name_mappings()
+
+
+def legacy_clean_state(state_name) -> str:
+    """Former DataPipeline._clean_state_name: both dicts are rebuilt on every call"""
+    if pd.isna(state_name):
+        return "Unknown"
+    state_name = ' '.join(str(state_name).strip().split())
+    city_to_state = dict(TABLES['city_to_state'])
+    state_upper = state_name.upper()
+    if state_upper in city_to_state:
+        return city_to_state[state_upper]
+    mappings = dict(TABLES['states'])
+    cleaned = mappings.get(state_name, state_name)
+    if cleaned.islower():
+        cleaned = cleaned.title()
+    return cleaned
+
+
+def legacy_clean_district(district_name) -> str:
+    """Former DataPipeline._clean_district_name: dict rebuilt per call, linear case-insensitive scan"""
+    if pd.isna(district_name):
+        return "Unknown"
+    district_name = str(district_name).strip()
+    district_name = district_name.replace('*', '').strip()
+    district_name = ' '.join(district_name.split())
+    mappings = dict(TABLES['districts'])
+    for key, value in mappings.items():
+        if district_name.lower() == key.lower():
+            return value
+    if district_name.islower() or district_name.isupper():
+        district_name = district_name.title()
+    return district_name
+
+
+def raw_names(table: str, generic: int, rows: int, rng: np.random.Generator) -> pd.Series:
+    """Names as they appear in the raw files: mapped spellings, clean names and casing/spacing noise"""
+    known = list(TABLES[table]) + list(TABLES[table].values())
+    pool = known + [f"Name {i:04d}" for i in range(generic)]
+    pool += [name.upper() for name in known] + [f" {name} *" for name in known[:50]]
+    values = np.array(pool, dtype=object)[rng.integers(0, len(pool), rows)]
+    values[rng.random(rows) < 0.001] = None
+    return pd.Series(values)
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=FULL_INPUT_ROWS)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    columns = {
+        'state': (raw_names('states', 40, args.rows, rng), legacy_clean_state, 'clean_states', 'clean_state'),
+        'district': (raw_names('districts', 1_000, args.rows, rng), legacy_clean_district,
+                     'clean_districts', 'clean_district'),
+    }
+
+    print(f"{args.rows:,} rows per column")
+    print(f"{'column':<9} {'method':<28} {'seconds':>8} {'speedup':>8}  identical")
+    for column, (names, legacy, clean_column, clean_value) in columns.items():
+        expected, legacy_s = timed(names.apply, legacy)
+        print(f"{column:<9} {'apply, per row (before)':<28} {legacy_s:>8.2f} {1:>7.1f}x  True")
+
+        # Fresh normalizer per method so memoized values do not carry over
+        methods = [
+            ('apply, memoized', lambda: names.apply(getattr(NameNormalizer(), clean_value))),
+            ('unique values, object', lambda: getattr(NameNormalizer(), clean_column)(names)),
+            ('unique values, categorical', lambda: getattr(NameNormalizer(), clean_column)(categorical)),
+        ]
+        categorical = names.astype('category')
+        for label, method in methods:
+            result, seconds = timed(method)
+            identical = result.astype(object).tolist() == expected.tolist()
+            print(f"{column:<9} {label:<28} {seconds:>8.2f} {legacy_s / seconds:>7.1f}x  {identical}")
+
+
+if __name__ == '__main__':
+    main()
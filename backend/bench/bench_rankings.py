@@ -0,0 +1,148 @@
+"""
+Benchmark paginated risk rankings and heatmap pages against filtering and sorting per request.
+
+For each size, times one page of the rankings for several filter mixes through
+RiskEngine's ranking index, next to the equivalent pandas filter + stable sort
+over every district. Random queries are checked against that pandas reference,
+including walking every page with next_cursor.
+Run from the backend directory:
+    python bench/bench_rankings.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics_engine import AnalyticsEngine
+from feature_engine import compute_district_features
+from ranking_index import RISK_CATEGORIES, SORT_FIELDS
+from risk_engine import RiskEngine
+from synthetic import make_master_data
+
+
+def per_call_us(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def reference(risk_scores: pd.DataFrame, sort_by='risk_score', descending=True, states=None, categories=None,
+              min_score=None, max_score=None) -> np.ndarray:
+    """Row positions of every match in sort order, the way a per-request filter + sort would find them"""
+    scores = risk_scores['composite_risk_score']
+    mask = np.ones(len(risk_scores), dtype=bool)
+    if states is not None:
+        mask &= risk_scores['state'].isin(states).to_numpy()
+    if categories is not None:
+        mask &= risk_scores['risk_category'].astype(str).isin(categories).to_numpy()
+    if min_score is not None:
+        mask &= (scores >= min_score).to_numpy()
+    if max_score is not None:
+        mask &= (scores <= max_score).to_numpy()
+
+    rows = np.flatnonzero(mask)
+    if sort_by in ('state', 'district'):
+        keys = ['state', 'district'] if sort_by == 'state' else ['district', 'state']
+        frame = risk_scores.iloc[rows][keys].astype(str)
+        ordered = frame.sort_values(keys, ascending=not descending, kind='stable').index
+        return risk_scores.index.get_indexer(ordered)
+    values = risk_scores[SORT_FIELDS[sort_by]].to_numpy()[rows]
+    return rows[np.argsort(-values if descending else values, kind='stable')]
+
+
+def random_query(rng, states: list) -> dict:
+    query = {'sort_by': str(rng.choice(list(SORT_FIELDS))), 'descending': bool(rng.integers(0, 2))}
+    if rng.random() < 0.5:
+        query['states'] = list(rng.choice(states, size=rng.integers(1, min(len(states), 5) + 1), replace=False))
+    if rng.random() < 0.5:
+        query['categories'] = list(rng.choice(RISK_CATEGORIES, size=rng.integers(1, 3), replace=False))
+    if rng.random() < 0.5:
+        query['min_score'] = float(rng.uniform(0, 0.5))
+    if rng.random() < 0.5:
+        query['max_score'] = float(rng.uniform(0.4, 1.0))
+    return query
+
+
+def check(risk_engine: RiskEngine, rng, trials: int) -> bool:
+    index = risk_engine.ranking_index
+    risk_scores = risk_engine.risk_scores
+    states = sorted(risk_scores['state'].astype(str).unique())
+    for _ in range(trials):
+        query = random_query(rng, states)
+        expected = reference(risk_scores, **query)
+        limit = int(rng.integers(1, 200))
+
+        # Walk every page by cursor, and jump straight to a page by offset
+        pages, cursor = [], None
+        while True:
+            page = index.query(**query, limit=limit, cursor=cursor)
+            if page['total'] != len(expected):
+                return False
+            pages.append(page['rows'])
+            cursor = page['next_cursor']
+            if cursor is None:
+                break
+        offset = int(rng.integers(0, len(expected) + 1))
+        jumped = index.query(**query, offset=offset, limit=limit)['rows']
+        if not (np.array_equal(np.concatenate(pages), expected)
+                and np.array_equal(jumped, expected[offset:offset + limit])):
+            return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--repeat', type=int, default=100)
+    parser.add_argument('--trials', type=int, default=40, help='random queries checked per size')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        master_data = make_master_data(size, num_dates=10)
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytics = AnalyticsEngine.from_precomputed(master_data, compute_district_features(master_data))
+            risk_engine = RiskEngine(analytics)
+        risk_scores = risk_engine.risk_scores
+
+        start = time.perf_counter()
+        index = risk_engine.ranking_index
+        for sort_by in SORT_FIELDS:
+            index.order(sort_by, True)
+            index.order(sort_by, False)
+        build_ms = (time.perf_counter() - start) * 1000
+
+        state = str(risk_scores['state'].iloc[0])
+        queries = {
+            'top 50': {},
+            'page 20 of 50': {'offset': 950},
+            'one state': {'states': [state]},
+            'High Risk, by population': {'categories': ['High Risk'], 'sort_by': 'total_population'},
+            'score 0.3-0.6': {'min_score': 0.3, 'max_score': 0.6},
+        }
+
+        identical = check(risk_engine, np.random.default_rng(size), args.trials)
+        print(f"\n{size:,} districts: index built in {build_ms:.0f} ms, matches pandas: {identical}")
+        print(f"  {'query':<26} {'index us':>9} {'API us':>9} {'filter+sort us':>15}")
+        for name, params in queries.items():
+            query = {k: v for k, v in params.items() if k != 'offset'}
+            index_us = per_call_us(lambda: index.query(**params, limit=50), args.repeat)
+            api_us = per_call_us(lambda: risk_engine.get_top_risk_districts(
+                50, offset=params.get('offset', 0), sort_by=params.get('sort_by', 'risk_score'),
+                states=params.get('states'), risk_categories=params.get('categories'),
+                min_score=params.get('min_score'), max_score=params.get('max_score')
+            ), args.repeat)
+            scan_us = per_call_us(lambda: reference(risk_scores, **query), max(args.repeat // 10, 1))
+            print(f"  {name:<26} {index_us:>9,.0f} {api_us:>9,.0f} {scan_us:>15,.0f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,79 @@
+"""
+Benchmark precomputed recommendation rule matches against evaluating rules per district.
+
+For each size, times evaluating every rule over all districts at once, then
+looking recommendations up for a page of districts, next to building each
+district's analytics and risk dicts and running the rules on them one by one.
+Every district's precomputed recommendations are checked against that
+per-district result.
+Run from the backend directory:
+    python bench/bench_recommendations.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics_engine import AnalyticsEngine
+from feature_engine import compute_district_features
+from recommendation_engine import RecommendationEngine
+from risk_engine import RiskEngine
+from synthetic import make_master_data
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--page', type=int, default=1_000, help='districts looked up per request')
+    args = parser.parse_args()
+
+    print(f"{'districts':>9} {'evaluate ms':>12} {'lookup ms':>10} {'per-district ms':>16} {'with any rule':>13}  identical")
+    for size in args.sizes:
+        master_data = make_master_data(size, num_dates=10)
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytics = AnalyticsEngine.from_precomputed(master_data, compute_district_features(master_data))
+            risk_engine = RiskEngine(analytics)
+        analytics.build_indexes()
+        risk_engine.build_indexes()
+        keys = risk_engine.district_index.labels()
+        page = keys[:args.page]
+
+        engine = RecommendationEngine()
+        start = time.perf_counter()
+        engine.build(risk_engine)
+        evaluate_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        engine.get_district_recommendations(risk_engine, page)
+        lookup_ms = (time.perf_counter() - start) * 1000
+
+        start = time.perf_counter()
+        for (state, district), data, risk in zip(
+            page,
+            analytics.get_districts_analytics(page, trends=False),
+            risk_engine.get_district_risk_scores(page)
+        ):
+            engine.generate_recommendations(data, risk)
+        per_district_ms = (time.perf_counter() - start) * 1000
+
+        expected = [
+            engine.generate_recommendations(data, risk)
+            for data, risk in zip(analytics.get_districts_analytics(keys, trends=False),
+                                  risk_engine.get_district_risk_scores(keys))
+        ]
+        identical = engine.get_district_recommendations(risk_engine, keys) == expected
+        summary = engine.get_rule_summary(risk_engine)
+        counted = sum(rule['districts'] for rule in summary['rules']) == sum(
+            item['total_recommendations'] for item in expected
+        )
+        print(f"{size:>9,} {evaluate_ms:>12.1f} {lookup_ms:>10.2f} {per_district_ms:>16.1f} "
+              f"{summary['districts_with_recommendations']:>13,}  {identical and counted}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,102 @@
+"""
+Benchmark hot reload: swap in a new dataset version while requests keep coming.
+
+Writes a synthetic artifact, serves it in-process, then keeps concurrent
+clients requesting district, heatmap and overview endpoints while a second
+artifact version is written and POST /api/admin/reload swaps it in. Reports
+the reload time, request latency before and during the reload, failed
+requests (there should be none) and the dataset version /health reports
+before and after.
+Run from the backend directory:
+    python bench/bench_reload.py [--districts 20000] [--concurrency 8]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+os.environ.setdefault('ADMIN_TOKEN', 'bench')
+
+from synthetic import write_processed_artifact
+
+
+async def load(client: httpx.AsyncClient, paths: list, stop: asyncio.Event, latencies: list, failures: list):
+    i = 0
+    while not stop.is_set():
+        path = paths[i % len(paths)]
+        start = time.perf_counter()
+        response = await client.get(path)
+        latencies.append((time.perf_counter(), (time.perf_counter() - start) * 1000))
+        if response.status_code != 200:
+            failures.append((path, response.status_code))
+        i += 1
+
+
+async def run(app_module, args) -> list:
+    """Report lines (printed by the caller, after the engines' progress output)"""
+    transport = httpx.ASGITransport(app=app_module.app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=600) as client:
+        before = (await client.get('/health')).json()['dataset_version']
+        state, district = app_module.snapshot.analytics.district_index.labels()[0]
+        paths = [f'/api/districts/{state}/{district}', '/api/risk/heatmap?limit=100', '/api/national/overview']
+
+        stop = asyncio.Event()
+        latencies, failures = [], []
+        clients = [asyncio.create_task(load(client, paths, stop, latencies, failures))
+                   for _ in range(args.concurrency)]
+        await asyncio.sleep(args.warmup)
+
+        # A new version lands on disk, as preprocess.py would write it
+        await asyncio.to_thread(write_processed_artifact, Path('.'), args.districts, 30, 1)
+        reload_start = time.perf_counter()
+        response = await client.post('/api/admin/reload', headers={'X-Admin-Token': os.environ['ADMIN_TOKEN']})
+        reload_end = time.perf_counter()
+        await asyncio.sleep(args.warmup)
+        stop.set()
+        await asyncio.gather(*clients)
+        after = (await client.get('/health')).json()['dataset_version']
+
+    steady = [ms for at, ms in latencies if at < reload_start]
+    during = [ms for at, ms in latencies if reload_start <= at <= reload_end]
+    report = [
+        f"reload: HTTP {response.status_code} {response.json()}",
+        f"dataset_version {before} -> {after}"
+    ]
+    for name, values in (('before reload', steady), ('during reload', during)):
+        if values:
+            p50, p95, p99 = np.percentile(values, [50, 95, 99])
+            report.append(f"  {name:<14} {len(values):>6} requests  p50 {p50:>7.2f}  p95 {p95:>7.2f}  p99 {p99:>7.2f} ms")
+    report.append(f"  failed requests: {len(failures)} of {len(latencies)}")
+    return report
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--districts', type=int, default=20_000)
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--warmup', type=float, default=2.0, help='seconds of load before and after the reload')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_processed_artifact(Path(tmp), args.districts)
+        os.chdir(tmp)
+        with contextlib.redirect_stdout(io.StringIO()):
+            import app as app_module
+            app_module.load_data()
+            report = asyncio.run(run(app_module, args))
+        print('\n'.join(report))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,81 @@
+"""
+Load test the dataset-static endpoints with and without the response cache.
+
+Drives the FastAPI app in-process against a synthetic artifact and reports
+requests/sec per endpoint for: no cache, cache hits (full body) and
+conditional requests answered with 304.
+Run from the backend directory:
+    python bench/bench_response_cache.py --districts 10000
+"""
+
+import argparse
+import contextlib
+import io
+import os
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+
+from fastapi.testclient import TestClient
+
+from response_cache import ResponseCache
+from synthetic import write_processed_artifact
+
+ENDPOINTS = [
+    '/api/national/overview',
+    '/api/national/trends',
+    '/api/risk/heatmap',
+    '/api/risk/distribution',
+    '/api/recommendations/summary',
+]
+
+
+def requests_per_sec(client: TestClient, url: str, requests: int, headers=None) -> float:
+    start = time.perf_counter()
+    for _ in range(requests):
+        client.get(url, headers=headers)
+    return requests / (time.perf_counter() - start)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--districts', type=int, default=10_000)
+    parser.add_argument('--dates', type=int, default=30)
+    parser.add_argument('--requests', type=int, default=50)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_processed_artifact(Path(tmp), args.districts, args.dates)
+        os.chdir(tmp)
+
+        with contextlib.ExitStack() as stack:
+            with contextlib.redirect_stdout(io.StringIO()):
+                import app as appmod
+                client = stack.enter_context(TestClient(appmod.app))
+                # The data loads in the background once the app starts
+                while client.get('/ready').status_code != 200:
+                    time.sleep(0.1)
+
+            run(appmod, client, args)
+
+
+def run(appmod, client: TestClient, args):
+    print(f"{'endpoint':<30} {'no cache':>10} {'cached':>10} {'304':>10}   (requests/sec, {args.districts} districts)")
+    for url in ENDPOINTS:
+        appmod.response_cache = ResponseCache(max_entries=0)
+        uncached = requests_per_sec(client, url, args.requests)
+
+        appmod.response_cache = ResponseCache()
+        etag = client.get(url).headers['etag']
+        cached = requests_per_sec(client, url, args.requests)
+        not_modified = requests_per_sec(client, url, args.requests, headers={'If-None-Match': etag})
+
+        print(f"{url:<30} {uncached:>10.1f} {cached:>10.1f} {not_modified:>10.1f}")
+
+
+if __name__ == '__main__':
+    main()
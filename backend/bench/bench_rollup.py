@@ -0,0 +1,126 @@
+"""
+Benchmark the rollup cube against rescanning master_data per request.
+
+For each size, times the national overview, national trends and state
+overview as the pre-cube master_data scans and through the cube, plus random
+state-subset / date-range aggregations at every grain. Every cube result is
+checked against a pandas groupby over the matching master_data rows.
+Run from the backend directory:
+    python bench/bench_rollup.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics_engine import AnalyticsEngine
+from feature_engine import compute_district_features
+from rollup_cube import CUBE_MEASURES, GROUPINGS
+from synthetic import make_master_data
+
+
+def per_call_us(fn, args_list, repeat: int) -> float:
+    start = time.perf_counter()
+    for i in range(repeat):
+        fn(*args_list[i % len(args_list)])
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def scan_national_overview(master_data: pd.DataFrame):
+    """What get_national_overview did before the cube"""
+    latest = master_data[master_data['date'] == master_data['date'].max()]
+    sums = [int(latest[m].sum()) for m in CUBE_MEASURES]
+    return sums, master_data['state'].nunique(), master_data[['state', 'district']].drop_duplicates().shape[0]
+
+
+def scan_national_trends(master_data: pd.DataFrame):
+    return master_data.groupby('date').agg({'total_enrollments': 'sum', 'total_population': 'sum'}).reset_index()
+
+
+def scan_rollup(master_data: pd.DataFrame, start, end, states, group_by: str) -> pd.DataFrame:
+    rows = master_data[
+        (master_data['date'] >= start) & (master_data['date'] <= end) & master_data['state'].isin(states)
+    ]
+    keys = {'date': ['date'], 'state': ['state'], 'district': ['state', 'district'], 'total': []}[group_by]
+    if not keys:
+        return rows[CUBE_MEASURES].sum().to_frame().T.astype(np.int64)
+    return rows.groupby(keys, observed=True)[CUBE_MEASURES].sum().reset_index()
+
+
+def check(cube, master_data: pd.DataFrame, rng, trials: int) -> bool:
+    states = cube.states
+    for _ in range(trials):
+        subset = list(rng.choice(states, size=rng.integers(1, len(states) + 1), replace=False))
+        lo, hi = sorted(rng.integers(0, len(cube.dates), 2))
+        start, end = pd.Timestamp(cube.dates[lo]), pd.Timestamp(cube.dates[hi])
+        for group_by in GROUPINGS:
+            expected = scan_rollup(master_data, start, end, subset, group_by)
+            actual = cube.aggregate(start, end, subset, group_by)
+            if group_by in ('date', 'state'):
+                # The cube keeps dates and states without rows in the range, with zero sums
+                actual = actual[actual['districts_reporting'] > 0].reset_index(drop=True)
+            for m in CUBE_MEASURES:
+                if not np.array_equal(actual[m].to_numpy(), expected[m].to_numpy()):
+                    print(f"  mismatch: {group_by} {m}")
+                    return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--dates', type=int, default=30)
+    parser.add_argument('--repeat', type=int, default=50)
+    parser.add_argument('--trials', type=int, default=10, help='random aggregations checked per size')
+    args = parser.parse_args()
+
+    for size in args.sizes:
+        master_data = make_master_data(size, args.dates)
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytics = AnalyticsEngine.from_precomputed(master_data, compute_district_features(master_data))
+        master_data = analytics.master_data
+
+        start = time.perf_counter()
+        cube = analytics.cube
+        build_s = time.perf_counter() - start
+
+        rng = np.random.default_rng(1)
+        states = [(s,) for s in rng.choice(cube.states, 16)]
+        ranges = []
+        for _ in range(16):
+            subset = list(rng.choice(cube.states, size=max(len(cube.states) // 4, 1), replace=False))
+            lo, hi = sorted(rng.integers(0, len(cube.dates), 2))
+            ranges.append((pd.Timestamp(cube.dates[lo]), pd.Timestamp(cube.dates[hi]), subset))
+
+        timings = {
+            'national overview (scan)': per_call_us(scan_national_overview, [(master_data,)], args.repeat),
+            'national overview (cube)': per_call_us(analytics.get_national_overview, [()], args.repeat),
+            'national trends (scan)': per_call_us(scan_national_trends, [(master_data,)], args.repeat),
+            'national trends (cube)': per_call_us(analytics.get_national_trends, [()], args.repeat),
+            'state overview (cube)': per_call_us(analytics.get_state_overview, states, args.repeat),
+        }
+        for group_by in GROUPINGS:
+            timings[f"range by {group_by} (scan)"] = per_call_us(
+                lambda s, e, sub: scan_rollup(master_data, s, e, sub, group_by), ranges, max(args.repeat // 5, 1)
+            )
+            timings[f"range by {group_by} (cube)"] = per_call_us(
+                lambda s, e, sub: cube.aggregate(s, e, sub, group_by), ranges, args.repeat
+            )
+
+        identical = check(cube, master_data, rng, args.trials)
+        print(f"\n{size:,} districts, {len(master_data):,} rows: cube built in {build_s * 1000:.0f} ms, "
+              f"matches pandas: {identical}")
+        for name, us in timings.items():
+            print(f"  {name:<28} {us:>12,.0f} us")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,162 @@
+"""
+Benchmark the compact master_data/district_features layout (schema.py) vs the wide one.
+
+Saves the same synthetic data once with the wide layout (object keys, int64
+counts, float64 rates) and once compacted, then loads each artifact into a
+fresh subprocess (without memory maps, so every byte is private) and builds
+the engines on top, reporting the frames' deep memory usage and the RSS
+growth. The engine responses are then compared in-process: every JSON value
+must match the wide layout's to 4 decimal places.
+Run from the backend directory:
+    python bench/bench_schema.py [--sizes 1000 10000 50000]
+"""
+
+import argparse
+import contextlib
+import ctypes
+import io
+import json
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import numpy as np
+
+from analytics_engine import AnalyticsEngine
+from artifact_store import save_artifact, load_artifact
+from feature_engine import compute_district_features
+from risk_engine import RiskEngine
+from schema import MASTER_RATE_COLUMNS, compact_master_data
+from synthetic import make_master_data
+
+TABLES = ['master_data', 'district_features']
+
+
+def rss_kb() -> int:
+    # Hand freed heap pages back first so RSS reflects what is still held
+    try:
+        ctypes.CDLL('libc.so.6').malloc_trim(0)
+    except (OSError, AttributeError):
+        pass
+    with open('/proc/self/status') as f:
+        for line in f:
+            if line.startswith('VmRSS:'):
+                return int(line.split()[1])
+    return 0
+
+
+def build_engines(master_data, district_features, compact: bool):
+    with contextlib.redirect_stdout(io.StringIO()):
+        analytics = AnalyticsEngine.from_precomputed(master_data, district_features, compact=compact)
+        risk_engine = RiskEngine(analytics)
+        analytics.build_indexes()
+        risk_engine.build_indexes()
+    return analytics, risk_engine
+
+
+def child(layout: str, path: str):
+    before = rss_kb()
+    start = time.perf_counter()
+    data = load_artifact(Path(path), mmap=False, tables=TABLES)
+    analytics, _ = build_engines(data['master_data'], data['district_features'], layout == 'compact')
+    seconds = time.perf_counter() - start
+
+    print(json.dumps({
+        'seconds': seconds,
+        'rss_mb': (rss_kb() - before) / 1024,
+        'frames_mb': sum(
+            df.memory_usage(deep=True).sum() for df in (analytics.master_data, analytics.district_features)
+        ) / 2**20
+    }))
+
+
+def run_child(layout: str, path: Path) -> dict:
+    out = subprocess.run(
+        [sys.executable, __file__, '--child', layout, str(path)],
+        check=True, capture_output=True, text=True
+    )
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def responses(analytics: AnalyticsEngine, risk_engine: RiskEngine, districts: list) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        states = analytics.get_states_list()['states']
+        result = {
+            'overview': analytics.get_national_overview(),
+            'trends': analytics.get_national_trends(),
+            'states': [analytics.get_state_overview(state) for state in states[:5]],
+            'districts': [analytics.get_district_analytics(state, district) for state, district in districts],
+            'risk': [risk_engine.get_district_risk_score(state, district) for state, district in districts],
+            'top_risk': risk_engine.get_top_risk_districts(),
+            'heatmap': risk_engine.get_heatmap_data(),
+            'distribution': risk_engine.get_risk_distribution(),
+            'high_risk_states': risk_engine.get_high_risk_states()
+        }
+    return json.loads(json.dumps(result, default=str))
+
+
+def mismatches(expected, actual, path: str = '') -> list:
+    """Paths where two JSON values differ, comparing numbers to 4 decimal places"""
+    if isinstance(expected, dict) and isinstance(actual, dict):
+        if expected.keys() != actual.keys():
+            return [path]
+        return [m for key in expected for m in mismatches(expected[key], actual[key], f"{path}/{key}")]
+    if isinstance(expected, list) and isinstance(actual, list):
+        if len(expected) != len(actual):
+            return [path]
+        return [m for i, (e, a) in enumerate(zip(expected, actual)) for m in mismatches(e, a, f"{path}/{i}")]
+    if isinstance(expected, float) or isinstance(actual, float):
+        return [] if round(expected, 4) == round(actual, 4) else [path]
+    return [] if expected == actual else [path]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 50_000],
+                        help='number of districts')
+    parser.add_argument('--child', nargs=2, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        child(*args.child)
+        return
+
+    print(f"{'districts':>9} {'rows':>10} {'layout':<8} {'frames MB':>10} {'RSS MB':>8} {'load s':>7} "
+          f"{'max rate err':>13}  API equal (4 dp)")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            master_data = make_master_data(size)
+            district_features = compute_district_features(master_data)
+            compact_master = compact_master_data(master_data)
+
+            # Wide layout: exactly what DataPipeline produced before schema.py
+            save_artifact({'master_data': master_data, 'district_features': district_features}, Path(tmp) / 'wide')
+            wide_analytics, wide_risk = build_engines(master_data, district_features, compact=False)
+            compact_analytics, compact_risk = build_engines(master_data, district_features, compact=True)
+            save_artifact({t: getattr(compact_analytics, t) for t in TABLES}, Path(tmp) / 'compact')
+
+            rate_error = max(
+                np.abs(compact_master[c].to_numpy(dtype=np.float64) - master_data[c].to_numpy()).max()
+                for c in MASTER_RATE_COLUMNS
+            )
+            sample = list(zip(district_features['state'], district_features['district']))[::max(size // 50, 1)]
+            different = mismatches(
+                responses(wide_analytics, wide_risk, sample), responses(compact_analytics, compact_risk, sample)
+            )
+
+            for layout in ('wide', 'compact'):
+                result = run_child(layout, Path(tmp) / layout)
+                err = f"{rate_error:.2e}" if layout == 'compact' else ''
+                equal = (not different) if layout == 'compact' else ''
+                print(f"{size:>9,} {len(master_data):>10,} {layout:<8} {result['frames_mb']:>10.1f} "
+                      f"{result['rss_mb']:>8.1f} {result['seconds']:>7.2f} {err:>13}  {equal}")
+            if different:
+                print(f"  differing responses: {different[:5]}")
+
+
+if __name__ == '__main__':
+    main()
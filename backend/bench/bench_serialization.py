@@ -0,0 +1,70 @@
+"""
+Benchmark heatmap serialization: iterrows + jsonable_encoder vs columnar encoding.
+
+Run from the backend directory:
+    python bench/bench_serialization.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import JSONResponse
+
+from analytics_engine import AnalyticsEngine
+from feature_engine import compute_district_features
+from risk_engine import RiskEngine
+from serialization import render_json
+from synthetic import make_master_data
+
+
+def legacy_heatmap_body(risk_scores) -> bytes:
+    """Former get_heatmap_data plus FastAPI's default response encoding"""
+    heatmap_list = []
+    for _, row in risk_scores.iterrows():
+        heatmap_list.append({
+            'state': row['state'],
+            'district': row['district'],
+            'risk_score': round(row['composite_risk_score'], 4),
+            'risk_category': str(row['risk_category']),
+            'penetration_rate': round(row['latest_penetration_rate'], 4),
+            'total_population': int(row['total_population'])
+        })
+    return JSONResponse(jsonable_encoder({'heatmap_data': heatmap_list})).body
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    args = parser.parse_args()
+
+    print(f"{'districts':>10} {'legacy s':>9} {'records s':>10} {'columnar s':>11} "
+          f"{'records KB':>11} {'columnar KB':>12}  identical")
+    for size in args.sizes:
+        master_data = make_master_data(size, num_dates=5)
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytics = AnalyticsEngine.from_precomputed(master_data, compute_district_features(master_data))
+            risk_engine = RiskEngine(analytics)
+
+        legacy, legacy_time = timed(legacy_heatmap_body, risk_engine.risk_scores)
+        records, records_time = timed(lambda: render_json(risk_engine.get_heatmap_data()))
+        columnar, columnar_time = timed(lambda: render_json(risk_engine.get_heatmap_data(columnar=True)))
+
+        print(f"{size:>10} {legacy_time:>9.3f} {records_time:>10.3f} {columnar_time:>11.3f} "
+              f"{len(records) / 1024:>11.0f} {len(columnar) / 1024:>12.0f}  {legacy == records}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,74 @@
+"""
+Benchmark server cold start: engine construction with and without recomputing features.
+
+Mirrors app.startup_event on synthetic processed_data.pkl files. Run from the backend directory:
+    python bench/bench_startup.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import pickle
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics_engine import AnalyticsEngine
+from feature_engine import compute_district_features
+from risk_engine import RiskEngine
+from recommendation_engine import RecommendationEngine
+from synthetic import make_master_data
+
+
+def build_engines(data: dict, recompute: bool) -> AnalyticsEngine:
+    if recompute:
+        # Previous behaviour: the constructor always recomputed, then the pickle overwrote it
+        analytics = AnalyticsEngine(data['master_data'])
+        analytics.district_features = analytics._compute_district_features()
+        analytics.district_features = data['district_features']
+    else:
+        analytics = AnalyticsEngine.from_precomputed(data['master_data'], data['district_features'])
+    RiskEngine(analytics)
+    RecommendationEngine()
+    return analytics
+
+
+def timed(fn, *args):
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        result = fn(*args)
+    return result, time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--dates', type=int, default=30)
+    args = parser.parse_args()
+
+    print(f"{'districts':>10} {'unpickle s':>11} {'recompute s':>12} {'precomputed s':>14}")
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in args.sizes:
+            master_data = make_master_data(size, args.dates)
+            pickle_file = Path(tmp) / f"processed_data_{size}.pkl"
+            with open(pickle_file, 'wb') as f:
+                pickle.dump({
+                    'master_data': master_data,
+                    'district_features': compute_district_features(master_data)
+                }, f, protocol=pickle.HIGHEST_PROTOCOL)
+
+            def load():
+                with open(pickle_file, 'rb') as f:
+                    return pickle.load(f)
+
+            data, load_time = timed(load)
+            _, recompute_time = timed(build_engines, data, True)
+            _, precomputed_time = timed(build_engines, data, False)
+            print(f"{size:>10} {load_time:>11.3f} {recompute_time:>12.3f} {precomputed_time:>14.3f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,117 @@
+"""
+Benchmark streaming (chunked) aggregation vs the in-memory concat + groupby path.
+
+Writes synthetic raw CSVs (two thirds demographic, one third enrollment rows)
+and builds master_data in a fresh subprocess per run, reporting wall time and
+peak RSS. On the comparison size both paths run and their district-date sums
+and master_data must be identical; the large size (50M rows by default) runs
+the streaming path only, whose peak memory should stay flat as rows grow.
+Run from the backend directory:
+    python bench/bench_streaming.py [--rows 50000000] [--compare-rows 3000000] [--data-dir /tmp/ni3s-stream]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import pickle
+import resource
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from data_pipeline import DataPipeline, ENROLLMENT_PATTERN, discover_input_files
+from synthetic import write_raw_csvs
+
+TABLES = ['demographic_aggregates', 'enrollment_aggregates', 'master_data']
+
+
+def child(mode: str, data_dir: str, chunksize: int, output: str):
+    pipeline = DataPipeline(data_dir)
+    start = time.perf_counter()
+    with contextlib.redirect_stdout(io.StringIO()):
+        if mode == 'streaming':
+            pipeline.aggregate_datasets(workers=1, chunksize=chunksize)
+        else:
+            pipeline.load_all_datasets(workers=1, chunksize=chunksize)
+            pipeline.merge_datasets()
+    seconds = time.perf_counter() - start
+
+    if output != '-':
+        with open(output, 'wb') as f:
+            pickle.dump({table: getattr(pipeline, table) for table in TABLES}, f)
+
+    print(json.dumps({
+        'seconds': seconds,
+        'peak_mb': resource.getrusage(resource.RUSAGE_SELF).ru_maxrss / 1024,
+        'partitions': len(pipeline.demographic_aggregates) + len(pipeline.enrollment_aggregates)
+    }))
+
+
+def run_child(mode: str, data_dir: Path, chunksize: int, output: str):
+    out = subprocess.run(
+        [sys.executable, __file__, '--child', mode, str(data_dir), str(chunksize), output],
+        capture_output=True, text=True
+    )
+    if out.returncode != 0:
+        # Most likely killed for running out of memory
+        return None
+    return json.loads(out.stdout.strip().splitlines()[-1])
+
+
+def ensure_csvs(data_dir: Path, rows: int):
+    if not discover_input_files(data_dir, ENROLLMENT_PATTERN):
+        print(f"Writing {rows:,} synthetic rows to {data_dir}...")
+        write_raw_csvs(data_dir, demographic_rows=rows * 2 // 3, enrollment_rows=rows - rows * 2 // 3)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--rows', type=int, default=50_000_000)
+    parser.add_argument('--compare-rows', type=int, default=3_000_000)
+    parser.add_argument('--chunksize', type=int, default=250_000)
+    parser.add_argument('--data-dir', type=Path, default=None, help='reuse (or create) raw CSVs under here')
+    parser.add_argument('--in-memory-large', action='store_true',
+                        help='also run the in-memory path on the large input (needs a lot of RAM)')
+    parser.add_argument('--child', nargs=4, help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.child:
+        mode, data_dir, chunksize, output = args.child
+        child(mode, data_dir, int(chunksize), output)
+        return
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = args.data_dir or Path(tmp)
+        runs = [(args.compare_rows, 'in-memory'), (args.compare_rows, 'streaming'), (args.rows, 'streaming')]
+        if args.in_memory_large:
+            runs.append((args.rows, 'in-memory'))
+
+        results = {}
+        for rows, _ in runs:
+            ensure_csvs(root / f"rows_{rows}", rows)
+
+        print(f"{'input rows':>12} {'path':<10} {'seconds':>8} {'peak MB':>8} {'partitions':>11}  identical")
+        for rows, mode in runs:
+            output = str(Path(tmp) / f"{mode}_{rows}.pkl") if rows == args.compare_rows else '-'
+            result = run_child(mode, root / f"rows_{rows}", args.chunksize, output)
+            if result is None:
+                print(f"{rows:>12,} {mode:<10} {'failed (out of memory?)':>30}")
+                continue
+
+            identical = ''
+            if output != '-':
+                with open(output, 'rb') as f:
+                    results[mode] = pickle.load(f)
+                if len(results) == 2:
+                    identical = all(results['in-memory'][t].equals(results['streaming'][t]) for t in TABLES)
+            print(f"{rows:>12,} {mode:<10} {result['seconds']:>8.1f} {result['peak_mb']:>8.0f} "
+                  f"{result['partitions']:>11,}  {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,249 @@
+"""
+End-to-end benchmark suite: pipeline stage timings and API latency as JSON.
+
+For each scale, writes synthetic DEMOGRAPHIC_*/ENROLLMENT_* CSVs with the
+districts, dates and rows of the bundled sample data multiplied by the scale,
+then times every stage from CSV to served engines:
+load_all_datasets, merge_datasets, _compute_district_features, the lookup
+indexes and rollup cube, _compute_district_risk_scores and the recommendation
+matches and insights. The engines are then served in-process and every /api/*
+route but the admin ones is driven through an ASGI client: one cold request
+with an empty response cache, then --requests more from --concurrency
+clients, for p50/p95/p99 latency and throughput.
+
+Results go to --output as JSON so runs can be compared over time; pass an
+earlier file as --baseline to print each route's p95 and each stage's time
+against it.
+Run from the backend directory:
+    python bench/bench_suite.py [--scales 1 10 100] [--output bench_results.json]
+"""
+
+import argparse
+import asyncio
+import contextlib
+import io
+import json
+import os
+import platform
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics_engine import AnalyticsEngine
+from data_pipeline import DataPipeline
+from dataset_snapshot import DatasetSnapshot
+from recommendation_engine import RecommendationEngine
+from risk_engine import RiskEngine
+from synthetic import write_raw_csvs
+
+# The bundled data/ sample: DEMOGRAPHIC_5.csv and ENROLLMENT_3.csv
+BASE_DISTRICTS = 930
+BASE_DATES = 18
+BASE_DEMOGRAPHIC_ROWS = 71_700
+BASE_ENROLLMENT_ROWS = 6_029
+BATCH_SIZE = 100
+
+
+class StageTimer:
+    def __init__(self):
+        self.stages = {}
+
+    @contextlib.contextmanager
+    def stage(self, name: str):
+        start = time.perf_counter()
+        with contextlib.redirect_stdout(io.StringIO()):
+            yield
+        self.stages[name] = round(time.perf_counter() - start, 4)
+        print(f"    {name:<32} {self.stages[name]:>9.3f} s")
+
+
+def build_engines(data_dir: Path, timer: StageTimer):
+    pipeline = DataPipeline(str(data_dir))
+    with timer.stage('load_all_datasets'):
+        pipeline.load_all_datasets()
+    with timer.stage('merge_datasets'):
+        pipeline.merge_datasets()
+    master_data = pipeline.get_master_data()
+    del pipeline
+
+    analytics = AnalyticsEngine(master_data)
+    with timer.stage('_compute_district_features'):
+        _ = analytics.district_features
+    with timer.stage('build_indexes'):
+        analytics.build_indexes()
+    with timer.stage('_compute_district_risk_scores'):
+        risk_engine = RiskEngine(analytics)
+    with timer.stage('risk_build_indexes'):
+        risk_engine.build_indexes()
+    recommendation_engine = RecommendationEngine()
+    with timer.stage('recommendations_build'):
+        recommendation_engine.build(risk_engine)
+    with timer.stage('build_insights'):
+        recommendation_engine.build_insights(analytics, risk_engine)
+    return analytics, risk_engine, recommendation_engine
+
+
+def api_requests(app_module, analytics) -> list:
+    """(name, method, url, json body) for every /api/* route, with real path parameters"""
+    state, district = analytics.district_index.labels()[0]
+    keys = analytics.district_index.labels()[:BATCH_SIZE]
+    params = {'{state_name}': state, '{district_name}': district}
+    bodies = {
+        '/api/districts/batch': {'districts': [{'state': s, 'district': d} for s, d in keys]},
+        '/api/risk/what-if': {'weights': {'penetration_risk': 0.5, 'growth_risk': 0.2}, 'thresholds': [0.35, 0.65]}
+    }
+
+    requests = []
+    for route in app_module.app.routes:
+        path = getattr(route, 'path', '')
+        if not path.startswith('/api/') or path.startswith('/api/admin/'):
+            continue
+        url = path
+        for placeholder, value in params.items():
+            url = url.replace(placeholder, value)
+        for method in sorted(route.methods):
+            requests.append((f"{method} {path}", method, url, bodies.get(path)))
+    return requests
+
+
+async def drive(app, method: str, url: str, body, requests: int, concurrency: int) -> dict:
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url='http://bench', timeout=600) as client:
+        start = time.perf_counter()
+        cold = await client.request(method, url, json=body)
+        cold_ms = (time.perf_counter() - start) * 1000
+
+        latencies, statuses = [], {}
+        remaining = [requests]
+
+        async def worker():
+            while remaining[0] > 0:
+                remaining[0] -= 1
+                start = time.perf_counter()
+                response = await client.request(method, url, json=body)
+                latencies.append((time.perf_counter() - start) * 1000)
+                statuses[response.status_code] = statuses.get(response.status_code, 0) + 1
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        elapsed = time.perf_counter() - start
+
+    p50, p95, p99 = np.percentile(latencies, [50, 95, 99])
+    return {
+        'url': url,
+        'cold_ms': round(cold_ms, 3),
+        'cold_status': cold.status_code,
+        'bytes': len(cold.content),
+        'requests': len(latencies),
+        'p50_ms': round(float(p50), 3),
+        'p95_ms': round(float(p95), 3),
+        'p99_ms': round(float(p99), 3),
+        'mean_ms': round(float(np.mean(latencies)), 3),
+        'throughput_rps': round(len(latencies) / elapsed, 1),
+        'status_codes': {str(code): count for code, count in sorted(statuses.items())}
+    }
+
+
+def benchmark_api(analytics, risk_engine, recommendation_engine, requests: int, concurrency: int) -> dict:
+    with contextlib.redirect_stdout(io.StringIO()):
+        import app as app_module
+    previous = app_module.snapshot
+    app_module.snapshot = DatasetSnapshot(
+        analytics, risk_engine, recommendation_engine, None, 'bench',
+        previous.generation + 1 if previous is not None else 1
+    )
+    app_module.response_cache.clear()
+
+    results = {}
+    for name, method, url, body in api_requests(app_module, analytics):
+        results[name] = asyncio.run(drive(app_module.app, method, url, body, requests, concurrency))
+        result = results[name]
+        print(f"    {name:<46} cold {result['cold_ms']:>9.1f} ms  p50 {result['p50_ms']:>8.2f}  "
+              f"p95 {result['p95_ms']:>8.2f}  p99 {result['p99_ms']:>8.2f} ms  {result['throughput_rps']:>8,.0f}/s")
+    return results
+
+
+def run_scale(scale: int, args) -> dict:
+    districts = BASE_DISTRICTS * scale
+    dates = BASE_DATES * scale
+    demographic_rows = BASE_DEMOGRAPHIC_ROWS * scale
+    enrollment_rows = BASE_ENROLLMENT_ROWS * scale
+    print(f"\nscale {scale}x: {districts:,} districts, {dates:,} dates, "
+          f"{demographic_rows + enrollment_rows:,} CSV rows")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        start = time.perf_counter()
+        write_raw_csvs(Path(tmp), demographic_rows, enrollment_rows, districts, dates, seed=scale)
+        print(f"    {'(write synthetic CSVs)':<32} {time.perf_counter() - start:>9.3f} s")
+
+        timer = StageTimer()
+        analytics, risk_engine, recommendation_engine = build_engines(Path(tmp), timer)
+
+    api = benchmark_api(analytics, risk_engine, recommendation_engine, args.requests, args.concurrency)
+    return {
+        'scale': scale,
+        'districts': districts,
+        'dates': dates,
+        'demographic_rows': demographic_rows,
+        'enrollment_rows': enrollment_rows,
+        'master_rows': len(analytics.master_data),
+        'served_districts': len(risk_engine.risk_scores),
+        'stages': timer.stages,
+        'api': api
+    }
+
+
+def compare(results: dict, baseline: dict):
+    previous = {run['scale']: run for run in baseline['runs']}
+    for run in results['runs']:
+        before = previous.get(run['scale'])
+        if before is None:
+            continue
+        print(f"\nscale {run['scale']}x against {baseline['generated_at']} (ratio > 1 is slower)")
+        for name, seconds in run['stages'].items():
+            if before['stages'].get(name):
+                print(f"    {name:<46} {seconds / before['stages'][name]:>6.2f}x")
+        for name, result in run['api'].items():
+            if name in before['api'] and before['api'][name]['p95_ms'] > 0:
+                print(f"    {name:<46} {result['p95_ms'] / before['api'][name]['p95_ms']:>6.2f}x p95")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--scales', type=int, nargs='+', default=[1, 10, 100])
+    parser.add_argument('--requests', type=int, default=200, help='timed requests per route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--output', type=Path, default=Path('bench_results.json'))
+    parser.add_argument('--baseline', type=Path, help='earlier --output file to compare against')
+    args = parser.parse_args()
+
+    results = {
+        'generated_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S'),
+        'environment': {
+            'python': platform.python_version(),
+            'pandas': pd.__version__,
+            'numpy': np.__version__,
+            'platform': platform.platform(),
+            'cpus': os.cpu_count()
+        },
+        'settings': {'requests': args.requests, 'concurrency': args.concurrency},
+        'runs': []
+    }
+    for scale in args.scales:
+        results['runs'].append(run_scale(scale, args))
+
+    args.output.write_text(json.dumps(results, indent=2))
+    print(f"\nResults written to {args.output}")
+    if args.baseline:
+        compare(results, json.loads(args.baseline.read_text()))
+
+
+if __name__ == '__main__':
+    main()
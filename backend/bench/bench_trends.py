@@ -0,0 +1,108 @@
+"""
+Benchmark ranged and bucketed trend queries as history grows.
+
+For each history length, times /api/national/trends and the district trends
+for the full daily series, a 90-day window and monthly buckets, and reports
+the response size. Every ranged or bucketed series is checked against pandas:
+filter master_data to the range, then take the last date of each bucket.
+Run from the backend directory:
+    python bench/bench_trends.py [--districts 500] [--days 90 365 1825]
+"""
+
+import argparse
+import contextlib
+import io
+import json
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics_engine import AnalyticsEngine
+from feature_engine import compute_district_features
+from synthetic import make_master_data
+from time_series import BUCKETS, bucket_labels
+
+
+def per_call_us(fn, repeat: int) -> float:
+    start = time.perf_counter()
+    for _ in range(repeat):
+        fn()
+    return (time.perf_counter() - start) / repeat * 1e6
+
+
+def expected_series(dates: np.ndarray, start, end, bucket: str) -> tuple:
+    """Positions of the last date in each bucket within [start, end], via pandas"""
+    frame = pd.DataFrame({'date': dates, 'position': np.arange(len(dates))})
+    frame = frame[(frame['date'] >= start) & (frame['date'] <= end)]
+    frame['label'] = bucket_labels(frame['date'].to_numpy(), bucket)
+    last = frame.groupby('label', sort=True).tail(1)
+    return last['position'].to_numpy(), last['label'].to_numpy()
+
+
+def check(analytics: AnalyticsEngine, rng, trials: int) -> bool:
+    cube = analytics.cube
+    index = analytics.district_index
+    keys = index.labels()
+    for _ in range(trials):
+        lo, hi = sorted(rng.integers(0, len(cube.dates), 2))
+        start = pd.Timestamp(cube.dates[lo]) - pd.Timedelta(days=int(rng.integers(0, 3)))
+        end = pd.Timestamp(cube.dates[hi]) + pd.Timedelta(days=int(rng.integers(0, 3)))
+        key = keys[rng.integers(0, len(keys))]
+        bounds = index.get_bounds(key)
+        district_dates = analytics.district_series.dates[bounds[0]:bounds[1]]
+        for bucket in BUCKETS:
+            positions, labels = cube.national_series.select(start, end, bucket)
+            want_positions, want_labels = expected_series(cube.dates, start, end, bucket)
+            if not (np.array_equal(positions, want_positions) and np.array_equal(labels, want_labels)):
+                return False
+            positions, labels = analytics.district_series.select(start, end, bucket, bounds)
+            want_positions, want_labels = expected_series(district_dates, start, end, bucket)
+            if not (np.array_equal(positions - bounds[0], want_positions) and np.array_equal(labels, want_labels)):
+                return False
+    return True
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--districts', type=int, default=500)
+    parser.add_argument('--days', type=int, nargs='+', default=[90, 365, 1825])
+    parser.add_argument('--repeat', type=int, default=200)
+    parser.add_argument('--trials', type=int, default=50, help='random ranges checked per history length')
+    args = parser.parse_args()
+
+    for days in args.days:
+        # make_master_data spaces dates 3 days apart
+        master_data = make_master_data(args.districts, num_dates=days // 3)
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytics = AnalyticsEngine.from_precomputed(master_data, compute_district_features(master_data))
+        analytics.build_indexes()
+
+        state, district = analytics.district_index.labels()[0]
+        last = pd.Timestamp(analytics.cube.dates[-1])
+        window = (last - pd.Timedelta(days=89), last)
+        queries = {
+            'full, daily': {},
+            'last 90 days': {'start': window[0], 'end': window[1]},
+            'full, monthly': {'bucket': 'month'},
+        }
+
+        identical = check(analytics, np.random.default_rng(days), args.trials)
+        print(f"\n{days:,} days of history, {len(master_data):,} rows, matches pandas: {identical}")
+        print(f"  {'query':<16} {'national us':>12} {'points':>7} {'KB':>6}  {'district us':>12} {'points':>7} {'KB':>6}")
+        for name, params in queries.items():
+            national = analytics.get_national_trends(**params)
+            district_trends = analytics.get_district_analytics(state, district, **params)
+            national_us = per_call_us(lambda: analytics.get_national_trends(**params), args.repeat)
+            district_us = per_call_us(lambda: analytics.get_district_analytics(state, district, **params), args.repeat)
+            print(f"  {name:<16} {national_us:>12,.0f} {len(national['trends']):>7} "
+                  f"{len(json.dumps(national)) / 1024:>6.1f}  {district_us:>12,.0f} "
+                  f"{len(district_trends['trends']):>7} {len(json.dumps(district_trends)) / 1024:>6.1f}")
+
+
+if __name__ == '__main__':
+    main()
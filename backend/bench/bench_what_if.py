@@ -0,0 +1,104 @@
+"""
+Benchmark what-if risk scoring against re-running the pandas scoring.
+
+For each size, scores every district under random weight vectors and
+thresholds with RiskEngine.what_if: the first call for a weight vector
+(matrix-vector product and ranking) and a repeat call served from the weight
+cache, each for the default page of 50, and a page filtered to one state. The
+reference re-scores the risk_scores frame in pandas the way _score does, with
+pd.cut for the categories and a stable sort for the ranking. Every district's
+score and category, and the ranked order of scores, are checked against it.
+Run from the backend directory:
+    python bench/bench_what_if.py --sizes 1000 10000 100000
+"""
+
+import argparse
+import contextlib
+import io
+import sys
+import time
+from pathlib import Path
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from analytics_engine import AnalyticsEngine
+from feature_engine import compute_district_features
+from ranking_index import RISK_CATEGORIES
+from risk_engine import RiskEngine, RISK_COMPONENTS
+from synthetic import make_master_data
+
+
+def reference(risk_scores: pd.DataFrame, weights, thresholds) -> pd.DataFrame:
+    """What _score computes for these weights, with each district's rank by descending score"""
+    total = sum(weights)
+    scores = sum(weight / total * risk_scores[name] for name, weight in zip(RISK_COMPONENTS, weights)).clip(0, 1)
+    categories = pd.cut(scores, bins=[0] + list(thresholds) + [1.0], labels=RISK_CATEGORIES, include_lowest=True)
+    order = np.argsort(-scores.to_numpy(), kind='stable')
+    return pd.DataFrame({
+        'state': risk_scores['state'].to_numpy()[order].astype(str),
+        'district': risk_scores['district'].to_numpy()[order].astype(str),
+        'risk_score': np.round(scores.to_numpy()[order], 4),
+        'risk_category': categories.to_numpy()[order].astype(str)
+    })
+
+
+def timed(fn, repeat: int = 5) -> float:
+    best = float('inf')
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        best = min(best, time.perf_counter() - start)
+    return best * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--sizes', type=int, nargs='+', default=[1_000, 10_000, 100_000])
+    parser.add_argument('--scenarios', type=int, default=5, help='random weight vectors per size')
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(0)
+    print(f"{'districts':>9} {'pandas ms':>10} {'first ms':>9} {'cached ms':>10} {'state page ms':>14}  identical")
+    for size in args.sizes:
+        master_data = make_master_data(size, num_dates=10)
+        with contextlib.redirect_stdout(io.StringIO()):
+            analytics = AnalyticsEngine.from_precomputed(master_data, compute_district_features(master_data))
+            risk_engine = RiskEngine(analytics)
+        risk_engine.build_indexes()
+        states = [risk_engine.risk_scores['state'].iloc[0]]
+
+        pandas_ms, first_ms, cached_ms, page_ms, identical = [], [], [], [], True
+        for _ in range(args.scenarios):
+            weights = rng.dirichlet(np.ones(len(RISK_COMPONENTS))).round(3).tolist()
+            thresholds = sorted(rng.uniform(0.1, 0.9, 2).round(2).tolist())
+
+            pandas_ms.append(timed(lambda: reference(risk_engine.risk_scores, weights, thresholds), repeat=1))
+            expected = reference(risk_engine.risk_scores, weights, thresholds)
+
+            start = time.perf_counter()
+            risk_engine.what_if(weights, thresholds)
+            first_ms.append((time.perf_counter() - start) * 1000)
+            cached_ms.append(timed(lambda: risk_engine.what_if(weights, thresholds)))
+            page_ms.append(timed(lambda: risk_engine.what_if(weights, thresholds, states=states)))
+
+            result = risk_engine.what_if(weights, thresholds, limit=None, columnar=True)
+            got = pd.DataFrame(result['districts']['data'], columns=result['districts']['columns'])
+            # The product may differ from the pandas sum in the last bit, which can only swap equal rounded scores
+            merged = got.merge(expected, on=['state', 'district'], suffixes=('', '_expected'))
+            identical &= (
+                len(merged) == size
+                and (merged['risk_score'] == merged['risk_score_expected']).all()
+                and (merged['risk_category'] == merged['risk_category_expected']).all()
+                and got['risk_score'].tolist() == expected['risk_score'].tolist()
+                and got['rank'].tolist() == list(range(1, size + 1))
+            )
+
+        print(f"{size:>9,} {np.median(pandas_ms):>10.1f} {np.median(first_ms):>9.1f} {np.median(cached_ms):>10.2f} "
+              f"{np.median(page_ms):>14.2f}  {identical}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,130 @@
+"""
+Load-test the multi-worker server: requests/sec as gunicorn workers go from 1 to N.
+
+Writes a synthetic artifact, starts `gunicorn app:app -c gunicorn.conf.py` on
+it with each worker count, and drives district lookups and the full heatmap
+with concurrent clients for a fixed time. Reports throughput, latency
+percentiles and memory: RSS summed over the master and its workers, next to
+PSS, which charges shared pages once, so the gap shows what forking shares.
+Needs gunicorn. Run from the backend directory:
+    python bench/bench_workers.py [--districts 5000] [--workers 1 2 4] [--concurrency 16]
+"""
+
+import argparse
+import asyncio
+import os
+import signal
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+import numpy as np
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from synthetic import write_processed_artifact
+
+
+def process_tree(pid: int) -> list:
+    children = Path(f"/proc/{pid}/task/{pid}/children").read_text().split()
+    return [pid] + [int(child) for child in children]
+
+
+def memory_mb(pids: list) -> tuple:
+    """(RSS, PSS) summed over pids, from /proc/<pid>/smaps_rollup"""
+    rss = pss = 0
+    for pid in pids:
+        for line in Path(f"/proc/{pid}/smaps_rollup").read_text().splitlines():
+            if line.startswith('Rss:'):
+                rss += int(line.split()[1])
+            elif line.startswith('Pss:'):
+                pss += int(line.split()[1])
+    return rss / 1024, pss / 1024
+
+
+def start_server(root: Path, workers: int, port: int) -> subprocess.Popen:
+    env = {**os.environ, 'PORT': str(port), 'WEB_CONCURRENCY': str(workers), 'LOG_LEVEL': 'warning'}
+    server = subprocess.Popen(
+        [sys.executable, '-m', 'gunicorn', 'app:app', '-c', str(BACKEND / 'gunicorn.conf.py'),
+         '--pythonpath', str(BACKEND)],
+        cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    deadline = time.time() + 300
+    while time.time() < deadline:
+        try:
+            if httpx.get(f"http://127.0.0.1:{port}/health").json()['data_loaded'] \
+                    and len(process_tree(server.pid)) > workers:
+                return server
+        except (httpx.TransportError, FileNotFoundError):
+            pass
+        if server.poll() is not None:
+            break
+        time.sleep(0.5)
+    server.kill()
+    raise RuntimeError(f"gunicorn with {workers} workers did not come up")
+
+
+async def drive(base_url: str, paths: list, concurrency: int, seconds: float) -> np.ndarray:
+    """Latencies (s) of every request completed by concurrent clients cycling through paths"""
+    latencies = []
+    stop = time.perf_counter() + seconds
+
+    async def client(offset: int):
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as session:
+            i = offset
+            while time.perf_counter() < stop:
+                start = time.perf_counter()
+                response = await session.get(paths[i % len(paths)])
+                response.raise_for_status()
+                latencies.append(time.perf_counter() - start)
+                i += concurrency
+
+    await asyncio.gather(*(client(i) for i in range(concurrency)))
+    return np.array(latencies)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--districts', type=int, default=5_000)
+    parser.add_argument('--workers', type=int, nargs='+', default=[1, 2, 4])
+    parser.add_argument('--concurrency', type=int, default=16)
+    parser.add_argument('--seconds', type=float, default=10)
+    parser.add_argument('--port', type=int, default=8765)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as tmp:
+        root = Path(tmp)
+        write_processed_artifact(root, args.districts)
+        base_url = f"http://127.0.0.1:{args.port}"
+        print(f"{os.cpu_count()} CPUs, {args.districts:,} districts, {args.concurrency} concurrent clients, "
+              f"{args.seconds:.0f} s per run")
+        print(f"{'workers':>7} {'endpoint':<10} {'req/s':>8} {'p50 ms':>7} {'p95 ms':>7} {'p99 ms':>7}"
+              f"  {'RSS MB':>7} {'PSS MB':>7}")
+
+        for workers in args.workers:
+            server = start_server(root, workers, args.port)
+            try:
+                states = httpx.get(f"{base_url}/api/states").json()['states']
+                district_paths = [
+                    f"/api/districts/{state}/{district}"
+                    for state in states[:20]
+                    for district in httpx.get(f"{base_url}/api/states/{state}/districts").json()['districts']
+                ]
+                loads = {'districts': district_paths, 'heatmap': ['/api/risk/heatmap']}
+                for name, paths in loads.items():
+                    latencies = asyncio.run(drive(base_url, paths, args.concurrency, args.seconds))
+                    rss, pss = memory_mb(process_tree(server.pid))
+                    p50, p95, p99 = np.percentile(latencies, [50, 95, 99]) * 1000
+                    print(f"{workers:>7} {name:<10} {len(latencies) / args.seconds:>8,.0f} {p50:>7.1f} "
+                          f"{p95:>7.1f} {p99:>7.1f}  {rss:>7,.0f} {pss:>7,.0f}")
+            finally:
+                server.send_signal(signal.SIGTERM)
+                server.wait(timeout=30)
+
+
+if __name__ == '__main__':
+    main()
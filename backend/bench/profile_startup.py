@@ -0,0 +1,138 @@
+"""
+Profile server startup: module import time and time to live and to ready.
+
+First imports the app in a fresh interpreter under `python -X importtime`
+and lists the top-level imports by cumulative time, flagging heavy optional
+libraries that the server should not be importing. Then writes a synthetic
+artifact and starts the server on it: uvicorn with the data loaded in the
+background and loaded before serving (BACKGROUND_LOAD=0), and gunicorn with
+gunicorn.conf.py as deployed (the master preloads, answering /health
+meanwhile, then forks). Polls /health and /ready to report when the server
+first answered, when it was ready to serve data, and the time spent in each
+loading stage.
+Run from the backend directory:
+    python bench/profile_startup.py [--districts 20000] [--top 15]
+"""
+
+import argparse
+import os
+import socket
+import subprocess
+import sys
+import tempfile
+import time
+from pathlib import Path
+
+import httpx
+
+BACKEND = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND))
+
+from synthetic import write_processed_artifact
+
+# Large libraries only preprocessing or benchmarks should need
+HEAVY_IMPORTS = ['scipy', 'sklearn', 'matplotlib', 'pyarrow', 'numba']
+
+
+def import_profile() -> tuple:
+    """Total `import app` time (s), cumulative time per package it imports, and the packages loaded"""
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', "import app, sys; print('\\n'.join(sys.modules))"],
+        cwd=BACKEND, capture_output=True, text=True, check=True
+    )
+    # importtime also lists optional imports that failed (pandas probing for pyarrow), so ask sys.modules
+    loaded = {module.split('.')[0] for module in result.stdout.split()}
+    total, packages = 0.0, {}
+    for line in result.stderr.splitlines():
+        if not line.startswith('import time:') or 'cumulative' in line:
+            continue
+        _, cumulative, name = line[len('import time:'):].split('|')
+        seconds = int(cumulative) / 1e6
+        module = name.strip()
+        # Nested imports are indented two spaces per level under the module that imported them
+        depth = (len(name) - len(name.lstrip()) - 1) // 2
+        if module == 'app' and depth == 0:
+            total = seconds
+        elif depth == 1:
+            root = module.split('.')[0]
+            packages[root] = packages.get(root, 0) + seconds
+    return total, packages, loaded
+
+
+def free_port() -> int:
+    with socket.socket() as sock:
+        sock.bind(('127.0.0.1', 0))
+        return sock.getsockname()[1]
+
+
+def server_command(server: str, port: int) -> list:
+    if server == 'gunicorn':
+        return [sys.executable, '-m', 'gunicorn', 'app:app', '-c', str(BACKEND / 'gunicorn.conf.py'),
+                '--pythonpath', str(BACKEND), '--bind', f'127.0.0.1:{port}', '--log-level', 'warning']
+    return [sys.executable, '-m', 'uvicorn', 'app:app', '--port', str(port), '--log-level', 'warning',
+            '--app-dir', str(BACKEND)]
+
+
+def startup_timeline(root: Path, server_name: str, background: bool = True) -> dict:
+    port = free_port()
+    env = {**os.environ, 'BACKGROUND_LOAD': '1' if background else '0', 'RELOAD_POLL_SECONDS': '0'}
+    start = time.perf_counter()
+    server = subprocess.Popen(
+        server_command(server_name, port), cwd=root, env=env, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL
+    )
+    timeline = {'live': None, 'ready': None, 'load_progress': None}
+    try:
+        while time.perf_counter() - start < 300 and server.poll() is None:
+            try:
+                if timeline['live'] is None:
+                    httpx.get(f"http://127.0.0.1:{port}/health").raise_for_status()
+                    timeline['live'] = time.perf_counter() - start
+                response = httpx.get(f"http://127.0.0.1:{port}/ready")
+                if response.status_code == 200:
+                    timeline['ready'] = time.perf_counter() - start
+                    timeline['load_progress'] = response.json()['load_progress']
+                    break
+            except httpx.TransportError:
+                pass
+            time.sleep(0.02)
+    finally:
+        server.terminate()
+        server.wait()
+    return timeline
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--districts', type=int, default=20_000)
+    parser.add_argument('--top', type=int, default=15)
+    args = parser.parse_args()
+
+    total, packages, loaded = import_profile()
+    print(f"import app: {total:.3f} s")
+    for name, seconds in sorted(packages.items(), key=lambda item: -item[1])[:args.top]:
+        print(f"  {name:<24} {seconds:>7.3f} s")
+    heavy = [name for name in HEAVY_IMPORTS if name in loaded]
+    print(f"  heavy optional libraries imported: {', '.join(heavy) if heavy else 'none'}")
+
+    with tempfile.TemporaryDirectory() as tmp:
+        write_processed_artifact(Path(tmp), args.districts)
+        print(f"\n{args.districts:,} districts, server startup")
+        for label, server_name, background in [
+            ('uvicorn BACKGROUND_LOAD=1', 'uvicorn', True),
+            ('uvicorn BACKGROUND_LOAD=0', 'uvicorn', False),
+            ('gunicorn -c gunicorn.conf.py', 'gunicorn', True)
+        ]:
+            timeline = startup_timeline(Path(tmp), server_name, background)
+            if timeline['ready'] is None:
+                print(f"  {label}: server was not ready within 300 s")
+                continue
+            print(f"  {label}: /health answered after {timeline['live']:.2f} s, "
+                  f"/ready after {timeline['ready']:.2f} s")
+            progress = timeline['load_progress']
+            print(f"    {progress['rows_loaded']:,} rows loaded")
+            for stage, seconds in progress['stages'].items():
+                print(f"    {stage:<30} {seconds:>7.3f} s")
+
+
+if __name__ == '__main__':
+    main()
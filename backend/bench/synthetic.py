@@ -0,0 +1,134 @@
+"""
+Synthetic NI³S datasets for benchmarks.
+
+Generates data with the same schema as DataPipeline's outputs so the engines
+can be exercised at sizes well beyond the bundled CSVs.
+"""
+
+import pandas as pd
+import numpy as np
+from pathlib import Path
+
+DISTRICTS_PER_STATE = 25
+
+
+def make_master_data(num_districts: int, num_dates: int = 30, seed: int = 0) -> pd.DataFrame:
+    """Build a master_data frame shaped like DataPipeline._create_master_dataset's output"""
+    rng = np.random.default_rng(seed)
+
+    dates = pd.date_range('2025-03-01', periods=num_dates, freq='3D')
+
+    # Every district reports on a random subset of dates
+    present = rng.random((num_districts, num_dates)) < 0.8
+    present[:, -1] |= ~present.any(axis=1)
+    district_idx, date_idx = np.nonzero(present)
+    rows = len(district_idx)
+
+    states = np.array([f"State {i:04d}" for i in range(num_districts // DISTRICTS_PER_STATE + 1)], dtype=object)
+    districts = np.array([f"District {i:06d}" for i in range(num_districts)], dtype=object)
+
+    df = pd.DataFrame({
+        'state': states[district_idx // DISTRICTS_PER_STATE],
+        'district': districts[district_idx],
+        'date': dates[date_idx],
+        'demo_age_5_17': rng.integers(1, 5_000, rows),
+        'demo_age_17_': rng.integers(1, 20_000, rows),
+    })
+    df['total_population'] = df['demo_age_5_17'] + df['demo_age_17_']
+
+    base = rng.integers(0, 3_000, num_districts)
+    df['age_0_5'] = rng.integers(0, 500, rows)
+    df['age_5_17'] = (base[district_idx] + rng.integers(0, 300, rows)) // 2
+    df['age_18_greater'] = base[district_idx] + rng.integers(0, 1_000, rows)
+
+    # Some districts report nothing for a while, others sit flat
+    zero = rng.random(rows) < 0.05
+    df.loc[zero, ['age_0_5', 'age_5_17', 'age_18_greater']] = 0
+    df['total_enrollments'] = df['age_0_5'] + df['age_5_17'] + df['age_18_greater']
+
+    df['penetration_rate'] = np.where(
+        df['total_population'] > 0,
+        df['total_enrollments'] / df['total_population'],
+        0
+    ).clip(max=1.0)
+    df['youth_enrollment_rate'] = np.where(
+        df['demo_age_5_17'] > 0,
+        df['age_5_17'] / df['demo_age_5_17'],
+        0
+    ).clip(max=1.0)
+    df['adult_enrollment_rate'] = np.where(
+        df['demo_age_17_'] > 0,
+        df['age_18_greater'] / df['demo_age_17_'],
+        0
+    ).clip(max=1.0)
+
+    return df
+
+
+def write_processed_artifact(root: Path, num_districts: int, num_dates: int = 30, seed: int = 0) -> str:
+    """Write a synthetic data/processed artifact under root, as preprocess.py would"""
+    from artifact_store import save_artifact
+    from feature_engine import compute_district_features
+
+    master_data = make_master_data(num_districts, num_dates, seed)
+    return save_artifact(
+        {'master_data': master_data, 'district_features': compute_district_features(master_data)},
+        Path(root) / "data" / "processed"
+    )
+
+
+# Raw spellings seen in the source files, mapped by DataPipeline's cleaners
+DIRTY_STATES = ['WEST BENGAL', 'West bengal', 'Westbengal', 'ODISHA', 'Orissa', 'Uttaranchal', 'Jammu & Kashmir']
+DIRTY_DISTRICTS = ['Hawrah', 'HOOGHLY', 'South 24 parganas', 'Khurda', 'Gurgaon', 'Bangalore', 'Garhwa *']
+INVALID_STATES = ['100000']
+WRITE_BLOCK_ROWS = 1_000_000
+
+
+def write_raw_csvs(directory: Path, demographic_rows: int = 2_071_700, enrollment_rows: int = 1_006_029,
+                   num_districts: int = 1_000, num_dates: int = 90, seed: int = 0,
+                   start_date: str = '2025-03-01', demographic_files: int = 5, enrollment_files: int = 3):
+    """
+    Write DEMOGRAPHIC_1..5.csv and ENROLLMENT_1..3.csv in the source schema.
+
+    Defaults match the row counts of the real input files. A small share of
+    rows uses dirty state/district spellings, invalid states and blank
+    districts so the cleaning paths are exercised.
+    """
+    rng = np.random.default_rng(seed)
+    directory = Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+
+    dates = pd.date_range(start_date, periods=num_dates, freq='D').strftime('%d-%m-%Y').to_numpy()
+    states = np.array([f"State {i:03d}" for i in range(num_districts // DISTRICTS_PER_STATE + 1)] + DIRTY_STATES + INVALID_STATES, dtype=object)
+    districts = np.array([f"District {i:05d}" for i in range(num_districts)] + DIRTY_DISTRICTS, dtype=object)
+
+    def keys(rows: int) -> pd.DataFrame:
+        district_idx = rng.integers(0, num_districts, rows)
+        state_idx = district_idx // DISTRICTS_PER_STATE
+        frame = pd.DataFrame({
+            'date': dates[rng.integers(0, num_dates, rows)],
+            'state': states[state_idx],
+            'district': districts[district_idx],
+            'pincode': 100_000 + district_idx * 10 + rng.integers(0, 10, rows),
+        })
+        dirty = rng.random(rows) < 0.01
+        frame.loc[dirty, 'state'] = rng.choice(states[-(len(DIRTY_STATES) + len(INVALID_STATES)):], dirty.sum())
+        frame.loc[dirty, 'district'] = rng.choice(districts[-len(DIRTY_DISTRICTS):], dirty.sum())
+        frame.loc[rng.random(rows) < 0.001, 'district'] = None
+        return frame
+
+    def write(prefix: str, rows: int, files: int, counts: dict):
+        bounds = np.linspace(0, rows, files + 1).astype(int)
+        for i in range(files):
+            path = directory / f"{prefix}_{i + 1}.csv"
+            file_rows = int(bounds[i + 1] - bounds[i])
+            # Written in blocks so memory stays flat however many rows are requested
+            for start in range(0, max(file_rows, 1), WRITE_BLOCK_ROWS):
+                block_rows = min(WRITE_BLOCK_ROWS, file_rows - start)
+                block = keys(block_rows)
+                for column, high in counts.items():
+                    block[column] = rng.integers(0, high, block_rows)
+                block.to_csv(path, mode='w' if start == 0 else 'a', header=start == 0, index=False)
+
+    write('DEMOGRAPHIC', demographic_rows, demographic_files, {'demo_age_5_17': 40, 'demo_age_17_': 200})
+    write('ENROLLMENT', enrollment_rows, enrollment_files, {'age_0_5': 30, 'age_5_17': 20, 'age_18_greater': 10})
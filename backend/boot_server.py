@@ -0,0 +1,86 @@
+"""
+Minimal HTTP responder for the gunicorn master while it preloads the data.
+
+Under gunicorn (gunicorn.conf.py) the master loads the dataset before forking
+the workers, so nothing would accept connections on the bound port until it
+finishes and a health check could not tell a booting server from a dead one.
+BootStatusServer answers on the master's listening sockets meanwhile: /health
+with 200 and the load progress, /ready and every other path with 503.
+Connections still queued when it stops are served by the workers.
+"""
+
+import json
+import select
+import socket
+import threading
+from typing import Any, Callable, Dict, Optional, Sequence
+
+READ_TIMEOUT = 1.0
+MAX_REQUEST_BYTES = 8192
+REASONS = {200: 'OK', 503: 'Service Unavailable'}
+
+
+class BootStatusServer:
+    def __init__(self, sockets: Sequence[socket.socket], status: Callable[[], Dict[str, Any]]):
+        self.sockets = list(sockets)
+        self.status = status
+        self.served = 0
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def __enter__(self) -> 'BootStatusServer':
+        self._thread = threading.Thread(target=self._serve, name='boot-status', daemon=True)
+        self._thread.start()
+        return self
+
+    def __exit__(self, *exc_info):
+        self._stop.set()
+        # Lets a response in progress finish before the workers take over the sockets
+        self._thread.join()
+
+    def _serve(self):
+        while not self._stop.is_set():
+            readable, _, _ = select.select(self.sockets, [], [], 0.1)
+            for listener in readable:
+                try:
+                    conn, _ = listener.accept()
+                except (BlockingIOError, InterruptedError):
+                    continue
+                with conn:
+                    try:
+                        self._respond(conn)
+                    except OSError:
+                        pass
+                self.served += 1
+
+    def _respond(self, conn: socket.socket):
+        conn.setblocking(True)
+        conn.settimeout(READ_TIMEOUT)
+        request = b''
+        while b'\r\n\r\n' not in request and len(request) < MAX_REQUEST_BYTES:
+            chunk = conn.recv(4096)
+            if not chunk:
+                break
+            request += chunk
+        method, path = (request.split(b'\r\n', 1)[0].decode('latin-1').split(' ') + ['', ''])[:2]
+        status_code, payload = self.response(path.split('?', 1)[0])
+        body = json.dumps(payload).encode()
+        head = (
+            f"HTTP/1.1 {status_code} {REASONS[status_code]}\r\n"
+            f"Content-Type: application/json\r\n"
+            f"Content-Length: {len(body)}\r\n"
+            f"Cache-Control: no-store\r\n"
+            f"Connection: close\r\n\r\n"
+        ).encode()
+        conn.sendall(head if method == 'HEAD' else head + body)
+
+    def response(self, path: str):
+        """Status code and JSON payload for a request path while the data loads"""
+        status = self.status()
+        if path == '/health':
+            return 200, status
+        if path == '/ready':
+            return 503, status
+        progress = status.get('load_progress')
+        stage = f" ({progress['stage']})" if progress else ""
+        return 503, {'detail': f"System is still initializing{stage}"}
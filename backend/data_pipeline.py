@@ -1,446 +1,422 @@
+import os
+import re
+import hashlib
+import importlib.util
 import pandas as pd
 import numpy as np
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
-from typing import Dict, List
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+from instrumentation import add, measure, stage
+from name_normalizer import get_name_normalizer
+from schema import compact_master_data
+
+DEMOGRAPHIC_PATTERN = "DEMOGRAPHIC_*.csv"
+ENROLLMENT_PATTERN = "ENROLLMENT_*.csv"
+
+# District-date level sums, before the zero-population filter and the merge
+AGGREGATE_KEYS = ['state', 'district', 'date']
+DEMOGRAPHIC_COUNTS = ['demo_age_5_17', 'demo_age_17_']
+ENROLLMENT_COUNTS = ['age_0_5', 'age_5_17', 'age_18_greater']
+
+# Explicit column types: counts and pincodes fit in int32, names repeat heavily
+DEMOGRAPHIC_DTYPES = {
+    'state': 'category',
+    'district': 'category',
+    'pincode': 'int32',
+    'demo_age_5_17': 'int32',
+    'demo_age_17_': 'int32'
+}
+ENROLLMENT_DTYPES = {
+    'state': 'category',
+    'district': 'category',
+    'pincode': 'int32',
+    'age_0_5': 'int32',
+    'age_5_17': 'int32',
+    'age_18_greater': 'int32'
+}
+DATE_FORMAT = '%d-%m-%Y'
+CSV_CHUNKSIZE = 250_000
+
+
+def discover_input_files(data_dir: Path, pattern: str) -> List[str]:
+    """File names matching pattern, in numeric order (DEMOGRAPHIC_2 before DEMOGRAPHIC_10)"""
+    def number(name: str) -> int:
+        match = re.search(r'(\d+)\.csv$', name)
+        return int(match.group(1)) if match else 0
+    
+    return sorted((path.name for path in Path(data_dir).glob(pattern)), key=lambda name: (number(name), name))
+
+
+def fingerprint_file(filepath: Path) -> Dict[str, Any]:
+    """Size and content hash of an input file"""
+    digest = hashlib.sha256()
+    with open(filepath, 'rb') as f:
+        for block in iter(lambda: f.read(1 << 20), b''):
+            digest.update(block)
+    return {'size': filepath.stat().st_size, 'sha256': digest.hexdigest()}
+
+
+def _parse_dates(dates: pd.Series) -> pd.Series:
+    try:
+        return pd.to_datetime(dates, format=DATE_FORMAT)
+    except ValueError:
+        # Fall back to flexible parsing for files that mix date formats
+        return pd.to_datetime(dates, dayfirst=True)
+
+
+def _concat_frames(frames: List[pd.DataFrame]) -> pd.DataFrame:
+    """Concatenate frames, keeping categorical columns categorical (with sorted categories)"""
+    if not frames:
+        return pd.DataFrame()
+    
+    for column in frames[0].columns:
+        if isinstance(frames[0][column].dtype, pd.CategoricalDtype):
+            categories = sorted(set().union(*(f[column].cat.categories for f in frames)))
+            frames = [f.assign(**{column: f[column].cat.set_categories(categories)}) for f in frames]
+    
+    return pd.concat(frames, ignore_index=True)
+
+
+def _key_index(df: pd.DataFrame) -> pd.MultiIndex:
+    return pd.MultiIndex.from_frame(df[AGGREGATE_KEYS])
+
+
+def _upsert_aggregates(existing: pd.DataFrame, new: pd.DataFrame) -> pd.DataFrame:
+    """Add new district-date sums to existing ones, re-aggregating only the partitions present in new"""
+    if new.empty:
+        return existing
+    
+    touched = _key_index(existing).isin(_key_index(new))
+    updated = pd.concat([existing[touched], new], ignore_index=True).groupby(
+        AGGREGATE_KEYS, sort=False
+    ).sum().reset_index()
+    
+    return pd.concat([existing[~touched], updated], ignore_index=True).sort_values(AGGREGATE_KEYS, ignore_index=True)
+
+
+def _prepare_chunk(df: pd.DataFrame, names) -> pd.DataFrame:
+    """Parse dates and clean state/district names of freshly read rows"""
+    df['date'] = _parse_dates(df['date'])
+    df['state'] = names.clean_states(df['state'])
+    df['district'] = names.clean_districts(df['district'])
+    return df
+
+
+def _fold_aggregates(parts: List[pd.DataFrame]) -> pd.DataFrame:
+    """Sum partial district-date aggregates into one row per (state, district, date)"""
+    if len(parts) == 1:
+        return parts[0]
+    return pd.concat(parts, ignore_index=True).groupby(AGGREGATE_KEYS, sort=True).sum().reset_index()
+
+
+def _load_dataset_file(filepath: Path, dtypes: Dict[str, str], chunksize: int, engine: str,
+                       mappings_file: Optional[Path] = None) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+    """Read one CSV (runs in a worker process), with its stage record"""
+    df, record = measure('read_csv', _read_dataset_file, filepath, dtypes, chunksize, engine, mappings_file,
+                         file=filepath.name)
+    record['rows'] = len(df)
+    return df, record
+
+
+def _read_dataset_file(filepath: Path, dtypes: Dict[str, str], chunksize: int, engine: str,
+                       mappings_file: Optional[Path] = None) -> pd.DataFrame:
+    """Read one CSV in chunks, parsing dates and cleaning names per chunk"""
+    names = get_name_normalizer(mappings_file)
+    
+    if engine == 'pyarrow':
+        # The pyarrow engine is multithreaded but does not support chunked reads
+        return _prepare_chunk(pd.read_csv(filepath, dtype=dtypes, engine='pyarrow'), names)
+    
+    chunks = [_prepare_chunk(chunk, names) for chunk in pd.read_csv(filepath, dtype=dtypes, chunksize=chunksize)]
+    return _concat_frames(chunks)
+
+
+def _aggregate_dataset_file(filepath: Path, dtypes: Dict[str, str], count_columns: List[str], chunksize: int,
+                            mappings_file: Optional[Path] = None) -> Tuple[pd.DataFrame, int, Dict[str, Any]]:
+    """Aggregate one CSV (runs in a worker process): the sums, invalid rows and its stage record"""
+    (aggregate, invalid_rows), record = measure(
+        'aggregate_csv', _stream_dataset_file, filepath, dtypes, count_columns, chunksize, mappings_file,
+        file=filepath.name
+    )
+    record['rows'] = len(aggregate)
+    record['invalid_rows'] = invalid_rows
+    return aggregate, invalid_rows, record
+
+
+def _stream_dataset_file(filepath: Path, dtypes: Dict[str, str], count_columns: List[str], chunksize: int,
+                         mappings_file: Optional[Path] = None) -> Tuple[pd.DataFrame, int]:
+    """
+    Stream one CSV into per-(state, district, date) sums.
+    
+    Each chunk is aggregated on its own and folded into the running sums, so
+    only one chunk of raw rows is held at a time. Returns the sums and the
+    number of rows dropped for invalid states.
+    """
+    pipeline = DataPipeline(filepath.parent, mappings_file)
+    running: List[pd.DataFrame] = []
+    pending: List[pd.DataFrame] = []
+    pending_rows = 0
+    invalid_rows = 0
+    
+    columns = AGGREGATE_KEYS + count_columns
+    for chunk in pd.read_csv(filepath, dtype=dtypes, usecols=columns, chunksize=chunksize):
+        chunk = _prepare_chunk(chunk, pipeline.names)
+        valid = chunk['state'] != 'Unknown'
+        invalid_rows += int((~valid).sum())
+        
+        partial = pipeline._aggregate(chunk[valid], count_columns)
+        if len(partial):
+            pending.append(partial)
+            pending_rows += len(partial)
+        
+        # Fold once the partial sums outgrow the running result, so memory follows the output size
+        if pending_rows >= max(sum(len(f) for f in running), chunksize):
+            running = [_fold_aggregates(running + pending)]
+            pending = []
+            pending_rows = 0
+    
+    parts = running + pending
+    if not parts:
+        return pipeline._aggregate(pd.DataFrame(), count_columns), invalid_rows
+    return _fold_aggregates(parts), invalid_rows
+
 
 class DataPipeline:
-    def __init__(self, data_dir: str = "data"):
+    def __init__(self, data_dir: str = "data", mappings_file: Optional[Path] = None):
         self.data_dir = Path(data_dir)
+        self.mappings_file = mappings_file
+        self.names = get_name_normalizer(mappings_file)
         self.demographic_datasets = []
         self.enrollment_datasets = []
         self.demographic_combined = None
         self.enrollment_combined = None
         self.master_data = None
+        self.demographic_aggregates = None
+        self.enrollment_aggregates = None
+        self.input_files = {}
         
     def _clean_state_name(self, state_name: str) -> str:
-        """Standardize state names - ENHANCED VERSION"""
-        if pd.isna(state_name):
-            return "Unknown"
-        
-        state_name = str(state_name).strip()
-        
-        # Remove extra spaces
-        state_name = ' '.join(state_name.split())
-        
-        # Map city names to their states
-        city_to_state = {
-            'JAIPUR': 'Rajasthan',
-            'NAGPUR': 'Maharashtra',
-            'DARBHANGA': 'Bihar',
-            'MADANAPALLE': 'Andhra Pradesh',
-            'PUTTENAHALLI': 'Karnataka',
-            'RAJA ANNAMALAI PURAM': 'Tamil Nadu',
-            '100000': 'Unknown'  # Invalid entry
-        }
-        
-        # Check if it's a city name that should be a state
-        state_upper = state_name.upper()
-        if state_upper in city_to_state:
-            return city_to_state[state_upper]
-        
-        # State name mappings
-        mappings = {
-            # West Bengal variations
-            'WEST BENGAL': 'West Bengal',
-            'WESTBENGAL': 'West Bengal',
-            'Westbengal': 'West Bengal',
-            'West bengal': 'West Bengal',
-            'West Bangal': 'West Bengal',
-            'West Bengli': 'West Bengal',
-            'west bengal': 'West Bengal',
-            'West  Bengal': 'West Bengal',
-            
-            # Odisha variations
-            'ODISHA': 'Odisha',
-            'odisha': 'Odisha',
-            'Orissa': 'Odisha',
-            
-            # Chhattisgarh variations
-            'Chatisgarh': 'Chhattisgarh',
-            'Chhattisgarhh': 'Chhattisgarh',
-            'CHHATTISGARH': 'Chhattisgarh',
-            
-            # Union Territories
-            'The Dadra And Nagar Haveli And Daman And Diu': 'Dadra and Nagar Haveli and Daman and Diu',
-            'Dadra & Nagar Haveli': 'Dadra and Nagar Haveli and Daman and Diu',
-            'Daman & Diu': 'Dadra and Nagar Haveli and Daman and Diu',
-            'Dadra and Nagar Haveli': 'Dadra and Nagar Haveli and Daman and Diu',
-            'Daman and Diu': 'Dadra and Nagar Haveli and Daman and Diu',
-            'Jammu & Kashmir': 'Jammu and Kashmir',
-            'Jammu And Kashmir': 'Jammu and Kashmir',
-            'Andaman & Nicobar Islands': 'Andaman and Nicobar Islands',
-            'Uttaranchal': 'Uttarakhand',
-            'Pondicherry': 'Puducherry'
-        }
-        
-        # Apply mappings
-        cleaned = mappings.get(state_name, state_name)
-        
-        # Capitalize properly if needed
-        if cleaned.islower():
-            cleaned = cleaned.title()
-        
-        return cleaned
+        """Standardize state names"""
+        return self.names.clean_state(state_name)
     
-    # Replace the _clean_district_name method in data_pipeline.py with this enhanced version:
-
     def _clean_district_name(self, district_name: str) -> str:
+        """Standardize district names"""
+        return self.names.clean_district(district_name)
+    
+    def load_all_datasets(self, workers: Optional[int] = None, chunksize: int = CSV_CHUNKSIZE, engine: str = 'c',
+                          demographic_files: Optional[List[str]] = None,
+                          enrollment_files: Optional[List[str]] = None):
+        """
+        Load every demographic and enrollment CSV (or only the files named).
         
-        if pd.isna(district_name):
-            return "Unknown"
-        
-        district_name = str(district_name).strip()
-        
-        # Remove asterisks, extra spaces, and normalize
-        district_name = district_name.replace('*', '').strip()
-        district_name = ' '.join(district_name.split())
-        
-        # Comprehensive district mappings (add more as you discover them)
-        mappings = {
-        # Andhra Pradesh
-        'K.v. Rangareddy': 'K.V.Rangareddy',
-        'Mahabub Nagar': 'Mahbubnagar',
-        'Mahabubnagar': 'Mahbubnagar',
-        'Karim Nagar': 'Karimnagar',
-        'Ananthapur': 'Anantapur',
-        'Ananthapuramu': 'Anantapur',
-        'Anantpur': 'Anantapur',
-        
-        # Arunachal Pradesh (East/West are different districts - keep separate)
-        # West Kameng, East Kameng, West Siang, East Siang are DIFFERENT districts
-        
-        # Assam
-        'West Karbi Anglong': 'Karbi Anglong',
-        'Baska': 'Baksa',
-        'Kamrup Metro': 'Kamrup Metropolitan',
-        
-        # Bihar
-        'Samastipur': 'Samstipur',
-        'Sheikhpura': 'Sheikpura',
-        'West Champaran': 'Pashchim Champaran',
-        'East Champaran': 'Purvi Champaran',
-        'Purba Champaran': 'Purvi Champaran',
-        'Pashchim Chamaparan': 'Pashchim Champaran',
-        'Purvi Chamaparan': 'Purvi Champaran',
-        'Aurangabad(BH)': 'Aurangabad',
-        'Aurangabad(bh)': 'Aurangabad',
-        'Purnia': 'Purnea',
-        'Purniya': 'Purnea',
-        'Muzafarpur': 'Muzaffarpur',
-        'Muzzafarpur': 'Muzaffarpur',
-        'Araria': 'Araria',
-        'Araira': 'Araria',
-        
-        # Chhattisgarh
-        'Janjgir - Champa': 'Janjgir-Champa',
-        'Janjgir Champa': 'Janjgir-Champa',
-        'Janjgir-champa': 'Janjgir-Champa',
-        'Mohalla-Manpur-Ambagarh Chowki': 'Mohla-Manpur-Ambagarh Chouki',
-        
-        # Delhi (All are separate districts - keep as is)
-        # North West Delhi, North East Delhi, etc. are DIFFERENT districts
-        
-        # Goa (North and South Goa are different - keep separate)
-        
-        # Gujarat
-        'Surendra Nagar': 'Surendranagar',
-        'Banas Kantha': 'Banaskantha',
-        'Panch Mahals': 'Panchmahal',
-        'Panchmahals': 'Panchmahal',
-        'Sabar Kantha': 'Sabarkantha',
-        'Ahmedabad': 'Ahmedabad',
-        'Ahmadabad': 'Ahmedabad',
-        'Kachchh': 'Kutch',
-        'Mahesana': 'Mehsana',
-        
-        # Haryana
-        'Yamuna Nagar': 'Yamunanagar',
-        'Gurgaon': 'Gurugram',
-        
-        # Himachal Pradesh
-        'Lahaul and Spiti': 'Lahul and Spiti',
-        'Lahul & Spiti': 'Lahul and Spiti',
-        
-        # Jammu and Kashmir
-        'Budgam': 'Badgam',
-        'Bandipore': 'Bandipur',
-        
-        # Jharkhand
-        'Hazaribagh': 'Hazaribag',
-        'Palamau': 'Palamu',
-        'Pakaur': 'Pakur',
-        'Sahibganj': 'Sahebganj',
-        'Garhwa *': 'Garhwa',
-        'Koderma': 'Kodarma',
-        'Pashchimi Singhbhum': 'West Singhbhum',
-        'Purbi Singhbhum': 'East Singhbhum',
-        'Seraikela Kharsawan': 'Seraikela-Kharsawan',
-        
-        # Karnataka
-        'Chamarajanagar': 'Chamarajanagar',
-        'Chamrajanagar': 'Chamarajanagar',
-        'Chamrajnagar': 'Chamarajanagar',
-        'Chamarajanagar *': 'Chamarajanagar',
-        'Chickmagalur': 'Chikkamagaluru',
-        'Chikmagalur': 'Chikkamagaluru',
-        'Chikkamagaluru': 'Chikkamagaluru',
-        'Davanagere': 'Davangere',
-        'Hassan': 'Hassan',
-        'Hasan': 'Hassan',
-        'Bagalkot *': 'Bagalkot',
-        'Haveri *': 'Haveri',
-        'Tumakuru': 'Tumakuru',
-        'Tumkur': 'Tumakuru',
-        'Gadag *': 'Gadag',
-        'Udupi *': 'Udupi',
-        'Shivamogga': 'Shivamogga',
-        'Shimoga': 'Shivamogga',
-        'Bengaluru Rural': 'Bengaluru Rural',
-        'Bangalore Rural': 'Bengaluru Rural',
-        'Bangalore': 'Bengaluru Urban',
-        'Bengaluru': 'Bengaluru Urban',
-        'Bangalore Urban': 'Bengaluru Urban',
-        'Belgaum': 'Belagavi',
-        'Mysore': 'Mysuru',
-        
-        # Kerala
-        'Kasaragod': 'Kasaragod',
-        'Kasargod': 'Kasaragod',
-        'Trivandrum': 'Thiruvananthapuram',
-        'Alleppey': 'Alappuzha',
-        'Calicut': 'Kozhikode',
-        'Trichur': 'Thrissur',
-        
-        # Madhya Pradesh
-        'Harda *': 'Harda',
-        'Narsinghpur': 'Narsimhapur',
-        'Hoshangabad': 'Narmadapuram',
-        
-        # Maharashtra
-        'Chhatrapati Sambhajinagar': 'Aurangabad',
-        'Chatrapati Sambhaji Nagar': 'Aurangabad',
-        'Buldhana': 'Buldana',
-        'Gondiya': 'Gondia',
-        'Gondiya *': 'Gondia',
-        'Nandurbar *': 'Nandurbar',
-        'Mumbai( Sub Urban )': 'Mumbai Suburban',
-        'Hingoli *': 'Hingoli',
-        'Ahmed Nagar': 'Ahmednagar',
-        'Ahmadnagar': 'Ahmednagar',
-        'Ahilyanagar': 'Ahmednagar',
-        'Washim *': 'Washim',
-        'Raigarh(MH)': 'Raigad',
-        'Raigarh': 'Raigad',
-        'Bid': 'Beed',
-        'Dharashiv': 'Osmanabad',
-        'Dist : Thane': 'Thane',
-        'Mumbai City': 'Mumbai',
-        
-        # Manipur (Imphal East and West are different - keep separate)
-        
-        # Meghalaya (All cardinal direction districts are separate - keep as is)
-        
-        # Mizoram
-        'Mammit': 'Mamit',
-        
-        # Odisha
-        'Jagatsinghapur': 'Jagatsinghpur',
-        'Baleshwar': 'Balasore',
-        'Baleswar': 'Balasore',
-        'Jajapur': 'Jajpur',
-        'JAJPUR': 'Jajpur',
-        'jajpur': 'Jajpur',
-        'Jajapur  *': 'Jajpur',
-        'Khordha': 'Khordha',
-        'Khorda': 'Khordha',
-        'Khurda': 'Khordha',
-        'ANUGUL': 'Angul',
-        'Anugul': 'Angul',
-        'Anugal': 'Angul',
-        'Sundergarh': 'Sundargarh',
-        'Bhadrak(R)': 'Bhadrak',
-        'Debagarh': 'Deogarh',
-        'Boudh': 'Baudh',
-        'Cuttack': 'Cuttack',
-        'Katack': 'Cuttack',
-        
-        # Orissa (old name for Odisha - same mappings apply)
-        
-        # Puducherry
-        'Pondicherry': 'Puducherry',
-        
-        # Punjab
-        'S.A.S Nagar(Mohali)': 'SAS Nagar (Mohali)',
-        'Ferozepur': 'Firozpur',
-        
-        # Rajasthan
-        'Jhunjhunun': 'Jhunjhunu',
-        'Jalore': 'Jalore',
-        'Jalor': 'Jalore',
-        'Chittaurgarh': 'Chittorgarh',
-        'Dhaulpur': 'Dholpur',
-        
-        # Sikkim (All cardinal direction districts are separate - keep as is)
-        
-        # Tamil Nadu
-        'Thiruvallur': 'Tiruvallur',
-        'Thiruvarur': 'Tiruvarur',
-        'Kanniyakumari': 'Kanyakumari',
-        'Tirupattur': 'Tirupathur',
-        'Viluppuram': 'Viluppuram',
-        'Villupuram': 'Viluppuram',
-        'Kancheepuram': 'Kanchipuram',
-        'Tiruchirapalli': 'Tiruchirappalli',
-        'Trichy': 'Tiruchirappalli',
-        'Tuticorin': 'Thoothukudi',
-        'The Nilgiris': 'Nilgiris',
-        
-        # Telangana
-        'Medchal?malkajgiri': 'Medchal-Malkajgiri',
-        'Medchal−malkajgiri': 'Medchal-Malkajgiri',
-        'Medchalâmalkajgiri': 'Medchal-Malkajgiri',
-        'Medchal-malkajgiri': 'Medchal-Malkajgiri',
-        'Medchal Malkajgiri': 'Medchal-Malkajgiri',
-        'Warangal (urban)': 'Warangal Urban',
-        'Sangareddy': 'Sangareddy',
-        'Rangareddy': 'Ranga Reddy',
-        'Ranga Reddy': 'Ranga Reddy',
-        'K.v. Rangareddy': 'Ranga Reddy',
-        'Jangoan': 'Jangaon',
-        'Vishakhapatnam': 'Visakhapatnam',
-        'Vizag': 'Visakhapatnam',
-        'YSR': 'YSR Kadapa',
-        'Cuddapah': 'YSR Kadapa',
-        'Kadapa': 'YSR Kadapa',
-        
-        # Tripura
-        'Dhalai  *': 'Dhalai',
-        
-        # Uttar Pradesh
-        'Bulandshahar': 'Bulandshahr',
-        'Maharajganj': 'Mahrajganj',
-        'Jyotiba Phule Nagar *': 'Jyotiba Phule Nagar',
-        'Bara Banki': 'Barabanki',
-        'Rae Bareli': 'Raebareli',
-        'Baghpat': 'Baghpat',
-        'Bagpat': 'Baghpat',
-        'Baghpat *': 'Baghpat',
-        'Chitrakoot *': 'Chitrakoot',
-        'Kushinagar *': 'Kushinagar',
-        'Chandauli *': 'Chandauli',
-        'Sant Ravidas Nagar Bhadohi': 'Sant Ravidas Nagar',
-        'Gautam Buddha Nagar': 'Gautam Budh Nagar',
-        'GB Nagar': 'Gautam Budh Nagar',
-        'Noida': 'Gautam Budh Nagar',
-        'Kanpur Nagar': 'Kanpur',
-        'Kanpur Dehat': 'Kanpur Dehat',
-        'Kanpur Rural': 'Kanpur Dehat',
-        'Sant Kabir Nagar': 'Sant Kabir Nagar',
-        'Sant Ravi Das Nagar': 'Sant Ravidas Nagar',
-        'Mahamaya Nagar': 'Hathras',
-        'Lakhimpur Kheri': 'Lakhimpur Kheri',
-        'Kheri': 'Lakhimpur Kheri',
-        'Pilibhit': 'Pilibhit',
-        
-        # Uttarakhand
-        'Haridwar': 'Haridwar',
-        'Hardwar': 'Haridwar',
-        
-        # West Bengal - CRITICAL FIXES FOR YOUR AREA
-        'Hawrah': 'Howrah',
-        'HOWRAH': 'Howrah',
-        'Haora': 'Howrah',
-        'Hugli': 'Hooghly',
-        'Hoogly': 'Hooghly',
-        'Hooghiy': 'Hooghly',
-        'HOOGHLY': 'Hooghly',
-        'hooghly': 'Hooghly',
-        'Purba Medinipur': 'Purba Midnapore',
-        'Purba Midnapur': 'Purba Midnapore',
-        'East Midnapore': 'Purba Midnapore',
-        'east midnapore': 'Purba Midnapore',
-        'East Midnapur': 'Purba Midnapore',
-        'Paschim Medinipur': 'Paschim Midnapore',
-        'Paschim Midnapur': 'Paschim Midnapore',
-        'West Midnapore': 'Paschim Midnapore',
-        'West Medinipur': 'Paschim Midnapore',
-        'Medinipur': 'Paschim Midnapore',  # Assume West if not specified
-        'North 24 Parganas': 'North Twenty Four Parganas',
-        'South 24 Parganas': 'South Twenty Four Parganas',
-        'South 24 parganas': 'South Twenty Four Parganas',
-        'South 24 Pargana': 'South Twenty Four Parganas',
-        'South 24 pargana': 'South Twenty Four Parganas',
-        'South  Twenty Four Parganas': 'South Twenty Four Parganas',
-        'Darjiling': 'Darjeeling',
-        'Darjeeling': 'Darjeeling',
-        'Dakshin Dinajpur': 'Dakshin Dinajpur',
-        'South Dinajpur': 'Dakshin Dinajpur',
-        'Uttar Dinajpur': 'Uttar Dinajpur',
-        'North Dinajpur': 'Uttar Dinajpur',
-        'Koch Bihar': 'Cooch Behar',
-        'Kochbihar': 'Cooch Behar',
-        'Puruliya': 'Purulia',
-        'Barddhaman': 'Bardhaman',
-        'Paschim Bardhaman': 'Paschim Bardhaman',
-        'Purba Bardhaman': 'Purba Bardhaman',
-    }
-
-        
-        # Try exact match (case-insensitive)
-        for key, value in mappings.items():
-            if district_name.lower() == key.lower():
-                return value
+        Files are read concurrently in a process pool (workers=1 reads them
+        in-process, one after another). engine='pyarrow' is used when pyarrow
+        is installed.
+        """
+        if engine == 'pyarrow' and importlib.util.find_spec('pyarrow') is None:
+            print("pyarrow is not installed, falling back to the C CSV engine")
+            engine = 'c'
+        
+        if demographic_files is None:
+            demographic_files = self._discover(DEMOGRAPHIC_PATTERN)
+        if enrollment_files is None:
+            enrollment_files = self._discover(ENROLLMENT_PATTERN)
+        
+        jobs = (
+            [(self.data_dir / filename, DEMOGRAPHIC_DTYPES) for filename in demographic_files] +
+            [(self.data_dir / filename, ENROLLMENT_DTYPES) for filename in enrollment_files]
+        )
         
-        # If no match found, ensure proper capitalization
-        if district_name.islower() or district_name.isupper():
-            district_name = district_name.title()
+        if workers is None:
+            workers = min(len(jobs), os.cpu_count() or 1)
+        
+        paths = [path for path, _ in jobs]
+        dtypes = [dtype for _, dtype in jobs]
+        
+        with stage('load_all_datasets', files=len(jobs), workers=workers, engine=engine) as record:
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(
+                        _load_dataset_file, paths, dtypes, [chunksize] * len(jobs), [engine] * len(jobs),
+                        [self.mappings_file] * len(jobs)
+                    ))
+            else:
+                results = [_load_dataset_file(path, dtype, chunksize, engine, self.mappings_file) for path, dtype in jobs]
+            for _, file_record in results:
+                add(file_record)
+            frames = [df for df, _ in results]
+            record['rows'] = sum(len(df) for df in frames)
         
-        return district_name
-    
-        
-    def load_all_datasets(self):
         print("Loading demographic datasets...")
-        for i in range(1, 6):
-            filename = f"DEMOGRAPHIC_{i}.csv"
-            filepath = self.data_dir / filename
-            df = pd.read_csv(filepath)
-            df['date'] = pd.to_datetime(df['date'], dayfirst=True)
-            
-            # Clean state and district names
-            df['state'] = df['state'].apply(self._clean_state_name)
-            df['district'] = df['district'].apply(self._clean_district_name)
-            
+        for filename, df in zip(demographic_files, frames[:len(demographic_files)]):
             self.demographic_datasets.append(df)
             print(f"  Loaded {filename}: {len(df)} rows")
         
         print("\nLoading enrollment datasets...")
-        for i in range(1, 4):
-            filename = f"ENROLLMENT_{i}.csv"
-            filepath = self.data_dir / filename
-            df = pd.read_csv(filepath)
-            df['date'] = pd.to_datetime(df['date'], dayfirst=True)
-            
-            # Clean state and district names
-            df['state'] = df['state'].apply(self._clean_state_name)
-            df['district'] = df['district'].apply(self._clean_district_name)
-            
+        for filename, df in zip(enrollment_files, frames[len(demographic_files):]):
             self.enrollment_datasets.append(df)
             print(f"  Loaded {filename}: {len(df)} rows")
         
         print("\nAll datasets loaded successfully.")
     
+    def _discover(self, pattern: str) -> List[str]:
+        files = discover_input_files(self.data_dir, pattern)
+        if not files:
+            raise FileNotFoundError(f"No {pattern} files found in {self.data_dir}")
+        return files
+    
+    def fingerprint_inputs(self) -> Dict[str, Dict[str, Any]]:
+        """Record fingerprints of every demographic and enrollment file currently in data_dir"""
+        self.input_files = {
+            filename: fingerprint_file(self.data_dir / filename)
+            for pattern in (DEMOGRAPHIC_PATTERN, ENROLLMENT_PATTERN)
+            for filename in discover_input_files(self.data_dir, pattern)
+        }
+        return self.input_files
+    
     def merge_datasets(self):
         print("\nMerging demographic datasets...")
-        self.demographic_combined = pd.concat(self.demographic_datasets, ignore_index=True)
+        self.demographic_combined = _concat_frames(self.demographic_datasets)
         print(f"  Combined demographic records: {len(self.demographic_combined)}")
         
         print("\nMerging enrollment datasets...")
-        self.enrollment_combined = pd.concat(self.enrollment_datasets, ignore_index=True)
+        self.enrollment_combined = _concat_frames(self.enrollment_datasets)
         print(f"  Combined enrollment records: {len(self.enrollment_combined)}")
         
         print("\nCreating master analytical dataset...")
-        self._create_master_dataset()
+        with stage('_create_master_dataset',
+                   input_rows=len(self.demographic_combined) + len(self.enrollment_combined)) as record:
+            self._create_master_dataset()
+            record['rows'] = len(self.master_data)
+        print(f"  Master dataset created: {len(self.master_data)} records")
+    
+    def aggregate_datasets(self, workers: Optional[int] = None, chunksize: int = CSV_CHUNKSIZE):
+        """
+        Streaming alternative to load_all_datasets() followed by merge_datasets().
+        
+        Every CSV is read in chunks that are folded into running district-date
+        sums, so the raw rows are never all in memory: peak memory follows the
+        number of (state, district, date) partitions, not the input size.
+        """
+        print("Aggregating demographic and enrollment datasets in chunks...")
+        self.demographic_aggregates, self.enrollment_aggregates = self._aggregate_files(
+            self._discover(DEMOGRAPHIC_PATTERN), self._discover(ENROLLMENT_PATTERN), workers, chunksize
+        )
+        
+        print("\nCreating master analytical dataset...")
+        with stage('_build_master',
+                   input_rows=len(self.demographic_aggregates) + len(self.enrollment_aggregates)) as record:
+            self.master_data = self._build_master(self.demographic_aggregates, self.enrollment_aggregates)
+            record['rows'] = len(self.master_data)
         print(f"  Master dataset created: {len(self.master_data)} records")
+        self._print_quality_check()
+    
+    def _aggregate_files(self, demographic_files: List[str], enrollment_files: List[str],
+                         workers: Optional[int], chunksize: int) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Stream files into district-date sums, one worker per file"""
+        jobs = (
+            [(self.data_dir / filename, DEMOGRAPHIC_DTYPES, DEMOGRAPHIC_COUNTS) for filename in demographic_files] +
+            [(self.data_dir / filename, ENROLLMENT_DTYPES, ENROLLMENT_COUNTS) for filename in enrollment_files]
+        )
+        if workers is None:
+            workers = min(len(jobs), os.cpu_count() or 1)
+        
+        paths, dtypes, counts = (list(column) for column in zip(*jobs)) if jobs else ([], [], [])
+        with stage('aggregate_files', files=len(jobs), workers=workers) as record:
+            if workers > 1:
+                with ProcessPoolExecutor(max_workers=workers) as executor:
+                    results = list(executor.map(
+                        _aggregate_dataset_file, paths, dtypes, counts, [chunksize] * len(jobs),
+                        [self.mappings_file] * len(jobs)
+                    ))
+            else:
+                results = [
+                    _aggregate_dataset_file(path, dtype, count, chunksize, self.mappings_file)
+                    for path, dtype, count in jobs
+                ]
+            for _, _, file_record in results:
+                add(file_record)
+            record['rows'] = sum(len(aggregate) for aggregate, _, _ in results)
+        
+        aggregates = []
+        for filenames, file_results, count_columns in (
+            (demographic_files, results[:len(demographic_files)], DEMOGRAPHIC_COUNTS),
+            (enrollment_files, results[len(demographic_files):], ENROLLMENT_COUNTS)
+        ):
+            for filename, (aggregate, invalid_rows, _) in zip(filenames, file_results):
+                print(f"  Aggregated {filename}: {len(aggregate)} district-date rows")
+                if invalid_rows:
+                    print(f"    Removed {invalid_rows} records with invalid states")
+            
+            parts = [aggregate for aggregate, _, _ in file_results if len(aggregate)]
+            aggregates.append(_fold_aggregates(parts) if parts else self._aggregate(pd.DataFrame(), count_columns))
+        
+        return aggregates[0], aggregates[1]
+    
+    def update_incremental(self, previous: Dict[str, pd.DataFrame], previous_files: Dict[str, Dict[str, Any]],
+                           workers: Optional[int] = None,
+                           chunksize: int = CSV_CHUNKSIZE) -> Optional[Set[Tuple[str, str]]]:
+        """
+        Fold input files added since a previous build into that build's data.
+        
+        previous holds the earlier 'master_data', 'demographic_aggregates' and
+        'enrollment_aggregates' tables, previous_files the fingerprints of the
+        files it was built from. Only new files are read, and only the
+        (state, district, date) partitions they contain are re-aggregated and
+        rebuilt in master_data. New files are streamed like aggregate_datasets().
+        
+        Returns the (state, district) pairs whose rows changed, or None if a
+        previously processed file changed or disappeared (rebuild from scratch).
+        """
+        input_files = self.fingerprint_inputs()
+        for filename, fingerprint in previous_files.items():
+            if input_files.get(filename) != fingerprint:
+                print(f"  {filename} changed or was removed since the last build")
+                return None
+        
+        self.demographic_aggregates = previous['demographic_aggregates']
+        self.enrollment_aggregates = previous['enrollment_aggregates']
+        self.master_data = previous['master_data']
+        
+        new_files = [name for name in input_files if name not in previous_files]
+        if not new_files:
+            print("  No new input files")
+            return set()
+        
+        print("Aggregating new files in chunks...")
+        new_demographic, new_enrollment = self._aggregate_files(
+            [name for name in new_files if name.startswith('DEMOGRAPHIC_')],
+            [name for name in new_files if name.startswith('ENROLLMENT_')],
+            workers, chunksize
+        )
+        if new_demographic.empty and new_enrollment.empty:
+            print("  New files have no valid rows")
+            return set()
+        
+        self.demographic_aggregates = _upsert_aggregates(self.demographic_aggregates, new_demographic)
+        self.enrollment_aggregates = _upsert_aggregates(self.enrollment_aggregates, new_enrollment)
+        
+        # Rebuild master rows for every partition the new files touched
+        touched = pd.MultiIndex.from_frame(
+            pd.concat([new_demographic[AGGREGATE_KEYS], new_enrollment[AGGREGATE_KEYS]], ignore_index=True)
+        ).unique()
+        rebuilt = self._build_master(
+            self.demographic_aggregates[_key_index(self.demographic_aggregates).isin(touched)],
+            self.enrollment_aggregates[_key_index(self.enrollment_aggregates).isin(touched)]
+        )
+        kept = self.master_data[~_key_index(self.master_data).isin(touched)]
+        # New districts extend the key dictionaries, so the merged table is re-compacted
+        self.master_data = compact_master_data(
+            pd.concat([kept, rebuilt], ignore_index=True).sort_values(AGGREGATE_KEYS, ignore_index=True)
+        )
+        
+        touched_districts = set(zip(touched.get_level_values('state'), touched.get_level_values('district')))
+        print(f"  Updated {len(touched)} district-date partitions in {len(touched_districts)} districts")
+        print(f"  Master dataset updated: {len(self.master_data)} records")
+        self._print_quality_check()
+        return touched_districts
     
     def _create_master_dataset(self):
         """
@@ -452,81 +428,95 @@ class DataPipeline:
         
         # Remove records with invalid state names
         print("\n  Cleaning invalid state entries...")
-        before_clean = len(self.demographic_combined)
-        self.demographic_combined = self.demographic_combined[
-            self.demographic_combined['state'] != 'Unknown'
-        ]
-        after_clean = len(self.demographic_combined)
-        if before_clean > after_clean:
-            print(f"    Removed {before_clean - after_clean} records with invalid states")
+        self.demographic_combined = self._drop_invalid_states(self.demographic_combined, 'demographic')
+        self.enrollment_combined = self._drop_invalid_states(self.enrollment_combined, 'enrollment')
         
-        before_clean = len(self.enrollment_combined)
-        self.enrollment_combined = self.enrollment_combined[
-            self.enrollment_combined['state'] != 'Unknown'
-        ]
-        after_clean = len(self.enrollment_combined)
-        if before_clean > after_clean:
-            print(f"    Removed {before_clean - after_clean} enrollment records with invalid states")
+        # Aggregate at district-date level (sum across pincodes)
+        self.demographic_aggregates = self._aggregate(self.demographic_combined, DEMOGRAPHIC_COUNTS)
+        self.enrollment_aggregates = self._aggregate(self.enrollment_combined, ENROLLMENT_COUNTS)
         
-        # Aggregate demographics at district-date level (sum across pincodes)
-        demo_agg = self.demographic_combined.groupby(['state', 'district', 'date']).agg({
-            'demo_age_5_17': 'sum',
-            'demo_age_17_': 'sum'
-        }).reset_index()
+        self.master_data = self._build_master(self.demographic_aggregates, self.enrollment_aggregates)
+        self._print_quality_check()
+    
+    def _drop_invalid_states(self, df: pd.DataFrame, label: str) -> pd.DataFrame:
+        if df.empty:
+            return df
         
-        demo_agg['total_population'] = demo_agg['demo_age_5_17'] + demo_agg['demo_age_17_']
+        before_clean = len(df)
+        df = df[df['state'] != 'Unknown']
+        after_clean = len(df)
+        if before_clean > after_clean:
+            print(f"    Removed {before_clean - after_clean} {label} records with invalid states")
+        return df
+    
+    def _aggregate(self, df: pd.DataFrame, count_columns: List[str]) -> pd.DataFrame:
+        """Sum counts per (state, district, date) across pincodes"""
+        if df.empty:
+            return pd.DataFrame({
+                'state': pd.Series(dtype=object),
+                'district': pd.Series(dtype=object),
+                'date': pd.Series(dtype='datetime64[ns]'),
+                **{column: pd.Series(dtype=np.int64) for column in count_columns}
+            })
+        
+        aggregated = df.groupby(AGGREGATE_KEYS, observed=True).agg(
+            {column: 'sum' for column in count_columns}
+        ).reset_index()
+        return self._normalize_aggregate(aggregated, count_columns)
+    
+    def _build_master(self, demo_agg: pd.DataFrame, enroll_agg: pd.DataFrame) -> pd.DataFrame:
+        """Join district-date aggregates and derive totals and rates"""
+        demo_agg = demo_agg.assign(total_population=demo_agg['demo_age_5_17'] + demo_agg['demo_age_17_'])
         
         # Remove records with zero population
         demo_agg = demo_agg[demo_agg['total_population'] > 0]
         
-        # Aggregate enrollments at district-date level (sum across pincodes)
-        enroll_agg = self.enrollment_combined.groupby(['state', 'district', 'date']).agg({
-            'age_0_5': 'sum',
-            'age_5_17': 'sum',
-            'age_18_greater': 'sum'
-        }).reset_index()
-        
-        enroll_agg['total_enrollments'] = enroll_agg['age_0_5'] + enroll_agg['age_5_17'] + enroll_agg['age_18_greater']
+        enroll_agg = enroll_agg.assign(
+            total_enrollments=enroll_agg['age_0_5'] + enroll_agg['age_5_17'] + enroll_agg['age_18_greater']
+        )
         
         # Merge on district-date (removed pincode from merge keys)
-        self.master_data = pd.merge(
+        master_data = pd.merge(
             demo_agg,
             enroll_agg,
-            on=['state', 'district', 'date'],
+            on=AGGREGATE_KEYS,
             how='inner'  # Changed from 'outer' to 'inner' to only keep matching records
         )
         
         # Remove any remaining NaN values
-        self.master_data.fillna(0, inplace=True)
+        master_data.fillna(0, inplace=True)
         
         # Calculate penetration rates
-        self.master_data['penetration_rate'] = np.where(
-            self.master_data['total_population'] > 0,
-            self.master_data['total_enrollments'] / self.master_data['total_population'],
+        master_data['penetration_rate'] = np.where(
+            master_data['total_population'] > 0,
+            master_data['total_enrollments'] / master_data['total_population'],
             0
         )
         
         # Cap penetration rate at 100% (1.0)
-        self.master_data['penetration_rate'] = self.master_data['penetration_rate'].clip(upper=1.0)
+        master_data['penetration_rate'] = master_data['penetration_rate'].clip(upper=1.0)
         
-        self.master_data['youth_enrollment_rate'] = np.where(
-            self.master_data['demo_age_5_17'] > 0,
-            self.master_data['age_5_17'] / self.master_data['demo_age_5_17'],
+        master_data['youth_enrollment_rate'] = np.where(
+            master_data['demo_age_5_17'] > 0,
+            master_data['age_5_17'] / master_data['demo_age_5_17'],
             0
         )
         
         # Cap youth enrollment rate at 100%
-        self.master_data['youth_enrollment_rate'] = self.master_data['youth_enrollment_rate'].clip(upper=1.0)
+        master_data['youth_enrollment_rate'] = master_data['youth_enrollment_rate'].clip(upper=1.0)
         
-        self.master_data['adult_enrollment_rate'] = np.where(
-            self.master_data['demo_age_17_'] > 0,
-            self.master_data['age_18_greater'] / self.master_data['demo_age_17_'],
+        master_data['adult_enrollment_rate'] = np.where(
+            master_data['demo_age_17_'] > 0,
+            master_data['age_18_greater'] / master_data['demo_age_17_'],
             0
         )
         
         # Cap adult enrollment rate at 100%
-        self.master_data['adult_enrollment_rate'] = self.master_data['adult_enrollment_rate'].clip(upper=1.0)
+        master_data['adult_enrollment_rate'] = master_data['adult_enrollment_rate'].clip(upper=1.0)
         
+        return compact_master_data(master_data)
+    
+    def _print_quality_check(self):
         print(f"\n  Data quality check:")
         print(f"  - Unique states: {self.master_data['state'].nunique()}")
         print(f"  - Unique districts: {self.master_data['district'].nunique()}")
@@ -536,6 +526,19 @@ class DataPipeline:
         print(f"  - Total population: {self.master_data['total_population'].sum():,.0f}")
         print(f"  - Total enrollments: {self.master_data['total_enrollments'].sum():,.0f}")
     
+    def _normalize_aggregate(self, df: pd.DataFrame, count_columns: List[str]) -> pd.DataFrame:
+        """
+        Give district-date aggregates a fixed schema: plain string keys and int64 sums.
+        
+        groupby sums int32 inputs in int64 but downcasts results that happen to fit,
+        so the output dtype would otherwise depend on the data.
+        """
+        for column in ['state', 'district']:
+            if isinstance(df[column].dtype, pd.CategoricalDtype):
+                df[column] = df[column].astype(object)
+        df[count_columns] = df[count_columns].astype(np.int64)
+        return df
+    
     def get_master_data(self) -> pd.DataFrame:
         return self.master_data
     
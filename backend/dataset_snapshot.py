@@ -0,0 +1,136 @@
+"""
+Immutable dataset snapshots for atomic hot reload.
+
+A DatasetSnapshot holds every engine built from one dataset version. The
+server keeps a single reference to the current snapshot; a reload builds a
+complete new snapshot off to the side and then replaces that reference in
+one assignment. Requests take the reference once when they start, so those
+already running finish on the snapshot they began with while new requests
+see the new one. The old snapshot is freed when its last request completes.
+"""
+
+import pickle
+import time
+from pathlib import Path
+from typing import Any, Dict, Optional
+
+from analytics_engine import AnalyticsEngine
+from artifact_store import load_artifact, current_version_dir, CURRENT_FILE, DEFAULT_ARTIFACT_DIR
+from risk_engine import RiskEngine
+from recommendation_engine import RecommendationEngine
+
+DEFAULT_PICKLE_FILE = Path("data/processed_data.pkl")
+
+
+class LoadProgress:
+    """Where a snapshot build is: the current stage, rows loaded and time spent per stage"""
+    
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.stage = 'starting'
+        self.rows_loaded = 0
+        self.stages: Dict[str, float] = {}
+        self.finished = False
+        self._stage_started = self.started
+    
+    def begin(self, stage: str):
+        self._close_stage()
+        self.stage = stage
+    
+    def finish(self):
+        self._close_stage()
+        self.stage = 'done'
+        self.finished = True
+    
+    def _close_stage(self):
+        now = time.perf_counter()
+        if self.stage != 'starting':
+            self.stages[self.stage] = round(now - self._stage_started, 3)
+        self._stage_started = now
+    
+    def report(self) -> Dict[str, Any]:
+        return {
+            'stage': self.stage,
+            'rows_loaded': self.rows_loaded,
+            'elapsed_seconds': round(time.perf_counter() - self.started, 3),
+            'stages': dict(self.stages),
+            'finished': self.finished
+        }
+
+
+class DatasetSnapshot:
+    def __init__(self, analytics: AnalyticsEngine, risk_engine: RiskEngine,
+                 recommendation_engine: RecommendationEngine, dataset_version: Optional[str],
+                 source: str, generation: int):
+        self.analytics = analytics
+        self.risk_engine = risk_engine
+        self.recommendation_engine = recommendation_engine
+        self.dataset_version = dataset_version
+        # What was on disk when loaded (see dataset_source), to tell whether it has changed
+        self.source = source
+        # Load counter: keys caches even when a legacy pickle has no dataset_version
+        self.generation = generation
+        self.loaded_at = time.strftime('%Y-%m-%d %H:%M:%S')
+
+
+def dataset_source(artifact_dir: Path = DEFAULT_ARTIFACT_DIR,
+                   pickle_file: Path = DEFAULT_PICKLE_FILE) -> Optional[str]:
+    """The dataset on disk: the artifact's CURRENT version, else the legacy pickle's mtime"""
+    if (artifact_dir / CURRENT_FILE).exists():
+        return f"artifact:{current_version_dir(artifact_dir).name}"
+    if pickle_file.exists():
+        return f"pickle:{pickle_file.stat().st_mtime_ns}"
+    return None
+
+
+def build_snapshot(generation: int, artifact_dir: Path = DEFAULT_ARTIFACT_DIR,
+                   pickle_file: Path = DEFAULT_PICKLE_FILE,
+                   progress: Optional[LoadProgress] = None) -> DatasetSnapshot:
+    """Load the processed data and build (and warm) every engine on it, reporting to progress"""
+    progress = progress or LoadProgress()
+    print("=== Loading NI³S Pre-processed Data ===")
+
+    progress.begin('reading data')
+    source = dataset_source(artifact_dir, pickle_file)
+    dataset_version = None
+    if source is None:
+        raise FileNotFoundError(
+            "Processed data not found. "
+            "Please run preprocess.py locally and upload data/processed/"
+        )
+    if source.startswith('artifact:'):
+        # Memory-mapped columns: near-instant, and shared between workers
+        data = load_artifact(artifact_dir, tables=['master_data', 'district_features'])
+        dataset_version = data['dataset_version']
+    else:
+        # Legacy format written by older preprocess.py runs
+        with open(pickle_file, 'rb') as f:
+            data = pickle.load(f)
+    progress.rows_loaded = sum(len(data[table]) for table in ('master_data', 'district_features') if table in data)
+
+    print(f"  ✓ Loaded processed data (version {dataset_version or 'legacy pickle'})")
+
+    # Initialize analytics with the pre-computed features (no recomputation)
+    progress.begin('analytics engine')
+    analytics = AnalyticsEngine.from_precomputed(data['master_data'], data.get('district_features'))
+    _ = analytics.district_features
+    print("  ✓ Analytics engine initialized")
+
+    # Indexes and the rollup cube are built before the snapshot goes live, not on its first requests
+    progress.begin('indexes and rollup cube')
+    analytics.build_indexes()
+    print("  ✓ Rollup cube and lookup indexes built")
+
+    progress.begin('risk engine')
+    risk_engine = RiskEngine(analytics)
+    risk_engine.build_indexes()
+    print("  ✓ Risk engine initialized")
+
+    progress.begin('recommendations and insights')
+    recommendation_engine = RecommendationEngine()
+    recommendation_engine.build(risk_engine)
+    recommendation_engine.build_insights(analytics, risk_engine)
+    print("  ✓ Recommendation engine initialized")
+
+    progress.finish()
+    return DatasetSnapshot(analytics, risk_engine, recommendation_engine, dataset_version, source, generation)
@@ -0,0 +1,177 @@
+import pandas as pd
+import numpy as np
+from typing import Callable
+
+STAGNATION_THRESHOLD = 0.01  # Less than 1% growth is considered stagnation
+
+FEATURE_COLUMNS = [
+    'state', 'district',
+    'total_enrollments', 'total_population',
+    'avg_penetration_rate', 'latest_penetration_rate',
+    'youth_inclusion_rate', 'adult_inclusion_rate', 'youth_adult_gap',
+    'growth_slope', 'growth_volatility', 'stagnation_periods',
+    'time_span_days', 'data_points'
+]
+
+
+def penetration_rates(enrollments: np.ndarray, population: np.ndarray) -> np.ndarray:
+    """Per-row penetration in float64 from integer counts, capped at 100% (as DataPipeline derives it)"""
+    rate = np.zeros(len(enrollments), dtype=np.float64)
+    np.divide(enrollments, population, out=rate, where=population > 0)
+    return np.minimum(rate, 1.0)
+
+
+def _segment_matrix(values: np.ndarray, starts: np.ndarray, length: int) -> np.ndarray:
+    """Gather equal-length segments of a flat array into a (segments, length) matrix"""
+    return values[starts[:, None] + np.arange(length)]
+
+
+def _reduce_by_length(values: np.ndarray, starts: np.ndarray, lengths: np.ndarray,
+                      reducer: Callable[[np.ndarray, int], np.ndarray]) -> np.ndarray:
+    """
+    Apply a row-wise reducer to every segment, batching segments of equal length.
+
+    Row reductions over a contiguous matrix use the same summation order as the
+    1-D reductions the per-district loop used, so results are bit-for-bit equal.
+    """
+    out = np.zeros(len(starts), dtype=np.float64)
+    for length in np.unique(lengths):
+        selected = np.flatnonzero(lengths == length)
+        matrix = _segment_matrix(values, starts[selected], int(length))
+        out[selected] = reducer(matrix, int(length))
+    return out
+
+
+def _mean_rows(matrix: np.ndarray, length: int) -> np.ndarray:
+    return matrix.sum(axis=1) / np.float64(length)
+
+
+def _std_rows(matrix: np.ndarray, length: int) -> np.ndarray:
+    return matrix.std(axis=1)
+
+
+def _ols_slope_rows(matrix: np.ndarray, length: int) -> np.ndarray:
+    """
+    Closed-form OLS slope of each row against x = 0..length-1.
+
+    slope = Sxy / Sxx, taken from the centered 2x2 Gram matrix of every row
+    exactly as scipy.stats.linregress builds it through np.cov.
+    """
+    x = np.arange(length, dtype=np.float64)
+    y = matrix.astype(np.float64)
+
+    centered = np.empty((len(y), 2, length), dtype=np.float64)
+    centered[:, 0, :] = x - x.mean()
+    centered[:, 1, :] = y - y.mean(axis=1)[:, None]
+
+    gram = np.matmul(centered, centered.transpose(0, 2, 1))
+    gram *= np.true_divide(1, length)
+    return gram[:, 0, 1] / gram[:, 0, 0]
+
+
+def compute_district_features(master_data: pd.DataFrame) -> pd.DataFrame:
+    """
+    Compute district-level intelligence features for every district at once.
+
+    Columnar equivalent of the former per-district groupby loop: rows are
+    ordered by (district, date) once and every feature is derived from the
+    resulting segments with array operations.
+    """
+    grouped = master_data.groupby(['state', 'district'], observed=True)
+    group_sizes = grouped.size()
+    codes = grouped.ngroup().to_numpy()
+
+    keep = codes >= 0
+    codes = codes[keep]
+    dates = master_data['date'].to_numpy()[keep]
+    row_ids = np.flatnonzero(keep)
+
+    lengths = group_sizes.to_numpy().astype(np.int64)
+    starts = np.concatenate(([0], np.cumsum(lengths)[:-1]))
+    ends = starts + lengths
+
+    # Rows grouped by district keep their original order (used for means);
+    # the time-ordered view sorts each district by date.
+    original_order = row_ids[np.argsort(codes, kind='stable')]
+    time_order = row_ids[np.lexsort((dates, codes))]
+
+    def column(name: str, order: np.ndarray) -> np.ndarray:
+        return master_data[name].to_numpy()[order]
+
+    # Latest date's values per district
+    latest_rows = time_order[ends - 1]
+
+    def latest(name: str) -> np.ndarray:
+        return column(name, latest_rows)
+
+    total_enrollments = latest('total_enrollments').astype(np.int64)
+    total_population = latest('total_population').astype(np.int64)
+    # Rates come from the counts in float64, whatever precision master_data stores them in
+    latest_penetration = penetration_rates(total_enrollments, total_population)
+
+    avg_penetration = _reduce_by_length(
+        penetration_rates(column('total_enrollments', original_order), column('total_population', original_order)),
+        starts, lengths, _mean_rows
+    )
+
+    # Youth and adult inclusion from the latest record, capped at 100% like penetration
+    youth_inclusion_rate = penetration_rates(latest('age_5_17'), latest('demo_age_5_17'))
+    adult_inclusion_rate = penetration_rates(latest('age_18_greater'), latest('demo_age_17_'))
+
+    # Time series for growth analysis
+    enrollments = column('total_enrollments', time_order)
+
+    growth_slope = np.zeros(len(lengths), dtype=np.float64)
+    # Constant series have zero variance and keep a flat slope
+    has_trend = (lengths >= 2) & (
+        np.maximum.reduceat(enrollments, starts) != np.minimum.reduceat(enrollments, starts)
+    )
+    if has_trend.any():
+        growth_slope[has_trend] = _reduce_by_length(
+            enrollments, starts[has_trend], lengths[has_trend], _ols_slope_rows
+        )
+
+    # Period-over-period growth rates, skipping periods that start from zero
+    sorted_codes = np.repeat(np.arange(len(lengths)), lengths)
+    previous = enrollments[:-1]
+    current = enrollments[1:]
+    valid = (sorted_codes[1:] == sorted_codes[:-1]) & (previous > 0)
+    growth_rates = (current[valid] - previous[valid]) / previous[valid]
+    rate_codes = sorted_codes[1:][valid]
+
+    rate_counts = np.bincount(rate_codes, minlength=len(lengths))
+    rate_starts = np.concatenate(([0], np.cumsum(rate_counts)[:-1]))
+
+    growth_volatility = np.zeros(len(lengths), dtype=np.float64)
+    has_rates = rate_counts > 0
+    if has_rates.any():
+        growth_volatility[has_rates] = _reduce_by_length(
+            growth_rates, rate_starts[has_rates], rate_counts[has_rates], _std_rows
+        )
+
+    stagnant = np.abs(growth_rates) < STAGNATION_THRESHOLD
+    stagnation_periods = np.bincount(rate_codes[stagnant], minlength=len(lengths)).astype(np.int64)
+    stagnation_periods[lengths < 3] = 0
+
+    sorted_dates = column('date', time_order)
+    time_span_days = pd.TimedeltaIndex(
+        sorted_dates[ends - 1] - sorted_dates[starts]
+    ).days.to_numpy().astype(np.int64)
+
+    keys = group_sizes.index
+    return pd.DataFrame({
+        'state': keys.get_level_values('state').to_numpy(dtype=object),
+        'district': keys.get_level_values('district').to_numpy(dtype=object),
+        'total_enrollments': total_enrollments,
+        'total_population': total_population,
+        'avg_penetration_rate': avg_penetration,
+        'latest_penetration_rate': latest_penetration,
+        'youth_inclusion_rate': youth_inclusion_rate,
+        'adult_inclusion_rate': adult_inclusion_rate,
+        'youth_adult_gap': np.abs(youth_inclusion_rate - adult_inclusion_rate),
+        'growth_slope': growth_slope,
+        'growth_volatility': growth_volatility,
+        'stagnation_periods': stagnation_periods,
+        'time_span_days': time_span_days,
+        'data_points': lengths
+    })
@@ -0,0 +1,58 @@
+"""
+Multi-process serving: gunicorn with uvicorn workers.
+
+    gunicorn app:app -c gunicorn.conf.py
+
+The app is imported and its data loaded once in the master, then the workers
+are forked from it. The engines, lookup indexes and materialized responses are
+shared copy-on-write instead of being rebuilt by every worker, and the
+memory-mapped artifact columns share the page cache. While the master loads,
+boot_server.BootStatusServer answers on the bound port: /health with 200 and
+the load progress, /ready and the data endpoints with 503. Worker count comes
+from WEB_CONCURRENCY (default 2).
+
+New dataset versions are loaded in the master too: POST /api/admin/reload and
+the RELOAD_POLL_SECONDS poller send it SIGHUP, it rebuilds the snapshot, and
+gunicorn replaces every worker with one forked from it.
+"""
+
+import gc
+import os
+import sys
+import threading
+
+bind = f"0.0.0.0:{os.getenv('PORT', '8000')}"
+workers = int(os.getenv('WEB_CONCURRENCY', '2'))
+worker_class = 'uvicorn.workers.UvicornWorker'
+preload_app = True
+loglevel = os.getenv('LOG_LEVEL', 'info')
+
+
+def when_ready(server):
+    """Runs in the master after preloading app.py and before the first fork"""
+    # Imported here: the config is read before --pythonpath or --chdir is applied
+    from boot_server import BootStatusServer
+
+    app_module = sys.modules['app']
+    with BootStatusServer([listener.sock for listener in server.LISTENERS], app_module.server_status) as boot:
+        app_module.load_data()
+    server.log.info("Answered %s requests while loading", boot.served)
+    # Workers forward reload requests here, so they all serve one shared snapshot
+    app_module.gunicorn_master_pid = os.getpid()
+    if app_module.RELOAD_POLL_SECONDS > 0:
+        threading.Thread(target=app_module.watch_for_new_data, name='dataset-watcher', daemon=True).start()
+    # Keep the collector from writing to (and so un-sharing) every inherited object
+    gc.freeze()
+    server.log.info("Data loaded in master (pid %s); forking %s workers", os.getpid(), server.cfg.workers)
+
+
+def on_reload(server):
+    """Runs in the master on SIGHUP (sent by POST /api/admin/reload and the poller) before new workers are forked"""
+    app_module = sys.modules['app']
+    # The old workers keep serving the current snapshot until the new ones are up
+    result = app_module.reload_data(force=True)
+    server.log.info("Dataset reload %s (version %s)", result['status'], result['dataset_version'])
+    # Let the previous snapshot be collected, then freeze the new one before forking
+    gc.unfreeze()
+    gc.collect()
+    gc.freeze()
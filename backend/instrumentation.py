@@ -0,0 +1,148 @@
+"""
+Stage timing and memory instrumentation for the pipeline and engines.
+
+    with stage('_compute_district_features') as record:
+        ...
+        record['rows'] = len(features)
+
+Each stage records wall and CPU seconds, resident memory at the end of the
+stage and the process's peak so far and, while tracemalloc is tracing, the
+peak of memory allocated during the stage. Finished stages are kept for the
+run report (see preprocess.py) and logged as one JSON object per line on the
+'ni3s.stages' logger, which prints nothing until enable_json_logs() is called.
+Stages run in worker processes are timed with measure() and added here with
+add() once their results come back.
+"""
+
+import json
+import logging
+import os
+import sys
+import threading
+import time
+import tracemalloc
+from collections import deque
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional, Tuple
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+REPORT_FILE = "run_report.json"
+# Stages kept in memory: a long-running server records a few on every reload
+MAX_STAGES = 1000
+
+logger = logging.getLogger('ni3s.stages')
+
+_stages: deque = deque(maxlen=MAX_STAGES)
+_local = threading.local()
+
+
+def _rss_mb() -> Optional[float]:
+    """Current resident set size, where /proc is available"""
+    try:
+        with open('/proc/self/statm') as f:
+            pages = int(f.read().split()[1])
+    except (OSError, IndexError, ValueError):
+        return None
+    return round(pages * os.sysconf('SC_PAGE_SIZE') / 2**20, 1)
+
+
+def _peak_rss_mb() -> Optional[float]:
+    """Peak resident set size of this process so far"""
+    if resource is None:
+        return None
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Kilobytes on Linux, bytes on macOS
+    return round(peak / (2**20 if sys.platform == 'darwin' else 2**10), 1)
+
+
+def _open_stages() -> List[Dict[str, Any]]:
+    if not hasattr(_local, 'open'):
+        _local.open = []
+    return _local.open
+
+
+@contextmanager
+def _timed(name: str, fields: Dict[str, Any]) -> Iterator[Dict[str, Any]]:
+    open_stages = _open_stages()
+    record: Dict[str, Any] = {'stage': name, **fields}
+
+    tracing = tracemalloc.is_tracing()
+    if tracing:
+        # reset_peak() is process-wide: fold the enclosing stage's peak so far into it first
+        if open_stages:
+            parent = open_stages[-1]
+            parent['traced_peak'] = max(parent['traced_peak'], tracemalloc.get_traced_memory()[1])
+        tracemalloc.reset_peak()
+    frame = {'record': record, 'traced_peak': 0}
+    open_stages.append(frame)
+
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+    try:
+        yield record
+    finally:
+        open_stages.pop()
+        record['wall_seconds'] = round(time.perf_counter() - wall_start, 4)
+        record['cpu_seconds'] = round(time.process_time() - cpu_start, 4)
+        record['rss_mb'] = _rss_mb()
+        record['peak_rss_mb'] = _peak_rss_mb()
+        if tracing and tracemalloc.is_tracing():
+            peak = max(frame['traced_peak'], tracemalloc.get_traced_memory()[1])
+            record['traced_peak_mb'] = round(peak / 2**20, 1)
+            if open_stages:
+                open_stages[-1]['traced_peak'] = max(open_stages[-1]['traced_peak'], peak)
+
+
+@contextmanager
+def stage(name: str, **fields) -> Iterator[Dict[str, Any]]:
+    """Time a stage; the yielded record can be given 'rows' and other JSON-serializable fields"""
+    with _timed(name, fields) as record:
+        yield record
+    add(record)
+
+
+def measure(name: str, fn: Callable[..., Any], *args, **fields) -> Tuple[Any, Dict[str, Any]]:
+    """fn(*args) and its stage record, which is not kept: for worker processes to return to add()"""
+    with _timed(name, fields) as record:
+        result = fn(*args)
+    record['pid'] = os.getpid()
+    return result, record
+
+
+def add(record: Dict[str, Any]):
+    """Keep a finished stage record, noting the stage it ran within, and log it"""
+    open_stages = _open_stages()
+    if open_stages and 'parent' not in record:
+        record['parent'] = open_stages[-1]['record']['stage']
+    _stages.append(record)
+    logger.info(json.dumps(record))
+
+
+def stages() -> List[Dict[str, Any]]:
+    return list(_stages)
+
+
+def reset():
+    _stages.clear()
+
+
+def enable_json_logs(stream=None):
+    """Write every stage record to stream (stderr by default) as a line of JSON"""
+    handler = logging.StreamHandler(stream or sys.stderr)
+    handler.setFormatter(logging.Formatter('%(message)s'))
+    logger.addHandler(handler)
+    logger.setLevel(logging.INFO)
+    logger.propagate = False
+
+
+def write_report(directory: Path, **fields) -> Path:
+    """Write the stages recorded so far, with any extra fields, to directory/run_report.json"""
+    path = Path(directory) / REPORT_FILE
+    report = {**fields, 'peak_rss_mb': _peak_rss_mb(), 'stages': stages()}
+    path.write_text(json.dumps(report, indent=2))
+    return path
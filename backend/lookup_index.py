@@ -0,0 +1,74 @@
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Tuple, Hashable
+
+
+def concat_ranges(starts: np.ndarray, ends: np.ndarray) -> np.ndarray:
+    """np.concatenate([np.arange(s, e) for s, e in zip(starts, ends)]) without the Python loop"""
+    lengths = ends - starts
+    offsets = np.repeat(starts - np.concatenate(([0], np.cumsum(lengths)[:-1])), lengths)
+    return np.arange(lengths.sum()) + offsets
+
+
+class KeyIndex:
+    """
+    Hash index of row offsets in a DataFrame, grouped by key columns.
+
+    Rows are ordered once by (keys..., order_by...) and each key maps to a
+    contiguous slice of that ordering, so a lookup costs a dict access plus
+    the size of the group rather than a scan of the whole frame. Rows with
+    equal sort values keep their original relative order.
+    """
+
+    def __init__(self, df: pd.DataFrame, keys: List[str], order_by: Optional[List[str]] = None):
+        self.df = df
+        self.keys = keys
+
+        grouped = df.groupby(keys, sort=True, observed=True)
+        codes = grouped.ngroup().to_numpy()
+        group_keys = grouped.size().index
+
+        sort_columns = [df[c].to_numpy() for c in reversed(order_by or [])]
+        order = np.lexsort(sort_columns + [codes])
+        order = order[codes[order] >= 0]  # Drop rows with missing keys
+        self.positions = order
+
+        counts = np.bincount(codes[order], minlength=len(group_keys))
+        ends = np.cumsum(counts)
+        starts = ends - counts
+        self.group_ends = ends
+
+        if len(keys) == 1:
+            labels = group_keys.tolist()
+        else:
+            labels = list(group_keys)
+        self._slices: Dict[Hashable, Tuple[int, int]] = dict(zip(labels, zip(starts.tolist(), ends.tolist())))
+
+    def __contains__(self, key: Hashable) -> bool:
+        return key in self._slices
+
+    def __len__(self) -> int:
+        return len(self._slices)
+
+    def labels(self) -> List[Hashable]:
+        return list(self._slices)
+
+    def get_bounds(self, key: Hashable) -> Optional[Tuple[int, int]]:
+        """[start, end) of a key's slice of positions, or None if the key is unknown"""
+        return self._slices.get(key)
+
+    def get_positions(self, key: Hashable) -> np.ndarray:
+        """Row positions for a key in index order (empty if the key is unknown)"""
+        bounds = self._slices.get(key)
+        if bounds is None:
+            return self.positions[:0]
+        return self.positions[bounds[0]:bounds[1]]
+
+    def get_rows(self, key: Hashable) -> pd.DataFrame:
+        return self.df.iloc[self.get_positions(key)]
+
+    def get_first_row(self, key: Hashable) -> Optional[pd.Series]:
+        bounds = self._slices.get(key)
+        if bounds is None:
+            return None
+        return self.df.iloc[self.positions[bounds[0]]]
@@ -0,0 +1,219 @@
+"""
+Request metrics in Prometheus text format, and Server-Timing headers.
+
+MetricsMiddleware counts every HTTP request by route template (not raw path,
+so districts do not each get a series): latency and response size
+histograms, status codes, requests in flight and, for endpoints served from
+the response cache, hits and misses. GET /metrics renders them.
+
+Each request also gets a ServerTiming. Code handling it wraps its phases in
+`with phase('risk'):` (a no-op outside a request) and the middleware sends
+them, plus the total as 'app', in a Server-Timing header, which browser dev
+tools show next to the request. Work run on the compute pool records into
+its own ServerTiming, merged into the request's when it returns (see
+app.on_pool).
+
+Counts are per process: under gunicorn each worker reports its own.
+"""
+
+import bisect
+import threading
+import time
+from contextlib import contextmanager
+from contextvars import ContextVar
+from typing import Any, Dict, Iterator, List, Optional, Sequence, Tuple
+
+from starlette.datastructures import MutableHeaders
+
+# Starlette appends "; charset=utf-8" to text/* media types
+CONTENT_TYPE = "text/plain; version=0.0.4"
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+SIZE_BUCKETS = (256, 1024, 4096, 16384, 65536, 262144, 1048576, 4194304, 16777216)
+
+_timing: ContextVar[Optional['ServerTiming']] = ContextVar('server_timing', default=None)
+
+
+class ServerTiming:
+    def __init__(self):
+        self.phases: List[Tuple[str, float]] = []
+        # 'hit' or 'miss' when the response came through the response cache
+        self.cache: Optional[str] = None
+
+    def add(self, name: str, seconds: float):
+        self.phases.append((name, seconds))
+
+    def extend(self, other: 'ServerTiming'):
+        self.phases.extend(other.phases)
+
+    @contextmanager
+    def activate(self) -> Iterator['ServerTiming']:
+        """Make this the timing phase() records into, in the current thread or task"""
+        token = _timing.set(self)
+        try:
+            yield self
+        finally:
+            _timing.reset(token)
+
+    def header(self) -> str:
+        return ", ".join(f"{name};dur={seconds * 1000:.3f}" for name, seconds in self.phases)
+
+
+def current_timing() -> Optional[ServerTiming]:
+    return _timing.get()
+
+
+@contextmanager
+def phase(name: str) -> Iterator[None]:
+    """Time a phase of the current request for its Server-Timing header"""
+    timing = _timing.get()
+    if timing is None:
+        yield
+        return
+    start = time.perf_counter()
+    try:
+        yield
+    finally:
+        timing.add(name, time.perf_counter() - start)
+
+
+def _escape(value: Any) -> str:
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(names: Sequence[str], values: Sequence[Any], extra: str = "") -> str:
+    pairs = [f'{name}="{_escape(value)}"' for name, value in zip(names, values)]
+    if extra:
+        pairs.append(extra)
+    return "{" + ",".join(pairs) + "}" if pairs else ""
+
+
+class Counter:
+    def __init__(self, name: str, help: str, labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple, float] = {}
+
+    def inc(self, *values, amount: float = 1):
+        self._values[values] = self._values.get(values, 0) + amount
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} counter"]
+        for values, count in sorted(self._values.items()):
+            lines.append(f"{self.name}{_labels(self.labels, values)} {count:g}")
+        return lines
+
+
+class Histogram:
+    def __init__(self, name: str, help: str, buckets: Sequence[float], labels: Sequence[str] = ()):
+        self.name = name
+        self.help = help
+        self.buckets = tuple(buckets)
+        self.labels = tuple(labels)
+        # Per label set: count in each bucket (not cumulative, the last is +Inf), sum, count
+        self._series: Dict[Tuple, List[Any]] = {}
+
+    def observe(self, value: float, *values):
+        series = self._series.get(values)
+        if series is None:
+            series = self._series[values] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+        series[0][bisect.bisect_left(self.buckets, value)] += 1
+        series[1] += value
+        series[2] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for values, (counts, total, count) in sorted(self._series.items()):
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+                cumulative += bucket_count
+                le = 'le="+Inf"' if bound == float('inf') else f'le="{bound:g}"'
+                lines.append(f"{self.name}_bucket{_labels(self.labels, values, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_labels(self.labels, values)} {total:.6f}")
+            lines.append(f"{self.name}_count{_labels(self.labels, values)} {count}")
+        return lines
+
+
+class HttpMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.in_flight = 0
+        self.requests = Counter('http_requests_total', 'HTTP requests by route and status',
+                                ('method', 'route', 'status'))
+        self.latency = Histogram('http_request_duration_seconds', 'Time to the full response, by route',
+                                 LATENCY_BUCKETS, ('method', 'route'))
+        self.size = Histogram('http_response_size_bytes', 'Response body size as sent, by route',
+                              SIZE_BUCKETS, ('method', 'route'))
+        self.cache = Counter('ni3s_response_cache_requests_total', 'Responses served through the response cache',
+                             ('route', 'result'))
+
+    def started(self):
+        with self._lock:
+            self.in_flight += 1
+
+    def finished(self, method: str, route: str, status: int, seconds: float, size: int, cache: Optional[str]):
+        with self._lock:
+            self.in_flight -= 1
+            self.requests.inc(method, route, status)
+            self.latency.observe(seconds, method, route)
+            self.size.observe(size, method, route)
+            if cache is not None:
+                self.cache.inc(route, cache)
+
+    def render(self, gauges: Sequence[Tuple[str, str, str, float]] = ()) -> str:
+        """Prometheus text for every metric, plus (name, type, help, value) samples from elsewhere"""
+        with self._lock:
+            lines = [
+                "# HELP http_requests_in_flight HTTP requests being handled",
+                "# TYPE http_requests_in_flight gauge",
+                f"http_requests_in_flight {self.in_flight}"
+            ]
+            for metric in (self.requests, self.latency, self.size, self.cache):
+                lines.extend(metric.render())
+        for name, kind, help, value in gauges:
+            lines.extend([f"# HELP {name} {help}", f"# TYPE {name} {kind}", f"{name} {value:g}"])
+        return "\n".join(lines) + "\n"
+
+
+class MetricsMiddleware:
+    """ASGI middleware recording HttpMetrics and adding Server-Timing to every HTTP response"""
+
+    def __init__(self, app, metrics: HttpMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope, receive, send):
+        if scope['type'] != 'http':
+            await self.app(scope, receive, send)
+            return
+
+        start = time.perf_counter()
+        timing = ServerTiming()
+        status = 500
+        size = 0
+
+        async def send_with_timing(message):
+            nonlocal status, size
+            if message['type'] == 'http.response.start':
+                status = message['status']
+                timing.add('app', time.perf_counter() - start)
+                headers = MutableHeaders(scope=message)
+                headers.append('Server-Timing', timing.header())
+                # Lets the frontend's own origin read the timings (PerformanceResourceTiming.serverTiming)
+                headers.append('Timing-Allow-Origin', '*')
+            elif message['type'] == 'http.response.body':
+                size += len(message.get('body', b''))
+            await send(message)
+
+        self.metrics.started()
+        try:
+            with timing.activate():
+                await self.app(scope, receive, send_with_timing)
+        finally:
+            # The router stores the matched route in the scope; templates keep the label set bounded
+            route = scope.get('route')
+            self.metrics.finished(
+                scope['method'], getattr(route, 'path', 'unmatched'), status,
+                time.perf_counter() - start, size, timing.cache
+            )
@@ -0,0 +1,141 @@
+"""
+State and district name normalization.
+
+Mapping tables live in name_mappings.json (grouped by state for readability)
+and are turned into lookup dicts once per process. Cleaning a column only
+cleans its distinct raw values, and every cleaned value is memoized, so the
+cost scales with the number of spellings rather than the number of rows.
+"""
+
+import json
+import pandas as pd
+import numpy as np
+from functools import lru_cache
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional
+
+DEFAULT_MAPPINGS_FILE = Path(__file__).resolve().parent / "name_mappings.json"
+UNKNOWN = "Unknown"
+
+
+def load_name_mappings(path: Path = DEFAULT_MAPPINGS_FILE) -> Dict[str, Dict[str, str]]:
+    """
+    Read the mapping tables, flattening the per-state groups.
+
+    Returns {'city_to_state': {...}, 'states': {...}, 'districts': {...}},
+    each in file order.
+    """
+    with open(path, encoding='utf-8') as f:
+        raw = json.load(f)
+
+    def flatten(groups: Dict[str, Any]) -> Dict[str, str]:
+        flat = {}
+        for key, value in groups.items():
+            if isinstance(value, dict):
+                flat.update(value)
+            else:
+                flat[key] = value
+        return flat
+
+    return {
+        'city_to_state': flatten(raw.get('city_to_state', {})),
+        'states': flatten(raw.get('states', {})),
+        'districts': flatten(raw.get('districts', {}))
+    }
+
+
+class NameNormalizer:
+    def __init__(self, mappings_file: Optional[Path] = None):
+        mappings = load_name_mappings(mappings_file or DEFAULT_MAPPINGS_FILE)
+
+        self.city_to_state = {key.upper(): value for key, value in mappings['city_to_state'].items()}
+        self.state_mappings = mappings['states']
+
+        # Districts match case-insensitively; the first entry for a spelling wins
+        self.district_mappings: Dict[str, str] = {}
+        for key, value in mappings['districts'].items():
+            self.district_mappings.setdefault(key.lower(), value)
+
+        self._state_cache: Dict[Any, str] = {}
+        self._district_cache: Dict[Any, str] = {}
+
+    def clean_state(self, state_name: Any) -> str:
+        if pd.isna(state_name):
+            return UNKNOWN
+
+        cleaned = self._state_cache.get(state_name)
+        if cleaned is None:
+            cleaned = self._state_cache[state_name] = self._normalize_state(state_name)
+        return cleaned
+
+    def clean_district(self, district_name: Any) -> str:
+        if pd.isna(district_name):
+            return UNKNOWN
+
+        cleaned = self._district_cache.get(district_name)
+        if cleaned is None:
+            cleaned = self._district_cache[district_name] = self._normalize_district(district_name)
+        return cleaned
+
+    def _normalize_state(self, state_name: Any) -> str:
+        state_name = ' '.join(str(state_name).split())
+
+        # City names that appear in the state column
+        city_state = self.city_to_state.get(state_name.upper())
+        if city_state is not None:
+            return city_state
+
+        cleaned = self.state_mappings.get(state_name, state_name)
+        if cleaned.islower():
+            cleaned = cleaned.title()
+        return cleaned
+
+    def _normalize_district(self, district_name: Any) -> str:
+        # Remove asterisks and collapse whitespace
+        district_name = ' '.join(str(district_name).replace('*', '').split())
+
+        mapped = self.district_mappings.get(district_name.lower())
+        if mapped is not None:
+            return mapped
+
+        if district_name.islower() or district_name.isupper():
+            district_name = district_name.title()
+        return district_name
+
+    def clean_states(self, names: pd.Series) -> pd.Series:
+        return self.clean_column(names, self.clean_state)
+
+    def clean_districts(self, names: pd.Series) -> pd.Series:
+        return self.clean_column(names, self.clean_district)
+
+    def clean_column(self, names: pd.Series, clean: Callable[[Any], str]) -> pd.Series:
+        """
+        Clean a name column by cleaning each distinct raw value once.
+
+        Categorical columns stay categorical (with sorted categories); other
+        columns come back as object strings.
+        """
+        if isinstance(names.dtype, pd.CategoricalDtype):
+            cleaned = [clean(name) for name in names.cat.categories]
+            categories = pd.Index(sorted(set(cleaned) | {UNKNOWN}))
+
+            category_codes = categories.get_indexer(cleaned)
+            codes = names.cat.codes.to_numpy()
+            new_codes = np.where(codes >= 0, category_codes[codes], categories.get_loc(UNKNOWN))
+
+            return pd.Series(
+                pd.Categorical.from_codes(new_codes, categories=categories),
+                index=names.index,
+                name=names.name
+            )
+
+        codes, uniques = pd.factorize(names, use_na_sentinel=True)
+        # Last slot holds the value for missing names (code -1)
+        lookup = np.array([clean(name) for name in uniques] + [UNKNOWN], dtype=object)
+        return pd.Series(lookup[codes], index=names.index, name=names.name)
+
+
+@lru_cache(maxsize=None)
+def get_name_normalizer(mappings_file: Optional[Path] = None) -> NameNormalizer:
+    """Shared normalizer per mappings file, so tables and memoized names are built once per process"""
+    return NameNormalizer(mappings_file)
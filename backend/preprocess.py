@@ -1,58 +1,183 @@
 """
 Pre-process NI³S data to speed up server startup.
 
-Run this script LOCALLY (not on Render) to generate processed_data.pkl
-Then commit and push processed_data.pkl to your repo.
+Run this script LOCALLY (not on Render) to generate the data/processed/ artifact
+Then commit and push data/processed/ to your repo.
+
+    python preprocess.py                  # full rebuild from every CSV
+    python preprocess.py --incremental    # fold in new DEMOGRAPHIC_*/ENROLLMENT_* files only
+    python preprocess.py --streaming      # full rebuild without holding raw rows in memory
+
+Every run that produces a new artifact version writes run_report.json next to
+it, with wall and CPU time, rows and memory for each stage (see
+instrumentation.py).
 """
 
-import pickle
+import argparse
+import platform
+import time
+import tracemalloc
 from pathlib import Path
+from typing import Optional
+import pandas as pd
+import instrumentation
 from data_pipeline import DataPipeline
 from analytics_engine import AnalyticsEngine
+from artifact_store import save_artifact, load_artifact, current_version_dir, ArtifactError
+
+# Tables the incremental mode needs on top of what the server loads
+AGGREGATE_TABLES = ['demographic_aggregates', 'enrollment_aggregates']
+
+
+def build_full(data_dir: Path, output_dir: Path, streaming: bool = False) -> str:
+    """Rebuild the artifact from every input file"""
+    pipeline = DataPipeline(data_dir)
+    pipeline.fingerprint_inputs()
+
+    if streaming:
+        print("\n1-2. Streaming CSV files into district-date sums...")
+        pipeline.aggregate_datasets()
+    else:
+        print("\n1. Loading CSV files...")
+        pipeline.load_all_datasets()
+
+        print("\n2. Merging datasets...")
+        pipeline.merge_datasets()
+
+    print("\n3. Computing analytics...")
+    analytics = AnalyticsEngine(pipeline.master_data)
+
+    return save_processed(pipeline, analytics, output_dir)
+
+
+def build_incremental(data_dir: Path, output_dir: Path) -> Optional[str]:
+    """
+    Fold new input files into the current artifact.
+
+    Returns None when the current artifact cannot be extended (missing,
+    written before incremental support, or an already processed file
+    changed), in which case a full rebuild is needed.
+    """
+    print("\n1. Loading previous artifact...")
+    try:
+        previous = load_artifact(output_dir)
+    except (ArtifactError, FileNotFoundError) as e:
+        print(f"  {e}")
+        return None
+
+    if 'input_files' not in previous['metadata'] or any(t not in previous for t in AGGREGATE_TABLES):
+        print("  Artifact has no incremental state")
+        return None
+    print(f"  Dataset version {previous['dataset_version']}")
+
+    print("\n2. Aggregating new CSV files...")
+    pipeline = DataPipeline(data_dir)
+    touched = pipeline.update_incremental(previous, previous['metadata']['input_files'])
+    if touched is None:
+        return None
+    if pipeline.input_files.keys() == previous['metadata']['input_files'].keys():
+        return previous['dataset_version']
+    # New files without valid rows change no data, but are saved to input_files so later runs skip them
+
+    print("\n3. Updating analytics for touched districts...")
+    analytics = AnalyticsEngine.from_precomputed(pipeline.master_data, previous['district_features'])
+    with instrumentation.stage('update_districts', districts=len(touched)):
+        analytics.update_districts(touched)
+
+    return save_processed(pipeline, analytics, output_dir)
+
+
+def save_processed(pipeline: DataPipeline, analytics: AnalyticsEngine, output_dir: Path) -> str:
+    # Prepare data for export
+    print("\n4. Preparing data for export...")
+    processed_data = {
+        'master_data': pipeline.master_data,
+        'district_features': analytics.district_features,
+        'demographic_aggregates': pipeline.demographic_aggregates,
+        'enrollment_aggregates': pipeline.enrollment_aggregates
+    }
+
+    # Save as a columnar, memory-mappable artifact
+    print(f"\n5. Saving to {output_dir}...")
+    with instrumentation.stage('save_artifact', rows=sum(len(df) for df in processed_data.values())):
+        return save_artifact(processed_data, output_dir, metadata={'input_files': pipeline.input_files})
+
 
 def main():
+    parser = argparse.ArgumentParser(description="Pre-process NI³S data into data/processed/")
+    parser.add_argument('--incremental', action='store_true',
+                        help='only process input files added since the last run')
+    parser.add_argument('--streaming', action='store_true',
+                        help='aggregate CSVs chunk by chunk on full rebuilds (for inputs larger than RAM)')
+    parser.add_argument('--log-json', action='store_true',
+                        help='also log each stage as a line of JSON on stderr')
+    parser.add_argument('--trace-memory', action='store_true',
+                        help='record peak Python allocations per stage with tracemalloc (slower)')
+    args = parser.parse_args()
+
+    if args.log_json:
+        instrumentation.enable_json_logs()
+    if args.trace_memory:
+        tracemalloc.start()
+    started_at = pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+    wall_start = time.perf_counter()
+    cpu_start = time.process_time()
+
     print("=" * 60)
     print("NI³S Data Pre-processing Script")
     print("=" * 60)
-    
+
     # Check if data directory exists
     data_dir = Path("data")
     if not data_dir.exists():
         print("ERROR: 'data' directory not found!")
         print("Make sure you run this script from the project root.")
         return
-    
-    # Load and process data
-    print("\n1. Loading CSV files...")
-    pipeline = DataPipeline()
-    pipeline.load_all_datasets()
-    
-    print("\n2. Merging datasets...")
-    pipeline.merge_datasets()
-    
-    print("\n3. Computing analytics...")
-    analytics = AnalyticsEngine(pipeline.master_data)
-    
-    # Prepare data for pickling
-    print("\n4. Preparing data for export...")
-    processed_data = {
-        'master_data': pipeline.master_data,
-        'district_features': analytics.district_features
-    }
-    
-    # Save to pickle file
-    output_file = data_dir / "processed_data.pkl"
-    print(f"\n5. Saving to {output_file}...")
-    
-    with open(output_file, 'wb') as f:
-        pickle.dump(processed_data, f, protocol=pickle.HIGHEST_PROTOCOL)
-    
-    # Check file size
-    file_size_mb = output_file.stat().st_size / (1024 * 1024)
+
+    output_dir = data_dir / "processed"
+    dataset_version = None
+    previous_version = None
+    mode = 'incremental'
+    if args.incremental:
+        try:
+            previous_version = current_version_dir(output_dir).name
+        except ArtifactError:
+            pass
+        dataset_version = build_incremental(data_dir, output_dir)
+        if dataset_version is None:
+            print("\nIncremental update not possible, rebuilding from scratch...")
+    if dataset_version is None:
+        mode = 'streaming' if args.streaming else 'full'
+        dataset_version = build_full(data_dir, output_dir, streaming=args.streaming)
+
+    # Check artifact size
+    version_dir = output_dir / dataset_version
+    file_size_mb = sum(f.stat().st_size for f in version_dir.rglob('*')
+                       if f.is_file() and f.name != instrumentation.REPORT_FILE) / (1024 * 1024)
     print(f"\n✓ Success! Processed data saved.")
-    print(f"  File size: {file_size_mb:.2f} MB")
-    print(f"  Location: {output_file}")
-   
+    print(f"  Dataset version: {dataset_version}")
+    print(f"  Artifact size: {file_size_mb:.2f} MB")
+    print(f"  Location: {version_dir}")
+
+    if mode == 'incremental' and dataset_version == previous_version:
+        # The data did not change: keep the report of the run that built this version
+        print("  Run report: unchanged (no new data)")
+        return
+
+    report = instrumentation.write_report(
+        version_dir,
+        dataset_version=dataset_version,
+        mode=mode,
+        started_at=started_at,
+        wall_seconds=round(time.perf_counter() - wall_start, 3),
+        cpu_seconds=round(time.process_time() - cpu_start, 3),
+        artifact_mb=round(file_size_mb, 2),
+        trace_memory=args.trace_memory,
+        python=platform.python_version(),
+        pandas=pd.__version__
+    )
+    print(f"  Run report: {report}")
+
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
@@ -0,0 +1,176 @@
+"""
+Presorted ranking index over risk_scores for paginated, filtered listings.
+
+Every sort order is computed once (stable, so ties keep row order) and a page
+of an unfiltered listing is a slice of it. Filters on state, risk category
+and score range are answered from a composite index of rows keyed by
+(state, category, score rank): match counts come from binary searches per
+selected group rather than a row scan. Dense filters read the presorted order
+chunk by chunk until the page is full; sparse ones sort just their matches.
+
+Cursors are positions in the chosen sort order and point at the next match.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Optional, Sequence, Tuple
+
+from lookup_index import concat_ranges
+
+# Sort field -> risk_scores column; state and district sort by name
+SORT_FIELDS = {
+    'risk_score': 'composite_risk_score',
+    'penetration_rate': 'latest_penetration_rate',
+    'youth_inclusion_rate': 'youth_inclusion_rate',
+    'total_population': 'total_population',
+    'state': None,
+    'district': None,
+}
+RISK_CATEGORIES = ['Low Risk', 'Medium Risk', 'High Risk']
+
+# Scan the presorted order while at least 1 row in SCAN_DENSITY matches
+SCAN_DENSITY = 8
+SCAN_CHUNK = 256
+
+
+def _codes(values: pd.Series) -> Tuple[np.ndarray, List[Any]]:
+    """Codes into the sorted distinct values (-1 for missing)"""
+    if isinstance(values.dtype, pd.CategoricalDtype):
+        return values.cat.codes.to_numpy().astype(np.int64), list(values.cat.categories)
+    codes, uniques = pd.factorize(values, sort=True)
+    return codes.astype(np.int64), list(uniques)
+
+
+class RankingIndex:
+    def __init__(self, risk_scores: pd.DataFrame):
+        self.size = n = len(risk_scores)
+        self.values = {field: risk_scores[column].to_numpy() for field, column in SORT_FIELDS.items() if column}
+        self.state_codes, states = _codes(risk_scores['state'])
+        self.district_codes, _ = _codes(risk_scores['district'])
+        self._state_lookup = {state: code for code, state in enumerate(states)}
+        self.num_states = len(states)
+
+        # Missing categories get a code of their own after the named ones
+        category_codes, categories = _codes(risk_scores['risk_category'].astype(
+            pd.CategoricalDtype(RISK_CATEGORIES)
+        ))
+        self.category_codes = np.where(category_codes < 0, len(categories), category_codes)
+        self.num_categories = len(categories) + 1
+
+        # Composite (state, category, score rank) keys; equal scores share a rank
+        self.sorted_scores = np.sort(self.values['risk_score'])
+        self.score_rank = np.searchsorted(self.sorted_scores, self.values['risk_score'], side='left')
+        group = self.state_codes * self.num_categories + self.category_codes
+        keys = group * (n + 1) + self.score_rank
+        self.group_rows = np.argsort(keys, kind='stable')
+        self.group_keys = keys[self.group_rows]
+
+        self._orders: Dict[Tuple[str, bool], Tuple[np.ndarray, np.ndarray]] = {}
+
+    def order(self, sort_by: str, descending: bool) -> Tuple[np.ndarray, np.ndarray]:
+        """Row positions in sort order, and each row's position in it"""
+        key = (sort_by, descending)
+        if key not in self._orders:
+            if sort_by == 'state':
+                order = np.lexsort((self.district_codes, self.state_codes))
+            elif sort_by == 'district':
+                order = np.lexsort((self.state_codes, self.district_codes))
+            else:
+                values = self.values[sort_by]
+                order = np.argsort(-values if descending else values, kind='stable')
+            if descending and SORT_FIELDS[sort_by] is None:
+                # Names are unique per row, so reversing keeps the order total
+                order = order[::-1].copy()
+            rank = np.empty(self.size, dtype=np.int64)
+            rank[order] = np.arange(self.size)
+            self._orders[key] = (order, rank)
+        return self._orders[key]
+
+    def _score_ranks(self, min_score: Optional[float], max_score: Optional[float]) -> Tuple[int, int]:
+        """Score ranks [lo, hi) of rows with min_score <= score <= max_score"""
+        lo = 0 if min_score is None else int(np.searchsorted(self.sorted_scores, min_score, side='left'))
+        hi = self.size if max_score is None else int(np.searchsorted(self.sorted_scores, max_score, side='right'))
+        return lo, max(lo, hi)
+
+    def _groups(self, states: Optional[Sequence[str]], categories: Optional[Sequence[str]]) -> np.ndarray:
+        if states is None:
+            state_codes = np.arange(self.num_states)
+        else:
+            state_codes = np.array(sorted({self._state_lookup[s] for s in states if s in self._state_lookup}),
+                                   dtype=np.int64)
+        if categories is None:
+            category_codes = np.arange(self.num_categories)
+        else:
+            category_codes = np.array(sorted({RISK_CATEGORIES.index(c) for c in categories}), dtype=np.int64)
+        return (state_codes[:, None] * self.num_categories + category_codes[None, :]).ravel()
+
+    def _matches(self, rows: np.ndarray, allowed_groups: np.ndarray, ranks: Tuple[int, int]) -> np.ndarray:
+        group = self.state_codes[rows] * self.num_categories + self.category_codes[rows]
+        rank = self.score_rank[rows]
+        return allowed_groups[group] & (rank >= ranks[0]) & (rank < ranks[1])
+
+    def query(self, sort_by: str = 'risk_score', descending: bool = True,
+              states: Optional[Sequence[str]] = None, categories: Optional[Sequence[str]] = None,
+              min_score: Optional[float] = None, max_score: Optional[float] = None,
+              offset: int = 0, limit: Optional[int] = None, cursor: Optional[int] = None) -> Dict[str, Any]:
+        """
+        One page of matching rows in sort order.
+
+        Returns 'rows' (positions in risk_scores), 'total' (matches across all
+        pages) and 'next_cursor' (None on the last page). offset skips matches
+        after the cursor.
+        """
+        order, rank_in_order = self.order(sort_by, descending)
+        ranks = self._score_ranks(min_score, max_score)
+        filtered = states is not None or categories is not None
+        start = cursor or 0
+        wanted = None if limit is None else offset + limit
+
+        if not filtered and (sort_by == 'risk_score' or ranks == (0, self.size)):
+            # A contiguous slice of the order: everything, or a score range in score order
+            if sort_by != 'risk_score':
+                lo, hi = 0, self.size
+            elif descending:
+                lo, hi = self.size - ranks[1], self.size - ranks[0]
+            else:
+                lo, hi = ranks
+            begin = max(start, lo)
+            end = hi if wanted is None else min(hi, begin + wanted)
+            rows = order[min(begin + offset, end):end]
+            next_cursor = end if end < hi else None
+            return {'rows': rows, 'total': hi - lo, 'next_cursor': next_cursor}
+
+        groups = self._groups(states, categories)
+        bases = groups * (self.size + 1)
+        group_starts = np.searchsorted(self.group_keys, bases + ranks[0], side='left')
+        group_ends = np.searchsorted(self.group_keys, bases + ranks[1], side='left')
+        total = int((group_ends - group_starts).sum())
+
+        if total * SCAN_DENSITY >= self.size:
+            allowed_groups = np.zeros(self.num_states * self.num_categories, dtype=bool)
+            allowed_groups[groups] = True
+            positions = self._scan(order, start, wanted, allowed_groups, ranks)
+        else:
+            # Few matches: gather them from the composite index and put them in sort order
+            matched = self.group_rows[concat_ranges(group_starts, group_ends)]
+            positions = np.sort(rank_in_order[matched])
+            positions = positions[positions >= start]
+
+        end = len(positions) if wanted is None else min(wanted, len(positions))
+        rows = order[positions[min(offset, end):end]]
+        next_cursor = int(positions[end]) if end < len(positions) else None
+        return {'rows': rows, 'total': total, 'next_cursor': next_cursor}
+
+    def _scan(self, order: np.ndarray, start: int, wanted: Optional[int], allowed_groups: np.ndarray,
+              ranks: Tuple[int, int]) -> np.ndarray:
+        """Order positions of matches from start on, stopping once one past wanted is found"""
+        found: List[np.ndarray] = []
+        count = 0
+        position = start
+        while position < self.size and (wanted is None or count <= wanted):
+            chunk = self.size if wanted is None else max(SCAN_CHUNK, (wanted + 1 - count) * SCAN_DENSITY)
+            stop = min(position + chunk, self.size)
+            found.append(position + np.flatnonzero(self._matches(order[position:stop], allowed_groups, ranks)))
+            count += len(found[-1])
+            position = stop
+        return np.concatenate(found) if found else np.zeros(0, dtype=np.int64)
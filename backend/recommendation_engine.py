@@ -1,95 +1,230 @@
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+
+from analytics_engine import DISTRICT_FEATURE_FIELDS
+from serialization import str_column
+
+PRIORITIES = ['critical', 'high', 'medium', 'low']
+
+OPERATORS = {
+    '<': np.less,
+    '<=': np.less_equal,
+    '>': np.greater,
+    '>=': np.greater_equal,
+}
+
+# A rule fires when `field operator threshold` holds for the value as the district
+# response reports it (rounded per DISTRICT_FEATURE_FIELDS); default stands in
+# for a field the data lacks
+RECOMMENDATION_RULES = [
+    {
+        'name': 'low_youth_enrollment',
+        'field': 'youth_inclusion_rate', 'operator': '<', 'threshold': 0.5, 'default': 1,
+        'priority': 'high',
+        'intervention': 'School-Based Enrollment Drives',
+        'description': 'Youth inclusion rate is below 50%. Deploy mobile enrollment units to schools and educational institutions.',
+        'expected_impact': 'Increase youth enrollment by 15-25% within 6 months'
+    },
+    {
+        'name': 'stagnation_detected',
+        'field': 'stagnation_periods', 'operator': '>', 'threshold': 3, 'default': 0,
+        'priority': 'high',
+        'intervention': 'Community Outreach Campaign',
+        'description': 'Enrollment growth has stagnated over multiple periods. Launch targeted awareness campaigns.',
+        'expected_impact': 'Revitalize enrollment growth momentum'
+    },
+    {
+        'name': 'low_penetration',
+        'field': 'latest_penetration_rate', 'operator': '<', 'threshold': 0.4, 'default': 1,
+        'priority': 'critical',
+        'intervention': 'Intensive Enrollment Push',
+        'description': 'Overall penetration is below 40%. Immediate large-scale intervention required.',
+        'expected_impact': 'Achieve 60% penetration within 12 months'
+    },
+    {
+        'name': 'high_volatility',
+        'field': 'growth_volatility', 'operator': '>', 'threshold': 0.3, 'default': 0,
+        'priority': 'medium',
+        'intervention': 'Infrastructure Review',
+        'description': 'High enrollment volatility detected. Review and stabilize enrollment infrastructure.',
+        'expected_impact': 'Stabilize enrollment patterns and improve predictability'
+    },
+    {
+        'name': 'low_adult_enrollment',
+        'field': 'adult_inclusion_rate', 'operator': '<', 'threshold': 0.6, 'default': 1,
+        'priority': 'medium',
+        'intervention': 'Mobile Enrollment Camps',
+        'description': 'Adult inclusion rate is low. Deploy mobile camps to workplaces and community centers.',
+        'expected_impact': 'Increase adult enrollment by 10-20% within 6 months'
+    },
+    {
+        'name': 'youth_adult_gap',
+        'field': 'youth_adult_gap', 'operator': '>', 'threshold': 0.25, 'default': 0,
+        'priority': 'medium',
+        'intervention': 'Targeted Age-Group Campaigns',
+        'description': 'Significant gap between youth and adult enrollment rates. Design age-specific interventions.',
+        'expected_impact': 'Reduce enrollment disparity between age groups'
+    },
+    {
+        'name': 'negative_growth',
+        'field': 'growth_slope', 'operator': '<', 'threshold': 0, 'default': 0,
+        'priority': 'critical',
+        'intervention': 'Emergency Enrollment Recovery',
+        'description': 'Enrollment is declining. Immediate investigation and corrective action required.',
+        'expected_impact': 'Reverse negative growth trend within 3 months'
+    },
+]
+
+RULE_OUTPUT_FIELDS = ['intervention', 'priority', 'description', 'expected_impact']
+
+NO_RECOMMENDATIONS = {'recommendations': [], 'priority_count': {}}
 
 class RecommendationEngine:
     def __init__(self):
         self.recommendation_rules = self._initialize_recommendation_rules()
+        # Rule matches for every district, built per risk_scores frame
+        self._source = None
+        self._row_codes = None
+        self._rule_counts = None
+        self._payloads: Dict[int, Dict[str, Any]] = {}
+        # Policy and per-state insights, built per dataset (see build_insights)
+        self._insights: Optional[Dict[str, Any]] = None
     
     def _initialize_recommendation_rules(self) -> Dict[str, Dict[str, Any]]:
-        return {
-            'low_youth_enrollment': {
-                'condition': lambda data: data.get('youth_inclusion_rate', 1) < 0.5,
-                'priority': 'high',
-                'intervention': 'School-Based Enrollment Drives',
-                'description': 'Youth inclusion rate is below 50%. Deploy mobile enrollment units to schools and educational institutions.',
-                'expected_impact': 'Increase youth enrollment by 15-25% within 6 months'
-            },
-            'stagnation_detected': {
-                'condition': lambda data: data.get('stagnation_periods', 0) > 3,
-                'priority': 'high',
-                'intervention': 'Community Outreach Campaign',
-                'description': 'Enrollment growth has stagnated over multiple periods. Launch targeted awareness campaigns.',
-                'expected_impact': 'Revitalize enrollment growth momentum'
-            },
-            'low_penetration': {
-                'condition': lambda data: data.get('latest_penetration_rate', 1) < 0.4,
-                'priority': 'critical',
-                'intervention': 'Intensive Enrollment Push',
-                'description': 'Overall penetration is below 40%. Immediate large-scale intervention required.',
-                'expected_impact': 'Achieve 60% penetration within 12 months'
-            },
-            'high_volatility': {
-                'condition': lambda data: data.get('growth_volatility', 0) > 0.3,
-                'priority': 'medium',
-                'intervention': 'Infrastructure Review',
-                'description': 'High enrollment volatility detected. Review and stabilize enrollment infrastructure.',
-                'expected_impact': 'Stabilize enrollment patterns and improve predictability'
-            },
-            'low_adult_enrollment': {
-                'condition': lambda data: data.get('adult_inclusion_rate', 1) < 0.6,
-                'priority': 'medium',
-                'intervention': 'Mobile Enrollment Camps',
-                'description': 'Adult inclusion rate is low. Deploy mobile camps to workplaces and community centers.',
-                'expected_impact': 'Increase adult enrollment by 10-20% within 6 months'
-            },
-            'youth_adult_gap': {
-                'condition': lambda data: data.get('youth_adult_gap', 0) > 0.25,
-                'priority': 'medium',
-                'intervention': 'Targeted Age-Group Campaigns',
-                'description': 'Significant gap between youth and adult enrollment rates. Design age-specific interventions.',
-                'expected_impact': 'Reduce enrollment disparity between age groups'
-            },
-            'negative_growth': {
-                'condition': lambda data: data.get('growth_slope', 0) < 0,
-                'priority': 'critical',
-                'intervention': 'Emergency Enrollment Recovery',
-                'description': 'Enrollment is declining. Immediate investigation and corrective action required.',
-                'expected_impact': 'Reverse negative growth trend within 3 months'
+        return {rule['name']: rule for rule in RECOMMENDATION_RULES}
+    
+    def evaluate_rules(self, frame: pd.DataFrame) -> np.ndarray:
+        """Boolean (rows x rules) matrix of which rules fire for each row of frame"""
+        decimals = dict(DISTRICT_FEATURE_FIELDS)
+        rules = list(self.recommendation_rules.values())
+        matches = np.zeros((len(frame), len(rules)), dtype=bool)
+        for j, rule in enumerate(rules):
+            compare = OPERATORS[rule['operator']]
+            if rule['field'] not in frame:
+                matches[:, j] = compare(rule['default'], rule['threshold'])
+                continue
+            values = frame[rule['field']].to_numpy()
+            if decimals.get(rule['field']) is not None:
+                # Same rounding as the response, so a rule sees what the client sees
+                values = np.round(values, decimals[rule['field']])
+            matches[:, j] = compare(values, rule['threshold'])
+        return matches
+    
+    def _payload(self, code: int) -> Dict[str, Any]:
+        """Response for the set of rules whose bits are set in code"""
+        if code not in self._payloads:
+            fired = [rule for j, rule in enumerate(self.recommendation_rules.values()) if code >> j & 1]
+            # Stable, so rules of equal priority keep their declared order
+            fired.sort(key=lambda rule: PRIORITIES.index(rule['priority']))
+            priority_count = {priority: 0 for priority in PRIORITIES}
+            for rule in fired:
+                priority_count[rule['priority']] += 1
+            self._payloads[code] = {
+                'recommendations': [{field: rule[field] for field in RULE_OUTPUT_FIELDS} for rule in fired],
+                'total_recommendations': len(fired),
+                'priority_breakdown': priority_count
             }
-        }
+        return self._payloads[code]
+    
+    def _matrix(self, risk_engine) -> np.ndarray:
+        """Rule-set code of every risk_scores row, rebuilt when the risk engine re-scores"""
+        if self._source is not risk_engine.risk_scores:
+            matches = self.evaluate_rules(risk_engine.risk_scores)
+            weights = np.left_shift(1, np.arange(matches.shape[1], dtype=np.int64))
+            self._row_codes = matches.astype(np.int64) @ weights
+            self._rule_counts = matches.sum(axis=0)
+            self._source = risk_engine.risk_scores
+        return self._row_codes
+    
+    def build(self, risk_engine):
+        """Evaluate every rule for every district now instead of on the first request"""
+        self._matrix(risk_engine)
     
     def generate_recommendations(self, district_data: Dict[str, Any], risk_data: Dict[str, Any]) -> Dict[str, Any]:
         if 'error' in district_data or 'error' in risk_data:
-            return {'recommendations': [], 'priority_count': {}}
+            return NO_RECOMMENDATIONS
         
         combined_data = {**district_data, **risk_data}
         
-        recommendations = []
-        priority_count = {'critical': 0, 'high': 0, 'medium': 0, 'low': 0}
-        
-        for rule_name, rule in self.recommendation_rules.items():
-            if rule['condition'](combined_data):
-                recommendations.append({
-                    'intervention': rule['intervention'],
-                    'priority': rule['priority'],
-                    'description': rule['description'],
-                    'expected_impact': rule['expected_impact']
-                })
-                priority_count[rule['priority']] += 1
-        
-        recommendations.sort(key=lambda x: {'critical': 0, 'high': 1, 'medium': 2, 'low': 3}[x['priority']])
+        code = 0
+        for j, rule in enumerate(self.recommendation_rules.values()):
+            value = combined_data.get(rule['field'], rule['default'])
+            if OPERATORS[rule['operator']](value, rule['threshold']):
+                code |= 1 << j
+        return self._payload(code)
+    
+    def get_district_recommendations(self, risk_engine, keys: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """
+        Recommendations for many (state, district) pairs from the precomputed rule matches.
         
+        Payloads are shared between districts with the same rules and must not be modified.
+        """
+        row_codes = self._matrix(risk_engine)
+        index = risk_engine.district_index
+        results = []
+        for key in keys:
+            bounds = index.get_bounds(key)
+            if bounds is None:
+                results.append(NO_RECOMMENDATIONS)
+            else:
+                results.append(self._payload(int(row_codes[index.positions[bounds[0]]])))
+        return results
+    
+    def get_rule_summary(self, risk_engine) -> Dict[str, Any]:
+        """How many districts trigger each rule, and how many trigger at least one"""
+        row_codes = self._matrix(risk_engine)
+        rules = [
+            {
+                'rule': rule['name'],
+                'intervention': rule['intervention'],
+                'priority': rule['priority'],
+                'districts': int(count)
+            }
+            for rule, count in zip(self.recommendation_rules.values(), self._rule_counts)
+        ]
         return {
-            'recommendations': recommendations,
-            'total_recommendations': len(recommendations),
-            'priority_breakdown': priority_count
+            'rules': rules,
+            'total_districts': len(row_codes),
+            'districts_with_recommendations': int(np.count_nonzero(row_codes))
         }
     
+    def build_insights(self, analytics_engine, risk_engine):
+        """Materialize the policy insights and every state's insights for the loaded dataset"""
+        scores = risk_engine.risk_scores['composite_risk_score'].to_numpy()
+        districts = str_column(risk_engine.risk_scores['district'])
+        states = {}
+        for state in analytics_engine.cube.states:
+            rows = risk_engine.state_index.get_positions(state)
+            states[state] = self._state_insights(
+                state, analytics_engine.get_state_overview(state), scores[rows], [districts[i] for i in rows]
+            )
+        self._insights = {
+            'source': (analytics_engine.master_data, risk_engine.risk_scores),
+            'policy': self._policy_insights(analytics_engine, risk_engine),
+            'states': states
+        }
+    
+    def _materialized_insights(self, analytics_engine, risk_engine) -> Dict[str, Any]:
+        insights = self._insights
+        if (insights is None or insights['source'][0] is not analytics_engine.master_data
+                or insights['source'][1] is not risk_engine.risk_scores):
+            self.build_insights(analytics_engine, risk_engine)
+        return self._insights
+    
     def generate_policy_insights(self, analytics_engine, risk_engine) -> Dict[str, Any]:
+        policy = self._materialized_insights(analytics_engine, risk_engine)['policy']
+        return {**policy, 'generated_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}
+    
+    def generate_state_insights(self, state_name: str, analytics_engine, risk_engine) -> Dict[str, Any]:
+        state = self._materialized_insights(analytics_engine, risk_engine)['states'].get(state_name)
+        if state is None:
+            return {'error': 'State not found'}
+        return {**state, 'generated_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')}
+    
+    def _policy_insights(self, analytics_engine, risk_engine) -> Dict[str, Any]:
         national_overview = analytics_engine.get_national_overview()
         risk_distribution = risk_engine.get_risk_distribution()
-        top_risk = risk_engine.get_top_risk_districts(20)
         
         insights = []
         
@@ -147,18 +282,12 @@ class RecommendationEngine:
         return {
             'insights': insights,
             'total_insights': len(insights),
-            'critical_issues': sum(1 for i in insights if i['severity'] == 'critical'),
-            'generated_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+            'critical_issues': sum(1 for i in insights if i['severity'] == 'critical')
         }
     
-    def generate_state_insights(self, state_name: str, analytics_engine, risk_engine) -> Dict[str, Any]:
-        state_overview = analytics_engine.get_state_overview(state_name)
-        
-        if 'error' in state_overview:
-            return {'error': 'State not found'}
-        
-        state_risk_data = risk_engine.risk_scores[risk_engine.risk_scores['state'] == state_name]
-        
+    def _state_insights(self, state_name: str, state_overview: Dict[str, Any], scores: np.ndarray,
+                        districts: List[str]) -> Dict[str, Any]:
+        """Insights for one state from its overview and its districts' risk scores (in row order)"""
         insights = []
         
         avg_penetration = state_overview.get('avg_penetration_rate', 0)
@@ -170,17 +299,21 @@ class RecommendationEngine:
                 'recommendation': 'Implement state-wide enrollment acceleration program.'
             })
         
-        high_risk_districts = state_risk_data[state_risk_data['composite_risk_score'] > 0.6]
+        high_risk_districts = np.flatnonzero(scores > 0.6)
         if len(high_risk_districts) > 0:
-            top_districts = high_risk_districts.nlargest(5, 'composite_risk_score')['district'].tolist()
+            # Highest scores first, ties in row order (as nlargest keeps them)
+            top = high_risk_districts[np.argsort(-scores[high_risk_districts], kind='stable')[:3]]
+            top_districts = [districts[i] for i in top]
             insights.append({
                 'category': 'High-Risk Districts',
                 'severity': 'critical',
-                'insight': f"{len(high_risk_districts)} districts in {state_name} are high-risk. Priority districts: {', '.join(top_districts[:3])}.",
+                'insight': f"{len(high_risk_districts)} districts in {state_name} are high-risk. Priority districts: {', '.join(top_districts)}.",
                 'recommendation': 'Deploy rapid response teams to high-risk districts for immediate intervention.'
             })
         
-        avg_state_risk = state_risk_data['composite_risk_score'].mean()
+        # Same summation as Series.mean: missing scores count as 0 in the sum, not in the count
+        counted = ~np.isnan(scores)
+        avg_state_risk = np.where(counted, scores, 0).sum() / counted.sum() if counted.any() else np.nan
         insights.append({
             'category': 'Overall State Risk',
             'severity': 'medium' if avg_state_risk < 0.5 else 'high',
@@ -191,6 +324,5 @@ class RecommendationEngine:
         return {
             'state': state_name,
             'insights': insights,
-            'total_insights': len(insights),
-            'generated_at': pd.Timestamp.now().strftime('%Y-%m-%d %H:%M:%S')
+            'total_insights': len(insights)
         }
\ No newline at end of file
@@ -0,0 +1,120 @@
+"""
+Pre-serialized response cache for endpoints whose output only changes with the dataset.
+
+Entries are keyed by (path, query params, dataset version) and hold the final
+JSON bytes and a gzip-compressed copy, each with its own strong ETag, so repeat
+requests skip both the pandas work and JSON encoding, and revalidations get a 304.
+"""
+
+import gzip
+import hashlib
+import threading
+from collections import OrderedDict
+from typing import Any, Callable, Hashable, Optional
+
+from fastapi import Request, Response
+
+from metrics import phase
+from serialization import render_json
+
+GZIP_MIN_BYTES = 1024
+
+
+class CachedResponse:
+    def __init__(self, body: bytes, media_type: str = "application/json"):
+        self.body = body
+        self.media_type = media_type
+        digest = hashlib.sha256(body).hexdigest()[:32]
+        self.etag = f'"{digest}"'
+        # Strong validators are byte-specific, so the compressed representation gets its own
+        self.gzip_etag = f'"{digest}-gz"'
+        self.gzip_body = gzip.compress(body, compresslevel=6, mtime=0) if len(body) >= GZIP_MIN_BYTES else None
+
+
+def accepts_gzip(accept_encoding: Optional[str]) -> bool:
+    """Whether Accept-Encoding allows gzip: listed, or covered by *, with a q-value above 0"""
+    qualities = {}
+    for item in (accept_encoding or "").split(","):
+        coding, *params = [part.strip() for part in item.split(";")]
+        if not coding:
+            continue
+        quality = 1.0
+        for param in params:
+            name, _, value = param.partition("=")
+            if name.strip().lower() == "q":
+                try:
+                    quality = float(value)
+                except ValueError:
+                    quality = 0.0
+        qualities[coding.lower()] = quality
+    return qualities.get("gzip", qualities.get("x-gzip", qualities.get("*", 0.0))) > 0
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    # If-None-Match uses weak comparison, so ignore any W/ prefix
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any(tag[2:] == etag if tag.startswith("W/") else tag == etag for tag in candidates)
+
+
+class ResponseCache:
+    def __init__(self, max_entries: int = 256):
+        self.max_entries = max_entries
+        self._entries: "OrderedDict[Hashable, CachedResponse]" = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def lookup(self, key: Hashable) -> Optional[CachedResponse]:
+        """The cached entry for key (counted as a hit), or None"""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            return entry
+
+    def get_or_build(self, key: Hashable, build: Callable[[], Any]) -> CachedResponse:
+        entry = self.lookup(key)
+        if entry is not None:
+            return entry
+        with self._lock:
+            self.misses += 1
+
+        with phase('compute'):
+            data = build()
+        with phase('serialize'):
+            entry = CachedResponse(render_json(data))
+
+        if self.max_entries > 0:
+            with self._lock:
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                while len(self._entries) > self.max_entries:
+                    self._entries.popitem(last=False)
+        return entry
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses}
+
+    def render(self, request: Request, entry: CachedResponse) -> Response:
+        use_gzip = entry.gzip_body is not None and accepts_gzip(request.headers.get("accept-encoding"))
+        etag = entry.gzip_etag if use_gzip else entry.etag
+        headers = {"ETag": etag, "Cache-Control": "no-cache", "Vary": "Accept-Encoding"}
+
+        if etag_matches(request.headers.get("if-none-match"), etag):
+            return Response(status_code=304, headers=headers)
+
+        if use_gzip:
+            headers["Content-Encoding"] = "gzip"
+            return Response(content=entry.gzip_body, media_type=entry.media_type, headers=headers)
+
+        return Response(content=entry.body, media_type=entry.media_type, headers=headers)
@@ -1,19 +1,68 @@
+import math
+import threading
 import pandas as pd
 import numpy as np
-from typing import Dict, List, Any
+from collections import OrderedDict
+from typing import Dict, List, Any, Optional, Sequence, Tuple
+from functools import cached_property
 from analytics_engine import AnalyticsEngine
+from instrumentation import stage
+from lookup_index import KeyIndex
+from ranking_index import RankingIndex, RISK_CATEGORIES
+from serialization import round_column, int_column, str_column, to_rows
+
+RISK_COMPONENTS = ['penetration_risk', 'growth_risk', 'youth_risk', 'volatility_risk', 'stagnation_risk']
+# Composite score weight of each component, and the score thresholds between RISK_CATEGORIES
+RISK_WEIGHTS = {
+    'penetration_risk': 0.35,
+    'growth_risk': 0.25,
+    'youth_risk': 0.20,
+    'volatility_risk': 0.10,
+    'stagnation_risk': 0.10,
+}
+RISK_THRESHOLDS = [0.3, 0.6]
+
+# What-if scorings kept per engine (each holds a few arrays the length of risk_scores)
+WHAT_IF_CACHE_SIZE = 16
+
+def _descending_order(values: np.ndarray) -> np.ndarray:
+    """Rows by descending value with ties in row order, as a stable sort gives, sorting only the ties stably"""
+    order = np.argsort(-values)
+    ranked = values[order]
+    missing = np.isnan(ranked)
+    same = (ranked[1:] == ranked[:-1]) | (missing[1:] & missing[:-1])
+    if same.sum() > len(order) // 8:
+        # Mostly ties: a full stable sort is cheaper than sorting them apart
+        return np.argsort(-values, kind='stable')
+    if same.any():
+        tied = np.zeros(len(order), dtype=bool)
+        tied[1:] |= same
+        tied[:-1] |= same
+        runs = np.cumsum(np.concatenate([[True], ~same]))[tied]
+        rows = order[tied]
+        order[tied] = rows[np.lexsort((rows, runs))]
+    return order
 
 class RiskEngine:
     def __init__(self, analytics_engine: AnalyticsEngine):
         self.analytics = analytics_engine
         self.district_features = analytics_engine.get_district_features_df()
         self.risk_scores = self._compute_district_risk_scores()
+        # Weight vector -> (scores, rows by descending score), least recently used first
+        self._what_if_cache: "OrderedDict[Tuple[float, ...], Tuple[np.ndarray, np.ndarray]]" = OrderedDict()
+        self._what_if_lock = threading.Lock()
         
     def _compute_district_risk_scores(self) -> pd.DataFrame:
         print("Computing District Risk Scores (DRS)...")
         
-        df = self.district_features.copy()
+        with stage('_compute_district_risk_scores', input_rows=len(self.district_features)) as record:
+            df = self._score(self.district_features.copy())
+            record['rows'] = len(df)
         
+        print(f"  Risk scores computed for {len(df)} districts")
+        return df
+    
+    def _score(self, df: pd.DataFrame) -> pd.DataFrame:
         penetration_max = df['latest_penetration_rate'].max()
         df['penetration_risk'] = np.where(
             penetration_max > 0,
@@ -51,98 +100,148 @@ class RiskEngine:
             0
         )
         
-        df['composite_risk_score'] = (
-            0.35 * df['penetration_risk'] +
-            0.25 * df['growth_risk'] +
-            0.20 * df['youth_risk'] +
-            0.10 * df['volatility_risk'] +
-            0.10 * df['stagnation_risk']
-        )
+        df['composite_risk_score'] = sum(weight * df[name] for name, weight in RISK_WEIGHTS.items())
         
         df['composite_risk_score'] = df['composite_risk_score'].clip(0, 1)
         
         df['risk_category'] = pd.cut(
             df['composite_risk_score'],
-            bins=[0, 0.3, 0.6, 1.0],
-            labels=['Low Risk', 'Medium Risk', 'High Risk'],
+            bins=[0] + RISK_THRESHOLDS + [1.0],
+            labels=RISK_CATEGORIES,
             include_lowest=True
         )
         
-        print(f"  Risk scores computed for {len(df)} districts")
         return df
     
+    @cached_property
+    def district_index(self) -> KeyIndex:
+        """(state, district) -> risk_scores row"""
+        return KeyIndex(self.risk_scores, ['state', 'district'])
+    
+    @cached_property
+    def state_index(self) -> KeyIndex:
+        """state -> risk_scores rows"""
+        return KeyIndex(self.risk_scores, ['state'])
+    
+    @cached_property
+    def ranking_index(self) -> RankingIndex:
+        """Presorted orders and filter index for paginated listings"""
+        return RankingIndex(self.risk_scores)
+    
+    @cached_property
+    def component_matrix(self) -> np.ndarray:
+        """districts x RISK_COMPONENTS, in risk_scores row order, for what-if scoring"""
+        return np.ascontiguousarray(self.risk_scores[RISK_COMPONENTS].to_numpy(dtype=np.float64))
+    
+    def build_indexes(self):
+        """Build every lookup index now instead of on the first request"""
+        _ = self.district_index
+        _ = self.state_index
+        _ = self.ranking_index
+        _ = self.component_matrix
+    
     def get_district_risk_score(self, state_name: str, district_name: str) -> Dict[str, Any]:
-        risk_data = self.risk_scores[
-            (self.risk_scores['state'] == state_name) & 
-            (self.risk_scores['district'] == district_name)
-        ]
-        
-        if risk_data.empty:
-            return {'error': 'District not found'}
+        return self.get_district_risk_scores([(state_name, district_name)])[0]
+    
+    def get_district_risk_scores(self, keys: Sequence[Tuple[str, str]]) -> List[Dict[str, Any]]:
+        """Risk scores for many (state, district) pairs, reading each score column once"""
+        results: List[Optional[Dict[str, Any]]] = [None] * len(keys)
+        found, rows = [], []
+        for i, key in enumerate(keys):
+            bounds = self.district_index.get_bounds(key)
+            if bounds is None:
+                results[i] = {'error': 'District not found'}
+                continue
+            found.append(i)
+            rows.append(self.district_index.positions[bounds[0]])
         
-        row = risk_data.iloc[0]
+        # round() on NumPy scalars is np.round, so whole columns round the same way
+        scores = np.round(self.risk_scores['composite_risk_score'].to_numpy()[rows], 4).tolist()
+        categories = str_column(self.risk_scores['risk_category'].iloc[rows])
+        components = {
+            name: np.round(self.risk_scores[name].to_numpy()[rows], 4).tolist() for name in RISK_COMPONENTS
+        }
         
-        return {
-            'state': state_name,
-            'district': district_name,
-            'composite_risk_score': round(row['composite_risk_score'], 4),
-            'risk_category': str(row['risk_category']),
-            'risk_components': {
-                'penetration_risk': round(row['penetration_risk'], 4),
-                'growth_risk': round(row['growth_risk'], 4),
-                'youth_risk': round(row['youth_risk'], 4),
-                'volatility_risk': round(row['volatility_risk'], 4),
-                'stagnation_risk': round(row['stagnation_risk'], 4)
+        for j, i in enumerate(found):
+            state_name, district_name = keys[i]
+            results[i] = {
+                'state': state_name,
+                'district': district_name,
+                'composite_risk_score': scores[j],
+                'risk_category': categories[j],
+                'risk_components': {name: components[name][j] for name in RISK_COMPONENTS}
             }
+        return results
+    
+    def _page(self, sort_by: str, order: str, states: Optional[Sequence[str]],
+              risk_categories: Optional[Sequence[str]], min_score: Optional[float], max_score: Optional[float],
+              offset: int, limit: Optional[int], cursor: Optional[int]) -> Tuple[pd.DataFrame, Dict[str, Any]]:
+        page = self.ranking_index.query(
+            sort_by, order == 'desc', states, risk_categories, min_score, max_score, offset, limit, cursor
+        )
+        rows = self.risk_scores.iloc[page['rows']]
+        pagination = {
+            'total': page['total'],
+            'offset': offset,
+            'limit': limit,
+            'returned': len(rows),
+            'next_cursor': page['next_cursor']
         }
+        return rows, pagination
     
-    def get_top_risk_districts(self, limit: int = 50) -> Dict[str, List[Dict[str, Any]]]:
-        top_risk = self.risk_scores.nlargest(limit, 'composite_risk_score')
-        
-        districts_list = []
-        for _, row in top_risk.iterrows():
-            districts_list.append({
-                'state': row['state'],
-                'district': row['district'],
-                'risk_score': round(row['composite_risk_score'], 4),
-                'risk_category': str(row['risk_category']),
-                'penetration_rate': round(row['latest_penetration_rate'], 4),
-                'youth_inclusion_rate': round(row['youth_inclusion_rate'], 4)
-            })
-        
-        return {'high_risk_districts': districts_list}
+    def get_top_risk_districts(self, limit: Optional[int] = 50, columnar: bool = False, offset: int = 0,
+                               cursor: Optional[int] = None, sort_by: str = 'risk_score', order: str = 'desc',
+                               states: Optional[Sequence[str]] = None,
+                               risk_categories: Optional[Sequence[str]] = None,
+                               min_score: Optional[float] = None, max_score: Optional[float] = None) -> Dict[str, Any]:
+        top_risk, pagination = self._page(
+            sort_by, order, states, risk_categories, min_score, max_score, offset, limit, cursor
+        )
+        
+        districts_list = to_rows({
+            'state': str_column(top_risk['state']),
+            'district': str_column(top_risk['district']),
+            'risk_score': round_column(top_risk['composite_risk_score'], 4),
+            'risk_category': str_column(top_risk['risk_category']),
+            'penetration_rate': round_column(top_risk['latest_penetration_rate'], 4),
+            'youth_inclusion_rate': round_column(top_risk['youth_inclusion_rate'], 4)
+        }, columnar)
+        
+        return {'high_risk_districts': districts_list, 'pagination': pagination}
     
-    def get_heatmap_data(self) -> Dict[str, List[Dict[str, Any]]]:
-        heatmap_list = []
-        
-        for _, row in self.risk_scores.iterrows():
-            heatmap_list.append({
-                'state': row['state'],
-                'district': row['district'],
-                'risk_score': round(row['composite_risk_score'], 4),
-                'risk_category': str(row['risk_category']),
-                'penetration_rate': round(row['latest_penetration_rate'], 4),
-                'total_population': int(row['total_population'])
-            })
-        
-        return {'heatmap_data': heatmap_list}
+    def get_heatmap_data(self, columnar: bool = False, limit: Optional[int] = None, offset: int = 0,
+                         cursor: Optional[int] = None, sort_by: str = 'state', order: str = 'asc',
+                         states: Optional[Sequence[str]] = None, risk_categories: Optional[Sequence[str]] = None,
+                         min_score: Optional[float] = None, max_score: Optional[float] = None) -> Dict[str, Any]:
+        heatmap, pagination = self._page(
+            sort_by, order, states, risk_categories, min_score, max_score, offset, limit, cursor
+        )
+        
+        heatmap_list = to_rows({
+            'state': str_column(heatmap['state']),
+            'district': str_column(heatmap['district']),
+            'risk_score': round_column(heatmap['composite_risk_score'], 4),
+            'risk_category': str_column(heatmap['risk_category']),
+            'penetration_rate': round_column(heatmap['latest_penetration_rate'], 4),
+            'total_population': int_column(heatmap['total_population'])
+        }, columnar)
+        
+        return {'heatmap_data': heatmap_list, 'pagination': pagination}
     
     def get_risk_distribution(self) -> Dict[str, Any]:
         distribution = self.risk_scores['risk_category'].value_counts().to_dict()
         
         distribution_cleaned = {str(k): int(v) for k, v in distribution.items()}
         
-        risk_by_state = self.risk_scores.groupby('state')['composite_risk_score'].agg(['mean', 'max', 'count']).reset_index()
+        risk_by_state = self.risk_scores.groupby('state', observed=True)['composite_risk_score'].agg(['mean', 'max', 'count']).reset_index()
         risk_by_state.columns = ['state', 'avg_risk_score', 'max_risk_score', 'num_districts']
         
-        state_risk_list = []
-        for _, row in risk_by_state.iterrows():
-            state_risk_list.append({
-                'state': row['state'],
-                'avg_risk_score': round(row['avg_risk_score'], 4),
-                'max_risk_score': round(row['max_risk_score'], 4),
-                'num_districts': int(row['num_districts'])
-            })
+        state_risk_list = to_rows({
+            'state': risk_by_state['state'].tolist(),
+            'avg_risk_score': round_column(risk_by_state['avg_risk_score'], 4),
+            'max_risk_score': round_column(risk_by_state['max_risk_score'], 4),
+            'num_districts': int_column(risk_by_state['num_districts'])
+        })
         
         return {
             'overall_distribution': distribution_cleaned,
@@ -151,7 +250,97 @@ class RiskEngine:
             'avg_national_risk': round(self.risk_scores['composite_risk_score'].mean(), 4)
         }
     
+    def _what_if_scores(self, weights: Tuple[float, ...]) -> Tuple[np.ndarray, np.ndarray]:
+        """Composite scores under a weight vector (in RISK_COMPONENTS order), and rows by descending score"""
+        with self._what_if_lock:
+            entry = self._what_if_cache.get(weights)
+            if entry is not None:
+                self._what_if_cache.move_to_end(weights)
+                return entry
+        
+        scores = self.component_matrix @ np.asarray(weights, dtype=np.float64)
+        np.clip(scores, 0, 1, out=scores)
+        # Equal scores keep (state, district) order, as in the rankings
+        order = _descending_order(scores)
+        entry = (scores, order)
+        
+        with self._what_if_lock:
+            self._what_if_cache[weights] = entry
+            self._what_if_cache.move_to_end(weights)
+            while len(self._what_if_cache) > WHAT_IF_CACHE_SIZE:
+                self._what_if_cache.popitem(last=False)
+        return entry
+    
+    def what_if(self, weights: Sequence[float], thresholds: Sequence[float] = RISK_THRESHOLDS,
+                limit: Optional[int] = 50, offset: int = 0, states: Optional[Sequence[str]] = None,
+                columnar: bool = False) -> Dict[str, Any]:
+        """
+        Scores, categories and ranks of the districts under other weights and category thresholds.
+        
+        Weights are relative: they are divided by their sum (which must be
+        positive and finite), so scores stay within 0-1 like the standard ones. Scoring is
+        one matrix-vector product over component_matrix, cached per weight
+        vector; thresholds only bin the cached scores. Districts are
+        listed by descending score (optionally only in some states) with their
+        national rank, next to their standard score, category and rank.
+        """
+        total = float(sum(weights))
+        if not 0 < total < math.inf:
+            raise ValueError('weights must have a positive, finite sum')
+        scores, order = self._what_if_scores(tuple(float(weight) / total for weight in weights))
+        bounds = np.asarray(thresholds, dtype=np.float64)
+        
+        if states:
+            selected = self.risk_scores['state'].isin(states).to_numpy()
+            positions = np.flatnonzero(selected[order])
+            matched = order[positions]
+        else:
+            positions = None
+            matched = order
+        
+        # Binned like pd.cut(include_lowest=True): [0, t1], (t1, t2], (t2, 1]; missing scores stay uncategorized
+        matched_scores = scores[matched]
+        missing = np.isnan(matched_scores)
+        category_codes = np.where(missing, len(RISK_CATEGORIES), np.searchsorted(bounds, matched_scores, side='left'))
+        counts = np.bincount(category_codes, minlength=len(RISK_CATEGORIES) + 1)
+        changed = np.count_nonzero(category_codes != self.ranking_index.category_codes[matched])
+        
+        end = len(matched) if limit is None else min(offset + limit, len(matched))
+        page = np.arange(offset, max(offset, end))
+        rows = matched[page]
+        ranks = (positions[page] if positions is not None else page) + 1
+        baseline_ranks = self.ranking_index.order('risk_score', True)[1][rows] + 1
+        page_categories = category_codes[page]
+        
+        districts_list = to_rows({
+            'state': str_column(self.risk_scores['state'].iloc[rows]),
+            'district': str_column(self.risk_scores['district'].iloc[rows]),
+            'rank': ranks.tolist(),
+            'risk_score': np.round(scores[rows], 4).tolist(),
+            'risk_category': [
+                RISK_CATEGORIES[code] if code < len(RISK_CATEGORIES) else None for code in page_categories.tolist()
+            ],
+            'baseline_rank': baseline_ranks.tolist(),
+            'baseline_risk_score': np.round(self.ranking_index.values['risk_score'][rows], 4).tolist(),
+            'baseline_risk_category': str_column(self.risk_scores['risk_category'].iloc[rows])
+        }, columnar)
+        
+        return {
+            'weights': dict(zip(RISK_COMPONENTS, (float(weight) for weight in weights))),
+            'thresholds': [float(bound) for bound in bounds],
+            'distribution': {category: int(count) for category, count in zip(RISK_CATEGORIES, counts)},
+            'category_changes': int(changed),
+            'avg_risk_score': round(float(np.nanmean(matched_scores)), 4) if len(matched) and not missing.all() else None,
+            'districts': districts_list,
+            'pagination': {
+                'total': len(matched),
+                'offset': offset,
+                'limit': limit,
+                'returned': len(rows)
+            }
+        }
+    
     def get_high_risk_states(self, threshold: float = 0.6) -> List[str]:
         high_risk_districts = self.risk_scores[self.risk_scores['composite_risk_score'] >= threshold]
         state_counts = high_risk_districts['state'].value_counts()
-        return state_counts.index.tolist()
\ No newline at end of file
+        return state_counts[state_counts > 0].index.tolist()
\ No newline at end of file
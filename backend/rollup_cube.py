@@ -0,0 +1,167 @@
+"""
+Pre-aggregated rollup cube over master_data.
+
+Count columns are summed once at three grains: (date), (state, date) and
+(state, district, date), together with how many districts and states report
+in each cell. Overviews, trends and range queries then read cells instead of
+rescanning master_data: a state-subset, date-range aggregation touches only
+the cells it covers.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional, Sequence
+
+from feature_engine import penetration_rates
+from lookup_index import concat_ranges
+from schema import MASTER_COUNT_COLUMNS
+from time_series import TimeSeriesIndex
+
+CUBE_MEASURES = MASTER_COUNT_COLUMNS
+GROUPINGS = ('date', 'state', 'district', 'total')
+
+
+class RollupCube:
+    def __init__(self, master_data: pd.DataFrame):
+        grouped = master_data.groupby(['state', 'district'], sort=True, observed=True)
+        district_codes = grouped.ngroup().to_numpy()
+        district_keys = grouped.size().index
+
+        keep = district_codes >= 0
+        district_codes = district_codes[keep]
+        self.dates, date_codes = np.unique(master_data['date'].to_numpy()[keep], return_inverse=True)
+
+        # District keys are sorted by (state, district), so each state owns a contiguous code range
+        self.district_names = district_keys.get_level_values('district').to_numpy(dtype=object)
+        district_state_names = district_keys.get_level_values('state').to_numpy(dtype=object)
+        state_names, district_state = np.unique(district_state_names, return_inverse=True)
+        self.states: List[str] = state_names.tolist()
+        self._state_codes: Dict[str, int] = {state: code for code, state in enumerate(self.states)}
+        self.district_state = district_state
+        self.districts_per_state = np.bincount(district_state, minlength=len(self.states))
+
+        # District grain: one cell per (state, district, date), ordered state -> date -> district
+        state_codes = district_state[district_codes]
+        order = np.lexsort((district_codes, date_codes, state_codes))
+        self.cell_state = state_codes[order]
+        self.cell_date = date_codes[order]
+        self.cell_district = district_codes[order]
+        self.cell_values = np.column_stack([
+            master_data[m].to_numpy()[keep][order].astype(np.int64) for m in CUBE_MEASURES
+        ])
+
+        # State grain: (state, date, measure) sums plus reporting districts per cell
+        num_dates = len(self.dates)
+        cell_keys = self.cell_state * num_dates + self.cell_date
+        self.cell_keys = cell_keys
+        new_cell = np.ones(len(cell_keys), dtype=bool)
+        new_cell[1:] = cell_keys[1:] != cell_keys[:-1]
+        new_district = new_cell.copy()
+        new_district[1:] |= self.cell_district[1:] != self.cell_district[:-1]
+        starts = np.flatnonzero(new_cell)
+
+        self.state_values = np.zeros((len(self.states) * num_dates, len(CUBE_MEASURES)), dtype=np.int64)
+        self.state_districts = np.zeros(len(self.states) * num_dates, dtype=np.int64)
+        if len(starts):
+            self.state_values[cell_keys[starts]] = np.add.reduceat(self.cell_values, starts, axis=0)
+            self.state_districts[cell_keys[starts]] = np.add.reduceat(new_district.astype(np.int64), starts)
+        self.state_values = self.state_values.reshape(len(self.states), num_dates, len(CUBE_MEASURES))
+        self.state_districts = self.state_districts.reshape(len(self.states), num_dates)
+
+        # National grain
+        self.national_values = self.state_values.sum(axis=0)
+        self.national_districts = self.state_districts.sum(axis=0)
+        self.national_states = (self.state_districts > 0).sum(axis=0)
+        self.national_series = TimeSeriesIndex(self.dates)
+
+    @property
+    def num_states(self) -> int:
+        return len(self.states)
+
+    @property
+    def num_districts(self) -> int:
+        return len(self.district_names)
+
+    def measure(self, name: str) -> int:
+        return CUBE_MEASURES.index(name)
+
+    def has_state(self, state_name: str) -> bool:
+        return state_name in self._state_codes
+
+    def date_range(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None) -> slice:
+        """Date positions between start and end, both inclusive"""
+        lo = 0 if start is None else int(np.searchsorted(self.dates, np.datetime64(start), side='left'))
+        hi = len(self.dates) if end is None else int(np.searchsorted(self.dates, np.datetime64(end), side='right'))
+        return slice(lo, max(lo, hi))
+
+    def state_codes(self, states: Optional[Sequence[str]] = None) -> np.ndarray:
+        if states is None:
+            return np.arange(len(self.states))
+        return np.array(sorted({self._state_codes[s] for s in states}), dtype=np.int64)
+
+    def latest_state_date(self, state_name: str) -> Optional[int]:
+        """Position of the last date the state reports on"""
+        reporting = np.flatnonzero(self.state_districts[self._state_codes[state_name]])
+        return int(reporting[-1]) if len(reporting) else None
+
+    def state_district_count(self, state_name: str) -> int:
+        return int(self.districts_per_state[self._state_codes[state_name]])
+
+    def state_totals(self, state_name: str, date_position: int) -> np.ndarray:
+        return self.state_values[self._state_codes[state_name], date_position]
+
+    def _cells(self, state_codes: np.ndarray, dates: slice) -> np.ndarray:
+        """District-grain cell positions for the given states within a date range"""
+        num_dates = len(self.dates)
+        lo = np.searchsorted(self.cell_keys, state_codes * num_dates + dates.start, side='left')
+        hi = np.searchsorted(self.cell_keys, state_codes * num_dates + dates.stop, side='left')
+        return concat_ranges(lo, hi)
+
+    def aggregate(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+                  states: Optional[Sequence[str]] = None, group_by: str = 'date') -> pd.DataFrame:
+        """
+        Sum every measure over a date range and a subset of states.
+
+        group_by is 'date', 'state', 'district' or 'total'. Rows also carry
+        the number of distinct districts reporting in them (per district, the
+        number of dates it reports on).
+        """
+        dates = self.date_range(start, end)
+        codes = self.state_codes(states)
+
+        if group_by == 'date':
+            values = self.state_values[codes, dates].sum(axis=0)
+            reporting = self.state_districts[codes, dates]
+            result = pd.DataFrame({'date': self.dates[dates]})
+            result['districts_reporting'] = reporting.sum(axis=0)
+            result['states_reporting'] = (reporting > 0).sum(axis=0)
+        elif group_by == 'state':
+            values = self.state_values[codes, dates].sum(axis=1)
+            result = pd.DataFrame({'state': [self.states[c] for c in codes]})
+            reporting = np.unique(self.cell_district[self._cells(codes, dates)])
+            result['districts_reporting'] = np.bincount(
+                self.district_state[reporting], minlength=len(self.states)
+            )[codes]
+        elif group_by == 'district':
+            cells = self._cells(codes, dates)
+            district_codes, inverse = np.unique(self.cell_district[cells], return_inverse=True)
+            values = np.zeros((len(district_codes), len(CUBE_MEASURES)), dtype=np.int64)
+            np.add.at(values, inverse, self.cell_values[cells])
+            result = pd.DataFrame({
+                'state': [self.states[c] for c in self.district_state[district_codes]],
+                'district': self.district_names[district_codes]
+            })
+            result['data_points'] = np.bincount(inverse, minlength=len(district_codes))
+        elif group_by == 'total':
+            cells = self._cells(codes, dates)
+            values = self.state_values[codes, dates].sum(axis=(0, 1))[None, :]
+            result = pd.DataFrame({'districts_reporting': [len(np.unique(self.cell_district[cells]))]})
+        else:
+            raise ValueError(f"group_by must be one of {GROUPINGS}")
+
+        for i, name in enumerate(CUBE_MEASURES):
+            result[name] = values[:, i]
+        result['penetration_rate'] = penetration_rates(
+            values[:, self.measure('total_enrollments')], values[:, self.measure('total_population')]
+        )
+        return result
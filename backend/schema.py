@@ -0,0 +1,83 @@
+"""
+Compact column layout for master_data and district_features.
+
+State and district are categoricals sharing one dictionary per column across
+both tables, counts are int32 (kept at int64 if a value would not fit) and
+the per-row rates stored in master_data are float32. Values that reach API
+responses are derived in float64 from the integer counts, so the compact
+layout does not change any output. District features keep float64 rates:
+there is one row per district and they feed the risk normalization.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, List, Optional
+
+KEY_COLUMNS = ['state', 'district']
+
+MASTER_COUNT_COLUMNS = [
+    'demo_age_5_17', 'demo_age_17_', 'total_population',
+    'age_0_5', 'age_5_17', 'age_18_greater', 'total_enrollments'
+]
+MASTER_RATE_COLUMNS = ['penetration_rate', 'youth_enrollment_rate', 'adult_enrollment_rate']
+
+FEATURE_COUNT_COLUMNS = [
+    'total_enrollments', 'total_population', 'stagnation_periods', 'time_span_days', 'data_points'
+]
+
+COUNT_DTYPE = np.dtype(np.int32)
+RATE_DTYPE = np.dtype(np.float32)
+
+
+def key_dtypes(df: pd.DataFrame) -> Dict[str, pd.CategoricalDtype]:
+    """One categorical dtype per key column, over the sorted values present in df"""
+    dtypes = {}
+    for column in KEY_COLUMNS:
+        values = df[column]
+        if isinstance(values.dtype, pd.CategoricalDtype):
+            codes = values.cat.codes.to_numpy()
+            present = values.cat.categories[np.unique(codes[codes >= 0])]
+        else:
+            present = pd.unique(values.to_numpy())
+        dtypes[column] = pd.CategoricalDtype(pd.Index(sorted(present), dtype=object))
+    return dtypes
+
+
+def _fit_int(values: pd.Series) -> pd.Series:
+    """Downcast an integer column to COUNT_DTYPE when every value fits"""
+    if values.dtype == COUNT_DTYPE or not np.issubdtype(values.dtype, np.integer):
+        return values
+    info = np.iinfo(COUNT_DTYPE)
+    if len(values) and (values.min() < info.min or values.max() > info.max):
+        return values
+    return values.astype(COUNT_DTYPE)
+
+
+def compact_frame(df: pd.DataFrame, dtypes: Dict[str, pd.CategoricalDtype],
+                  count_columns: List[str], rate_columns: List[str]) -> pd.DataFrame:
+    """
+    Apply the compact layout, leaving columns that already have it untouched.
+
+    Columns that need no conversion keep their buffers (including memory maps).
+    """
+    columns = {}
+    for name in df.columns:
+        values = df[name]
+        if name in dtypes:
+            if values.dtype != dtypes[name]:
+                values = values.astype(dtypes[name])
+        elif name in count_columns:
+            values = _fit_int(values)
+        elif name in rate_columns and values.dtype != RATE_DTYPE:
+            values = values.astype(RATE_DTYPE)
+        columns[name] = values
+    return pd.DataFrame(columns, index=df.index, copy=False)
+
+
+def compact_master_data(master_data: pd.DataFrame,
+                        dtypes: Optional[Dict[str, pd.CategoricalDtype]] = None) -> pd.DataFrame:
+    return compact_frame(master_data, dtypes or key_dtypes(master_data), MASTER_COUNT_COLUMNS, MASTER_RATE_COLUMNS)
+
+
+def compact_district_features(features: pd.DataFrame, dtypes: Dict[str, pd.CategoricalDtype]) -> pd.DataFrame:
+    return compact_frame(features, dtypes, FEATURE_COUNT_COLUMNS, [])
@@ -0,0 +1,81 @@
+"""
+Columnar JSON serialization helpers for API responses.
+
+Responses are built column by column from NumPy arrays and turned into
+records (or a compact columnar shape) in one pass, instead of walking
+DataFrames with iterrows().
+"""
+
+import json
+import pandas as pd
+import numpy as np
+from typing import Any, Dict, List, Sequence
+
+# Scaled values this close to .5 are re-rounded with Python's round()
+TIE_TOLERANCE = 1e-6
+
+
+def round_column(values: Any, decimals: int) -> List[float]:
+    """
+    Vectorized equivalent of [round(float(v), decimals) for v in values].
+
+    np.round scales, rounds and unscales, which can land on the other side of
+    a decimal tie than Python's correctly-rounded round(). Only the values
+    near a tie are re-rounded in Python, so results match round() exactly.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    rounded = np.round(values, decimals)
+
+    scaled = values * 10.0 ** decimals
+    with np.errstate(invalid='ignore'):
+        near_tie = np.abs(scaled - np.floor(scaled) - 0.5) < TIE_TOLERANCE
+    if near_tie.any():
+        rounded[near_tie] = [round(v, decimals) for v in values[near_tie].tolist()]
+
+    return rounded.tolist()
+
+
+def int_column(values: Any) -> List[int]:
+    return np.asarray(values).astype(np.int64).tolist()
+
+
+def str_column(values: Any) -> List[str]:
+    if isinstance(getattr(values, 'dtype', None), pd.CategoricalDtype):
+        # Convert only the values present, not every category
+        values = np.asarray(values)
+    return pd.Series(values).astype(str).tolist()
+
+
+def date_column(values: Any) -> List[str]:
+    """Format dates as YYYY-MM-DD"""
+    return np.datetime_as_string(np.asarray(values, dtype='datetime64[ns]'), unit='D').tolist()
+
+
+def to_records(columns: Dict[str, Sequence]) -> List[Dict[str, Any]]:
+    names = list(columns)
+    return [dict(zip(names, row)) for row in zip(*columns.values())]
+
+
+def to_columnar(columns: Dict[str, Sequence]) -> Dict[str, Any]:
+    """Compact shape: {"columns": [...], "data": [[...], ...]}"""
+    return {'columns': list(columns), 'data': [list(row) for row in zip(*columns.values())]}
+
+
+def to_rows(columns: Dict[str, Sequence], columnar: bool = False) -> Any:
+    return to_columnar(columns) if columnar else to_records(columns)
+
+
+def render_json(content: Any) -> bytes:
+    """
+    Encode JSON-native content with the same formatting as FastAPI's JSONResponse.
+
+    Skips jsonable_encoder, so content must already be plain dicts, lists,
+    strings, numbers, booleans and None.
+    """
+    return json.dumps(
+        content,
+        ensure_ascii=False,
+        allow_nan=False,
+        indent=None,
+        separators=(",", ":"),
+    ).encode("utf-8")
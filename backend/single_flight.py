@@ -0,0 +1,97 @@
+"""
+Single-flight execution of expensive handlers on a bounded thread pool.
+
+Concurrent calls with the same key share one in-flight computation: the first
+caller submits it, later callers await the same future until it finishes (a
+call arriving after that computes again, or hits the response cache). Work runs
+on a small dedicated pool rather than Starlette's 40-thread default, so a burst
+of CPU-bound pandas work queues instead of thrashing the GIL. Counters report
+queue depth and how many calls were coalesced.
+"""
+
+import asyncio
+import threading
+from concurrent.futures import Future, ThreadPoolExecutor
+from typing import Any, Callable, Dict, Hashable, Optional
+
+
+class SingleFlight:
+    def __init__(self, max_workers: int = 4, coalesce: bool = True):
+        self.max_workers = max_workers
+        self.coalesce = coalesce
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix='compute')
+        self._inflight: Dict[Hashable, Future] = {}
+        self._lock = threading.Lock()
+        self.calls = 0
+        self.executions = 0
+        self.coalesced = 0
+        self.failures = 0
+        self.queued = 0
+        self.running = 0
+        self.max_queued = 0
+
+    def submit(self, key: Optional[Hashable], fn: Callable[[], Any]) -> Future:
+        """Future for fn(), shared with any in-flight call of the same key (None never coalesces)"""
+        if not self.coalesce:
+            key = None
+        with self._lock:
+            self.calls += 1
+            if key is not None:
+                future = self._inflight.get(key)
+                if future is not None:
+                    self.coalesced += 1
+                    return future
+            self.executions += 1
+            self.queued += 1
+            self.max_queued = max(self.max_queued, self.queued)
+            future = self._executor.submit(self._run, fn)
+            if key is not None:
+                self._inflight[key] = future
+        future.add_done_callback(self._dequeue_cancelled)
+        if key is not None:
+            future.add_done_callback(lambda done: self._forget(key, done))
+        return future
+
+    async def run(self, key: Optional[Hashable], fn: Callable[[], Any]) -> Any:
+        # Shielded: wrap_future cancels the shared future when its awaiter is cancelled (a client
+        # disconnecting), which would fail every other caller waiting on the same key
+        return await asyncio.shield(asyncio.wrap_future(self.submit(key, fn)))
+
+    def _run(self, fn: Callable[[], Any]) -> Any:
+        with self._lock:
+            self.queued -= 1
+            self.running += 1
+        try:
+            return fn()
+        except BaseException:
+            with self._lock:
+                self.failures += 1
+            raise
+        finally:
+            with self._lock:
+                self.running -= 1
+
+    def _dequeue_cancelled(self, future: Future):
+        # A future cancelled before it started never reaches _run
+        if future.cancelled():
+            with self._lock:
+                self.queued -= 1
+
+    def _forget(self, key: Hashable, future: Future):
+        with self._lock:
+            if self._inflight.get(key) is future:
+                del self._inflight[key]
+
+    def stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                'max_workers': self.max_workers,
+                'queue_depth': self.queued,
+                'max_queue_depth': self.max_queued,
+                'running': self.running,
+                'in_flight_keys': len(self._inflight),
+                'calls': self.calls,
+                'executions': self.executions,
+                'coalesced': self.coalesced,
+                'failures': self.failures
+            }
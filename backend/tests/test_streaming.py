@@ -0,0 +1,50 @@
+"""
+The streaming aggregation path must build the same tables as the in-memory one.
+
+Run from the backend directory:
+    python -m pytest tests
+"""
+
+import sys
+from pathlib import Path
+
+import pytest
+
+BACKEND_DIR = Path(__file__).resolve().parent.parent
+sys.path.insert(0, str(BACKEND_DIR))
+sys.path.insert(0, str(BACKEND_DIR / 'bench'))
+
+from data_pipeline import CSV_CHUNKSIZE, DataPipeline
+from synthetic import write_raw_csvs
+
+TABLES = ['demographic_aggregates', 'enrollment_aggregates', 'master_data']
+
+
+@pytest.fixture(scope='module')
+def data_dir(tmp_path_factory):
+    directory = tmp_path_factory.mktemp('raw')
+    write_raw_csvs(directory, demographic_rows=6_000, enrollment_rows=3_000, num_districts=60, num_dates=12,
+                   demographic_files=3, enrollment_files=2)
+    return directory
+
+
+@pytest.fixture(scope='module')
+def in_memory(data_dir):
+    pipeline = DataPipeline(data_dir)
+    pipeline.load_all_datasets(workers=1)
+    pipeline.merge_datasets()
+    return pipeline
+
+
+# The default reads each file in one chunk; 150 rows folds many partial chunks per file
+@pytest.mark.parametrize('chunksize', [CSV_CHUNKSIZE, 150])
+def test_streaming_matches_in_memory(data_dir, in_memory, chunksize):
+    streaming = DataPipeline(data_dir)
+    streaming.aggregate_datasets(workers=1, chunksize=chunksize)
+
+    for table in TABLES:
+        expected = getattr(in_memory, table)
+        got = getattr(streaming, table)
+        assert len(expected) > 0, table
+        assert got.dtypes.equals(expected.dtypes), table
+        assert got.equals(expected), table
@@ -0,0 +1,76 @@
+"""
+Date-sorted time-series index with range slicing and pre-bucketed views.
+
+Dates are sorted within each segment (the whole array, or one segment per
+district). A start/end range is found by binary search, and week/month
+buckets are prepared once as the position of the last date in every bucket,
+so a query costs O(log n + points returned) however much history is held.
+A bucket reports its last snapshot in range, labelled with the bucket start.
+"""
+
+import pandas as pd
+import numpy as np
+from typing import Dict, Optional, Tuple
+
+BUCKETS = ('day', 'week', 'month')
+
+
+def bucket_labels(dates: np.ndarray, bucket: str) -> np.ndarray:
+    """Start date of each date's bucket (weeks start on Monday)"""
+    days = np.asarray(dates, dtype='datetime64[ns]').astype('datetime64[D]')
+    if bucket == 'day':
+        labels = days
+    elif bucket == 'week':
+        # 1970-01-01 was a Thursday
+        labels = days - ((days.astype(np.int64) + 3) % 7).astype('timedelta64[D]')
+    elif bucket == 'month':
+        labels = days.astype('datetime64[M]').astype('datetime64[D]')
+    else:
+        raise ValueError(f"bucket must be one of {BUCKETS}")
+    return labels.astype('datetime64[ns]')
+
+
+class TimeSeriesIndex:
+    def __init__(self, dates: np.ndarray, segment_ends: Optional[np.ndarray] = None):
+        self.dates = np.asarray(dates, dtype='datetime64[ns]')
+        n = len(self.dates)
+        segment_end = np.zeros(n, dtype=bool)
+        if n:
+            segment_end[np.asarray(segment_ends if segment_ends is not None else [n], dtype=np.int64) - 1] = True
+
+        self._labels: Dict[str, np.ndarray] = {}
+        self._ends: Dict[str, np.ndarray] = {}
+        for bucket in BUCKETS[1:]:
+            labels = bucket_labels(self.dates, bucket)
+            last = segment_end.copy()
+            last[:-1] |= labels[1:] != labels[:-1]
+            self._labels[bucket] = labels
+            self._ends[bucket] = np.flatnonzero(last)
+
+    def select(self, start: Optional[pd.Timestamp] = None, end: Optional[pd.Timestamp] = None,
+               bucket: str = 'day', bounds: Optional[Tuple[int, int]] = None) -> Tuple[np.ndarray, np.ndarray]:
+        """
+        Positions (and their bucket labels) of the points between start and end, both inclusive.
+
+        bounds restricts the search to one segment. For week and month each
+        bucket yields its last position in range.
+        """
+        base, stop = bounds or (0, len(self.dates))
+        segment = self.dates[base:stop]
+        lo = base if start is None else base + int(np.searchsorted(segment, np.datetime64(start, 'ns'), side='left'))
+        hi = stop if end is None else base + int(np.searchsorted(segment, np.datetime64(end, 'ns'), side='right'))
+
+        if hi <= lo:
+            return np.zeros(0, dtype=np.int64), self.dates[:0]
+        if bucket == 'day':
+            positions = np.arange(lo, hi)
+            return positions, self.dates[lo:hi]
+        if bucket not in self._ends:
+            raise ValueError(f"bucket must be one of {BUCKETS}")
+
+        ends = self._ends[bucket]
+        first, last = np.searchsorted(ends, [lo, hi - 1], side='left')
+        positions = ends[first:last + 1].copy()
+        # The final bucket may run past the range; report its last date in range instead
+        positions[-1] = hi - 1
+        return positions, self._labels[bucket][positions]